@@ -0,0 +1,470 @@
+''' Asyncio counterpart of CoinGeckoClient, built on aiohttp '''
+
+import asyncio, aiohttp, math, requests, time, client, config, jsonlib, lazy, pagination, records, scheduling, streaming
+from requests.structures import CaseInsensitiveDict
+from client import CoinGeckoClient, Request
+from cache import ResponseCache, MISSING
+from coalesce import AsyncSingleFlight
+from batching import chunk_values, merge_results
+
+columnar = lazy.LazyModule("columnar") # NumPy is only imported for mode="numpy"
+backfill = lazy.LazyModule("backfill") # For the BackfillResult annotation, loaded by client when a backfill runs
+
+
+async def _on_connection_create_start(session, context, params) -> None:
+    context.connect_start = time.perf_counter()
+
+
+async def _on_connection_create_end(session, context, params) -> None:
+    event = context.trace_request_ctx # hooks.RequestEvent, None when no hook is registered
+    if event is not None:
+        event.connect = time.perf_counter() - context.connect_start - event.dns
+
+
+async def _on_dns_resolvehost_start(session, context, params) -> None:
+    context.dns_start = time.perf_counter()
+
+
+async def _on_dns_resolvehost_end(session, context, params) -> None:
+    if context.trace_request_ctx is not None:
+        context.trace_request_ctx.dns = time.perf_counter() - context.dns_start
+
+
+def _trace_config() -> aiohttp.TraceConfig:
+    ''' Records dns and connect timings on hook events. Only fires when a new connection is opened. '''
+    trace = aiohttp.TraceConfig()
+    trace.on_connection_create_start.append(_on_connection_create_start)
+    trace.on_connection_create_end.append(_on_connection_create_end)
+    trace.on_dns_resolvehost_start.append(_on_dns_resolvehost_start)
+    trace.on_dns_resolvehost_end.append(_on_dns_resolvehost_end)
+    return trace
+
+
+def _as_requests_error(status, reason, headers, body, url) -> requests.exceptions.HTTPError:
+    ''' Wraps a failed aiohttp response in requests' HTTPError so the retry policy and error messages work unchanged. '''
+    response = requests.Response()
+    response.status_code = status
+    response.reason = reason
+    response.headers = CaseInsensitiveDict(headers)
+    response._content = body
+    response.url = url
+    return requests.exceptions.HTTPError(f"{status} Error: {reason} for url: {url}", response=response)
+
+
+class AsyncCoinGeckoClient(CoinGeckoClient):
+    '''
+    Same endpoints/params/headers surface as CoinGeckoClient, but run() returns an awaitable.
+
+    Requests are immutable, so several can be built and awaited together. All requests share one
+    aiohttp connection pool and the client's rate limiter and retry policy.
+
+    rate_limit_wait and retry_count are per thread, so every task of the event loop would share them: the
+    async client leaves them alone and reports each request's wait and retries on its hook event instead.
+
+    Example:
+        >>> async with AsyncCoinGeckoClient("your_api_key") as cg:
+        ...     price = await cg.endpoints.simple_price.params({"ids": "bitcoin", "vs_currencies": "usd"}).run()
+        ...     coins = await cg.gather_many([cg.endpoints.coins(id).run() for id in ids], concurrency=20)
+    '''
+    def __init__(self, API_Key = None, concurrency = config.ASYNC_CONCURRENCY, **kwargs) -> None:
+        super().__init__(API_Key, **kwargs)
+        self.concurrency = concurrency
+        if self.single_flight is not None:
+            self.single_flight = AsyncSingleFlight()
+
+    def __enter__(self):
+        raise TypeError(f'{self.__class__.__name__} must be used with "async with"')
+
+    async def __aenter__(self) -> "AsyncCoinGeckoClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        '''
+        Returns the aiohttp.ClientSession shared by every request of this client.
+
+        Built on first use inside the running event loop (and rebuilt after close()).
+        pool_maxsize caps open connections per host, pool_connections * pool_maxsize caps the total.
+
+        Returns: aiohttp.ClientSession
+        '''
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_connections * self.pool_maxsize, limit_per_host=self.pool_maxsize)
+            timeout = aiohttp.ClientTimeout(total=None, sock_connect=config.TIMEOUT, sock_read=config.TIMEOUT) # Same meaning as the timeout given to requests, so long streams are not cut off
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout, trace_configs=[_trace_config()])
+        return self._session
+
+    @property
+    def resolver(self):
+        ''' Not available on the async client: CoinResolver fetches and refreshes its index with blocking calls. '''
+        raise TypeError(f"{self.__class__.__name__} has no resolver, CoinResolver needs a blocking client: use CoinGeckoClient(...).resolver")
+
+    async def close(self) -> None:
+        ''' Closes the aiohttp session and its pooled connections. '''
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def execute(self, request, block = True, mode = "json"):
+        '''
+        Returns an awaitable that sends the Request and resolves to the decoded JSON (or None on error).
+
+        Args:
+            block: If True (default) wait for a rate limit token. If False, resolve to None when no token is free.
+            mode: "json" (default), "raw" for the body as bytes, or "response" for the aiohttp.ClientResponse
+                  (already read and released, so read()/text()/json() still work on it), or "numpy" for time series
+                  as NumPy columns (see columnar.to_columns), or "records" for compact record objects (see records.to_records)
+
+        Returns: Coroutine
+        '''
+        if mode not in config.RESPONSE_MODES:
+            raise ValueError(f"Unknown response mode {mode!r}, expected one of {config.RESPONSE_MODES}")
+        if mode == "numpy":
+            columnar.require_numpy()
+            return self._columns(self._request(request.endpoint, request.template, dict(request.query_params), self._headers(request), block, "json", self._slot(request)))
+        if mode == "records":
+            records.record_type(request.template) # Raises ValueError before anything is sent
+            return self._records(request.template, self._request(request.endpoint, request.template, dict(request.query_params), self._headers(request), block, "json", self._slot(request)))
+        return self._request(request.endpoint, request.template, dict(request.query_params), self._headers(request), block, mode, self._slot(request))
+
+    def _slot(self, request):
+        ''' Returns the scheduling.Slot of a call made now (its deadline counts from run()), None without a scheduler. '''
+        return self.scheduler.slot(request.template, request.priority, request.deadline) if self.scheduler is not None else None
+
+    @staticmethod
+    async def _columns(pending):
+        data = await pending
+        return None if data is None else columnar.to_columns(data)
+
+    @staticmethod
+    async def _records(template, pending):
+        data = await pending
+        return None if data is None else records.to_records(template, data)
+
+    def _headers(self, request) -> dict:
+        return {key: value for key, value in self.all_headers(request).items() if value is not None} # requests skips None headers, aiohttp raises on them
+
+    @staticmethod
+    def _params(params) -> dict:
+        return {key: str(value).lower() if isinstance(value, bool) else value for key, value in params.items()} # aiohttp rejects bools, requests sends them as text
+
+    async def _request(self, endpoint, template, params, headers, block, mode, slot = None):
+        if endpoint is None:
+            return self.report_error(AttributeError("No endpoint set for this request"))
+        ttl = self.cache.ttl(template) if self.cache is not None and mode != "response" else 0
+        if ttl:
+            cache_key = self.cache.key(endpoint, params)
+            cached = self.cache.get(cache_key, raw=mode == "raw")
+            if cached is not MISSING:
+                return cached
+        if self.single_flight is None or mode == "response":
+            return await self._fetch(endpoint, params, headers, block, template, ttl, mode, slot)
+        flight_key = (ResponseCache.key(endpoint, params), tuple(sorted(headers.items())), mode)
+        return await self.single_flight.do(flight_key, lambda: self._fetch(endpoint, params, headers, block, template, ttl, mode, slot))
+
+    async def _fetch(self, endpoint, params, headers, block, template, ttl, mode, slot = None):
+        request_headers = headers
+        if ttl:
+            cache_key = self.cache.key(endpoint, params)
+            request_headers = {**headers, **self.cache.validators(cache_key)}
+        weight = self.rate_limiter.weight(template)
+        key, wait = await self._take_token(weight, block, slot)
+        if key is False:
+            return None
+        self.retry_policy.record_request()
+        event = self.hooks.start(template, endpoint, params, wait) if self.hooks.active else None
+        try :
+            params = self._params(params)
+            response = await self._send(endpoint, request_headers, params, weight, event, key, slot)
+            if ttl and response.status == 304:
+                response.release()
+                data = self.cache.revalidated(cache_key, ttl, raw=mode == "raw")
+                if data is not MISSING:
+                    if event is not None:
+                        self.hooks.finish(event, 304, 0)
+                    return data
+                response = await self._send(endpoint, headers, params, weight, event, key, slot) # Entry vanished from disk since the request was sent, fetch it in full
+            async with response:
+                body = await response.read()
+            if event is not None:
+                self.hooks.finish(event, response.status, len(body))
+            if mode == "response":
+                return response
+            data = body if mode == "raw" else jsonlib.loads(body)
+            if ttl:
+                self.cache.set(cache_key, MISSING if mode == "raw" else data, body, ttl, response.headers)
+            return data
+        except (AttributeError, ValueError, asyncio.TimeoutError, aiohttp.ClientError, scheduling.DeadlineExceeded, requests.exceptions.RequestException) as error: # ValueError covers invalid JSON
+            if event is not None and event.error is not error: # Failed attempts were already reported by _send
+                self.hooks.fail(event, error)
+            return self.report_error(error)
+
+    async def _take_token(self, weight, block, slot = None):
+        '''
+        Takes a rate limit token, sleeping with asyncio, from the key pool's best key if the client has one,
+        through the scheduler's queue when a slot is given.
+
+        Returns: tuple : (key, seconds waited). key is the pooled ApiKey to send with (None without a key pool),
+                 False if block is False and no token is free, or if the slot's deadline cannot be met.
+        '''
+        if slot is not None:
+            if block:
+                try:
+                    grant, wait = await self.scheduler.acquire_async(weight, slot)
+                except scheduling.DeadlineExceeded as error:
+                    self.report_error(error)
+                    return False, 0.0
+            else:
+                grant, wait = self.scheduler.try_acquire(weight, slot), 0.0
+                if grant is None:
+                    print("Local rate limit reached. Please try again later or call run() with block=True.")
+                    return False, 0.0
+            return grant if self.key_pool is not None else None, wait
+        key = None
+        if block:
+            if self.key_pool is not None:
+                key, wait = self.key_pool.reserve(weight)
+            else:
+                wait = self.rate_limiter.reserve(weight)
+            await asyncio.sleep(wait)
+            return key, wait
+        if self.key_pool is not None:
+            key = self.key_pool.try_acquire(weight)
+            taken = key is not None
+        else:
+            taken = self.rate_limiter.try_acquire(weight)
+        if taken:
+            return key, 0.0
+        print("Local rate limit reached. Please try again later or call run() with block=True.")
+        return False, 0.0
+
+    async def _send(self, endpoint, headers, params, weight, event = None, key = None, slot = None) -> aiohttp.ClientResponse:
+        '''
+        GETs endpoint, retrying failed attempts according to self.retry_policy. Raises the last error (as a requests exception) if it gives up.
+
+        With an event (hooks registered), each attempt records its timings on it and each failed attempt fires on_error.
+        With a pooled key, a 401/429 sidelines it and the retry goes out straight away on another key (see CoinGeckoClient._send).
+        The retries and the retries' token waits are counted on the event, not on the client (see the class docstring).
+
+        Returns: aiohttp.ClientResponse : Body not read yet, the caller must read or release it.
+        '''
+        retries = 0
+        while True:
+            if event is not None:
+                event.dns = event.connect = 0.0
+                started = time.perf_counter()
+            try :
+                url, attempt_headers = (f"{self.base_url}{endpoint}", headers) if key is None else (f"{key.base_url}{endpoint}", {**headers, **key.headers})
+                response = await self.session.get(url, headers=attempt_headers, params=params, trace_request_ctx=event)
+                if event is not None:
+                    event.ttfb = time.perf_counter() - started
+                if response.status < 400:
+                    return response
+                async with response:
+                    body = await response.read()
+                raise _as_requests_error(response.status, response.reason, response.headers, body, str(response.url))
+            except asyncio.TimeoutError as timeout_error:
+                error = requests.exceptions.Timeout(str(timeout_error) or "Request timed out")
+            except aiohttp.ClientConnectionError as connection_error:
+                error = requests.exceptions.ConnectionError(str(connection_error))
+            except requests.exceptions.HTTPError as http_error:
+                error = http_error
+            switch = key is not None and self.key_pool.switch(key, error.response)
+            delay = 0.0 if switch else self.retry_policy.delay(error, retries)
+            if delay is not None and slot is not None and slot.expires_within(delay):
+                delay = None # The retry would start past the deadline
+            if event is not None:
+                self.hooks.fail(event, error, error.response.status_code if error.response is not None else None, delay is not None)
+            if delay is None: # Not retryable, out of attempts or out of retry budget
+                raise error
+            retries += 1
+            if client.test_debug :
+                print(f"Attempt {retries} failed ({error}), retrying in {delay:.2f} seconds")
+            if slot is not None:
+                await asyncio.sleep(delay)
+                grant, token_wait = await self.scheduler.acquire_async(weight, slot) # Raises DeadlineExceeded, reported by the caller
+                key = grant if self.key_pool is not None else None
+            else:
+                if key is not None:
+                    key, token_wait = self.key_pool.reserve(weight)
+                else:
+                    token_wait = self.rate_limiter.reserve(weight)
+                await asyncio.sleep(delay + token_wait)
+            if event is not None:
+                event.retries = retries
+                event.rate_limit_wait += token_wait
+
+    async def stream(self, request, path = None, chunk_size = config.STREAM_CHUNK_SIZE, block = True):
+        ''' Async generator version of CoinGeckoClient.stream. '''
+        if request.endpoint is None:
+            self.report_error(AttributeError("No endpoint set for this request"))
+            return
+        template = request.template
+        if path is None:
+            path = config.STREAM_ITEMS_KEY.get(template)
+        weight = self.rate_limiter.weight(template)
+        slot = self._slot(request)
+        key, wait = await self._take_token(weight, block, slot)
+        if key is False:
+            return
+        self.retry_policy.record_request()
+        event = self.hooks.start(template, request.endpoint, request.query_params, wait) if self.hooks.active else None
+        try :
+            response = await self._send(request.endpoint, self._headers(request), self._params(request.query_params), weight, event, key, slot)
+            if event is not None:
+                self.hooks.finish(event, response.status, None) # Fired when the headers arrive, the body is read by the caller
+            async with response:
+                decoder = streaming.ArrayStreamDecoder(path)
+                async for chunk in response.content.iter_chunked(chunk_size):
+                    for item in decoder.feed(chunk):
+                        yield item
+                for item in decoder.close():
+                    yield item
+        except (AttributeError, ValueError, asyncio.TimeoutError, aiohttp.ClientError, scheduling.DeadlineExceeded, requests.exceptions.RequestException) as error: # ValueError covers invalid or truncated JSON
+            if event is not None and event.error is not error:
+                self.hooks.fail(event, error)
+            self.report_error(error)
+
+    async def iter_pages(self, request, start_page = 1, max_pages = None, prefetch = True):
+        ''' Async generator version of CoinGeckoClient.iter_pages, the next page is prefetched as an asyncio task. '''
+        template = request.template
+        size = pagination.page_size(template, request.query_params)
+
+        async def fetch(page):
+            for _ in range(1 + config.PAGE_RETRY_ROUNDS):
+                data = await request.params({'page': page}).run()
+                if data is not None:
+                    return pagination.page_items(template, data)
+            raise pagination.PageFetchError(page)
+
+        page = start_page
+        pending = asyncio.ensure_future(fetch(page)) if prefetch else None
+        try:
+            while True:
+                items = await pending if prefetch else await fetch(page)
+                if not items:
+                    return
+                last = (size is not None and len(items) < size) or (max_pages is not None and page - start_page + 1 >= max_pages)
+                if prefetch and not last:
+                    pending = asyncio.ensure_future(fetch(page + 1))
+                yield items
+                if last:
+                    return
+                page += 1
+        finally:
+            if pending is not None and not pending.done():
+                pending.cancel()
+            elif pending is not None and not pending.cancelled():
+                pending.exception() # Retrieves the error of a prefetched page the caller never reached, or asyncio logs it
+
+    async def iter_items(self, request, max_items = None, start_page = 1, prefetch = True):
+        ''' Async generator version of CoinGeckoClient.iter_items. '''
+        if max_items is not None and max_items <= 0:
+            return
+        size = pagination.page_size(request.template, request.query_params)
+        max_pages = math.ceil(max_items / size) if max_items is not None and size else None
+        count = 0
+        async for items in self.iter_pages(request, start_page, max_pages, prefetch):
+            for item in items:
+                yield item
+                count += 1
+                if max_items is not None and count >= max_items:
+                    return
+
+    async def fetch_pages(self, request, first_page = 1, last_page = None, concurrency = None) -> pagination.PageScan:
+        ''' Async version of CoinGeckoClient.fetch_pages, each wave is fetched with asyncio.gather. Latencies include rate limiter waits. '''
+        template = request.template
+        size = pagination.page_size(template, request.query_params)
+        workers = concurrency or self.concurrency
+        pages, latencies, failed = {}, {}, []
+
+        async def fetch(page):
+            start = time.perf_counter()
+            data = await request.params({'page': page}).run()
+            latencies[page] = time.perf_counter() - start
+            if data is None:
+                failed.append(page)
+            else:
+                pages[page] = pagination.page_items(template, data)
+
+        page = first_page
+        failed_waves = 0
+        while last_page is None or page <= last_page:
+            wave = range(page, page + workers if last_page is None else min(page + workers, last_page + 1))
+            await asyncio.gather(*(fetch(number) for number in wave))
+            page = wave.stop
+            if any(number in pages and pagination.is_last_page(pages[number], size) for number in wave):
+                break
+            failed_waves = 0 if any(number in pages for number in wave) else failed_waves + 1
+            if last_page is None and failed_waves >= config.PAGE_FAILED_WAVES: # Nothing tells where the end is, leave the rest to the retry rounds
+                break
+        for _ in range(config.PAGE_RETRY_ROUNDS):
+            end = min((number for number, items in pages.items() if pagination.is_last_page(items, size)), default=None)
+            retry = [number for number in failed if end is None or number < end]
+            if not retry:
+                break
+            failed.clear()
+            await asyncio.gather(*(fetch(number) for number in retry))
+        return pagination.merge_pages(pages, size, latencies, failed)
+
+    async def backfill_market_chart(self, id, start, end, vs_currency = "usd", granularity = "hourly", params = None, concurrency = None, checkpoint_dir = config.BACKFILL_CHECKPOINT_DIR) -> "backfill.BackfillResult":
+        ''' Async version of CoinGeckoClient.backfill_market_chart, the windows are fetched with gather_many. '''
+        start, end, chunks, checkpoint, done, request = self._backfill_plan(id, start, end, vs_currency, granularity, params, checkpoint_dir)
+        missing = [chunk for chunk in chunks if chunk not in done]
+
+        async def fetch(chunk):
+            data = await request.params({"from": chunk[0], "to": chunk[1]}).run()
+            if data is not None and checkpoint is not None:
+                checkpoint.save(chunk, data)
+            return data
+
+        for _ in range(1 + config.BACKFILL_RETRY_ROUNDS):
+            if not missing:
+                break
+            results = await self.gather_many([fetch(chunk) for chunk in missing], concurrency)
+            done.update((chunk, data) for chunk, data in zip(missing, results) if data is not None)
+            missing = [chunk for chunk, data in zip(missing, results) if data is None]
+        return self._backfill_result(start, end, chunks, checkpoint, done, missing)
+
+    def time_series(self, directory = config.TIMESERIES_DIR, granularity = "hourly"):
+        ''' Not available on the async client: TimeSeriesStore refreshes with blocking backfills. '''
+        raise TypeError(f"{self.__class__.__name__} cannot back a time-series store, TimeSeriesStore needs a blocking client: use CoinGeckoClient(...).time_series()")
+
+    async def simple_price_many(self, ids, params, concurrency = None) -> dict:
+        ''' Async version of CoinGeckoClient.simple_price_many, the chunks are fetched with gather_many. '''
+        request = self.endpoints.simple_price.params(params)
+        return merge_results(await self.gather_many([request.params({'ids': chunk}) for chunk in chunk_values(ids)], concurrency))
+
+    async def simple_token_price_many(self, id, contract_addresses, params, concurrency = None) -> dict:
+        ''' Async version of CoinGeckoClient.simple_token_price_many, the chunks are fetched with gather_many. '''
+        request = self.endpoints.simple_token_price(id).params(params)
+        chunks = chunk_values(contract_addresses, max_items=config.BATCH_MAX_ADDRESSES)
+        return merge_results(await self.gather_many([request.params({'contract_addresses': chunk}) for chunk in chunks], concurrency))
+
+    async def run_many(self, requests, concurrency = None, mode = "json") -> list:
+        ''' Async version of CoinGeckoClient.run_many, the requests are run with gather_many instead of a thread pool. '''
+        return await self.gather_many([request.run(mode=mode) for request in requests], concurrency)
+
+    async def gather_many(self, calls, concurrency = None) -> list:
+        '''
+        Runs many Requests (or awaitables from run()) concurrently and returns their results in the same order.
+
+        At most concurrency requests are in flight at once (defaults to self.concurrency), and all of
+        them still go through the client's shared rate limiter.
+
+        Args:
+            calls: Iterable of Request objects or awaitables returned by run()
+            concurrency: Max requests in flight at once
+
+        Returns: list
+        '''
+        semaphore = asyncio.Semaphore(concurrency or self.concurrency)
+
+        async def limited(call):
+            async with semaphore:
+                return await (call.run() if isinstance(call, Request) else call)
+
+        return await asyncio.gather(*(limited(call) for call in calls))
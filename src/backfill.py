@@ -0,0 +1,141 @@
+''' Chunked, resumable historical backfill over /coins/{id}/market_chart/range '''
+
+import hashlib, json, os, threading, jsonlib
+from datetime import datetime, timezone
+
+
+SERIES = ('prices', 'market_caps', 'total_volumes')
+
+
+def to_seconds(value) -> int:
+    ''' Returns a UNIX timestamp in seconds from a number, a datetime or an ISO date string ("2024-01-31", naive values are UTC). '''
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        value = value.timestamp()
+    return int(value)
+
+
+def file_name(value) -> str:
+    ''' Returns value with every character that is not safe in a file name replaced by "_". '''
+    return ''.join(char if char.isalnum() or char in '-_.' else '_' for char in str(value)).lstrip('.')
+
+
+def plan_chunks(start, end, low, high) -> list:
+    '''
+    Splits [start, end] into the fewest (from, to) windows the API answers at the wanted granularity.
+
+    Each window spans at most high seconds. The API picks the granularity from the window length, so a window
+    that would be too short (low seconds or less) is widened backwards, the overlap is removed when stitching.
+
+    Example:
+        >>> plan_chunks(0, 200 * 86400, *config.BACKFILL_SPANS["hourly"])   # 90-day windows keep hourly data
+        [(0, 7776000), (7776000, 15552000), (15552000, 17280000)]
+    '''
+    chunks = []
+    chunk_start = start
+    while chunk_start < end:
+        chunk_end = min(chunk_start + high, end)
+        chunks.append((min(chunk_start, chunk_end - low - 86400) if low else chunk_start, chunk_end)) # One day of margin above the granularity threshold
+        chunk_start = chunk_end
+    return chunks
+
+
+def stitch(chunks, start, end) -> dict:
+    '''
+    Joins chunk responses into one market_chart response: points sorted by time, duplicates (from overlapping
+    windows) dropped and points outside [start, end] cut off.
+
+    Args:
+        chunks: Decoded responses in any order
+        start, end: UNIX seconds, the API's timestamps are milliseconds
+
+    Returns: dict : {"prices": [[t, v], ...], "market_caps": [...], "total_volumes": [...]}
+    '''
+    merged = {name: {} for name in SERIES}
+    for data in chunks:
+        for name, points in data.items():
+            series = merged.setdefault(name, {})
+            for point in points:
+                if start * 1000 <= point[0] <= end * 1000:
+                    series[point[0]] = point
+    return {name: [series[stamp] for stamp in sorted(series)] for name, series in merged.items()}
+
+
+class Checkpoint:
+    '''
+    Append-only progress file of one backfill: one JSON line per finished chunk.
+
+    Each line is flushed and synced as soon as its chunk arrives, so a job that is killed loses at most the
+    chunks in flight. A last line cut off by the kill is ignored on load.
+    '''
+    def __init__(self, path) -> None:
+        self.path = os.path.expanduser(path)
+        self.lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.path!r})'
+
+    def load(self) -> dict:
+        ''' Returns the chunks saved so far as {(from, to): data}. '''
+        done = {}
+        if not os.path.exists(self.path):
+            return done
+        with open(self.path, 'rb') as file:
+            for line in file:
+                try:
+                    entry = jsonlib.loads(line)
+                except ValueError: # Partial line written when the job was killed
+                    continue
+                done[tuple(entry['chunk'])] = entry['data']
+        return done
+
+    def save(self, chunk, data) -> None:
+        line = jsonlib.dumps({'chunk': list(chunk), 'data': data}) + b'\n'
+        with self.lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'ab') as file:
+                file.write(line)
+                file.flush()
+                os.fsync(file.fileno())
+
+    def remove(self) -> None:
+        with self.lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    @classmethod
+    def for_job(cls, directory, id, params) -> "Checkpoint":
+        ''' Returns the checkpoint of a backfill, named after the coin id and a hash of every param that shapes the result. '''
+        digest = hashlib.sha1(json.dumps([id, params], sort_keys=True).encode()).hexdigest()[:16]
+        return cls(os.path.join(directory, f'{file_name(id)}-{digest}.jsonl'))
+
+
+class BackfillResult:
+    '''
+    Result of CoinGeckoClient.backfill_market_chart.
+
+    Attributes:
+        data: Stitched response, same shape as /market_chart/range ({"prices": [[t, v], ...], ...}), so it can go to columnar.to_columns
+        chunks: (from, to) windows the range was split into
+        failed_chunks: Windows that still failed after the retries, their points are missing (run again to resume them)
+        checkpoint: Path of the progress file, None once the backfill is complete and the file was removed
+    '''
+    __slots__ = ('data', 'chunks', 'failed_chunks', 'checkpoint')
+
+    def __init__(self, data, chunks, failed_chunks, checkpoint) -> None:
+        self.data = data
+        self.chunks = chunks
+        self.failed_chunks = failed_chunks
+        self.checkpoint = checkpoint
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({len(self.data.get("prices", []))} prices, {len(self.chunks)} chunks, failed={self.failed_chunks})'
+
+    @property
+    def complete(self) -> bool:
+        return not self.failed_chunks
@@ -0,0 +1,114 @@
+''' Chunking of long id/address lists and micro-batching of single price lookups for /simple/price and /simple/token_price '''
+
+import threading, time, config
+from urllib.parse import quote
+
+
+def chunk_values(values, max_chars = config.BATCH_MAX_URL_CHARS, max_items = config.BATCH_MAX_IDS) -> list:
+    '''
+    Splits ids/addresses into comma-separated strings that each fit in one URL.
+
+    Each chunk holds at most max_items values and at most max_chars characters once URL-encoded
+    (commas count as %2C). Duplicates and blanks are dropped, the original order is kept.
+
+    Args:
+        values: List of ids/addresses, or one comma-separated string
+
+    Returns: list[str]
+
+    Example:
+        >>> chunk_values(["bitcoin", "ethereum", "solana"], max_items=2)
+        ['bitcoin,ethereum', 'solana']
+    '''
+    if isinstance(values, str):
+        values = values.split(',')
+    chunks, current, length = [], [], 0
+    for value in dict.fromkeys(value.strip() for value in values): # Keeps order, drops duplicates
+        if not value:
+            continue
+        size = len(quote(value, safe='')) + (3 if current else 0)
+        if current and (len(current) >= max_items or length + size > max_chars):
+            chunks.append(','.join(current))
+            current, length = [], 0
+            size -= 3
+        current.append(value)
+        length += size
+    if current:
+        chunks.append(','.join(current))
+    return chunks
+
+
+def merge_results(results) -> dict:
+    ''' Merges the dicts returned for each chunk into one, skipping chunks that failed (None). '''
+    merged = {}
+    for result in results:
+        if result:
+            merged.update(result)
+    return merged
+
+
+class _Batch:
+    __slots__ = ('values', 'done', 'result', 'error')
+
+    def __init__(self) -> None:
+        self.values = []
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class PriceBatcher:
+    '''
+    Collects single-coin price lookups made by many threads over a short window and sends them as one request.
+
+    The first get() in a window waits window seconds, then fetches every id asked for in the meantime
+    with CoinGeckoClient.simple_price_many (or simple_token_price_many when platform is given).
+    Each caller gets back only the entry for its own id (None if the API did not return it).
+
+    Example:
+        >>> batcher = PriceBatcher(cg, {"vs_currencies": "usd"}, window=0.005)
+        >>> batcher.get("bitcoin")   # Called from many threads at once -> one /simple/price call
+        {'usd': 67187.34}
+    '''
+    def __init__(self, client, params, window = config.BATCH_WINDOW, platform = None) -> None:
+        self.client = client
+        self.params = dict(params)
+        self.window = window
+        self.platform = platform
+        self.lock = threading.Lock()
+        self.batch = None
+        self.requests_sent = 0
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(window={self.window}, platform={self.platform!r})'
+
+    def _fetch(self, values) -> dict:
+        self.requests_sent += 1
+        if self.platform is None:
+            return self.client.simple_price_many(values, self.params)
+        return self.client.simple_token_price_many(self.platform, values, self.params)
+
+    def get(self, value):
+        ''' Returns the price entry for one coin id (or contract address), batched with other concurrent calls. '''
+        with self.lock:
+            batch = self.batch
+            leader = batch is None
+            if leader:
+                batch = self.batch = _Batch()
+            batch.values.append(value)
+        if leader:
+            time.sleep(self.window)
+            with self.lock:
+                self.batch = None # Later calls start a new batch
+            try:
+                batch.result = self._fetch(batch.values)
+            except Exception as error:
+                batch.error = error
+            finally:
+                batch.done.set()
+        else:
+            batch.done.wait()
+        if batch.error is not None:
+            raise batch.error
+        key = value if self.platform is None else value.lower() # The API returns contract addresses lowercased
+        return batch.result.get(key)
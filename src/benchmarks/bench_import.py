@@ -0,0 +1,71 @@
+''' Benchmark: cold start of "import client" and of building a first Request, with budgets that fail the run when they regress
+
+Run from the src folder:
+    python benchmarks/bench_import.py
+
+Every measurement runs in a fresh interpreter (python -X importtime), the median of RUNS is compared to the budget.
+The run also fails if "import client" loads one of the HEAVY modules, which must only load on first use (see lazy.py).
+Exits with status 1 on any failure, so it can run in CI.
+'''
+
+import os, statistics, subprocess, sys
+
+SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RUNS = 7
+IMPORT_BUDGET_MS = 30 # "import client", about 5 ms today (it was about 180 ms with requests, dotenv and the endpoint tables loaded eagerly)
+FIRST_REQUEST_BUDGET_MS = 80 # Import, CoinGeckoClient() and a first Request (loads .env and the endpoint registry), about 25 ms today
+
+HEAVY = ('requests', 'urllib3', 'dotenv', 'asyncio', 'numpy', 'sqlite3', 'inspect', 'concurrent.futures', 'orjson', 'email.utils', 'endpoints', 'params')
+
+FIRST_REQUEST = '''
+import time
+start = time.perf_counter()
+import client
+client.CoinGeckoClient().endpoints.coins_markets.params({"vs_currency": "usd"})
+print((time.perf_counter() - start) * 1000)
+'''
+
+LOADED = '''
+import sys, client
+print(" ".join(sorted(sys.modules)))
+'''
+
+
+def python(code, *flags) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *flags, '-c', code], cwd=SRC, capture_output=True, text=True, check=True)
+
+
+def import_time_ms() -> float:
+    ''' Returns the cumulative time of "import client" reported by -X importtime, in milliseconds. '''
+    for line in python('import client', '-X', 'importtime').stderr.splitlines():
+        fields = line.split('|')
+        if len(fields) == 3 and fields[2].strip() == 'client':
+            return int(fields[1]) / 1000
+    raise RuntimeError('client not found in the -X importtime output')
+
+
+def main():
+    failures = []
+    imports = statistics.median(import_time_ms() for _ in range(RUNS))
+    first = statistics.median(float(python(FIRST_REQUEST).stdout) for _ in range(RUNS))
+    loaded = set(python(LOADED).stdout.split())
+    heavy = [name for name in HEAVY if name in loaded]
+
+    print(f"median of {RUNS} fresh interpreters\n")
+    for label, value, budget in (("import client", imports, IMPORT_BUDGET_MS), ("first Request", first, FIRST_REQUEST_BUDGET_MS)):
+        status = "ok" if value <= budget else "OVER BUDGET"
+        print(f"{label:<14} {value:7.1f} ms   budget {budget:4d} ms   {status}")
+        if value > budget:
+            failures.append(label)
+    print(f"{'heavy modules':<14} {', '.join(heavy) or 'none'} loaded by import client")
+    if heavy:
+        failures.append("heavy modules")
+
+    if failures:
+        print(f"\nFAILED: {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+''' Benchmark: parse time of real API payloads with each installed JSON backend, and the cost skipped by mode="raw"
+
+Run from the src folder:
+    python benchmarks/bench_json.py             # Uses payloads saved in benchmarks/payloads
+    python benchmarks/bench_json.py --capture   # Saves fresh payloads first (needs network, uses API_KEY from .env)
+
+When no payloads have been captured, synthetic payloads shaped like /coins/markets and /token_lists are used.
+'''
+
+import json, os, random, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # Makes client/config importable when run as a script
+
+import jsonlib
+
+
+PAYLOAD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "payloads")
+REPEAT = 20 # Parses per payload and backend, the best time is reported
+
+
+def capture():
+    ''' Fetches a few typical responses (small, list-heavy, deeply nested) in raw mode and saves them to PAYLOAD_DIR. '''
+    from client import CoinGeckoClient, test_api_key
+    os.makedirs(PAYLOAD_DIR, exist_ok=True)
+    with CoinGeckoClient(test_api_key, cache=False) as cg:
+        requests = {
+            "simple_price": cg.endpoints.simple_price.params({"ids": "bitcoin,ethereum,solana", "vs_currencies": "usd,eur"}),
+            "coins_markets": cg.endpoints.coins_markets.params({"vs_currency": "usd", "per_page": 250}),
+            "coins_bitcoin": cg.endpoints.coins("bitcoin"),
+            "coins_list": cg.endpoints.coins_list.params({"include_platform": True}),
+            "token_lists_ethereum": cg.endpoints.token_lists("ethereum"),
+        }
+        for name, request in requests.items():
+            body = request.run(mode="raw")
+            if body is None:
+                continue
+            with open(os.path.join(PAYLOAD_DIR, f"{name}.json"), "wb") as file:
+                file.write(body)
+            print(f"captured {name:<22} {len(body) / 1024:9.1f} KB")
+
+
+def synthetic_payloads() -> dict:
+    ''' Payloads with the shape and value mix of real responses, for when nothing has been captured. '''
+    rng = random.Random(0)
+    markets = [{"id": f"coin-{i}", "symbol": f"c{i}", "name": f"Coin {i}", "image": f"https://assets.coingecko.com/coins/images/{i}/large/coin.png",
+                "current_price": rng.uniform(0.001, 70000), "market_cap": rng.randint(10**6, 10**12), "market_cap_rank": i + 1,
+                "total_volume": rng.uniform(1e4, 1e10), "high_24h": rng.uniform(0.001, 70000), "low_24h": rng.uniform(0.001, 70000),
+                "price_change_percentage_24h": rng.uniform(-20, 20), "circulating_supply": rng.uniform(1e6, 1e12), "total_supply": None,
+                "ath": rng.uniform(0.001, 70000), "ath_date": "2024-03-14T07:10:36.635Z", "roi": None, "last_updated": "2024-06-01T12:00:00.000Z"}
+               for i in range(250)]
+    tokens = {"name": "CoinGecko", "logoURI": "https://www.coingecko.com/assets/thumbnail.png", "keywords": ["defi"], "timestamp": "2024-06-01T00:00:00.000+00:00",
+              "tokens": [{"chainId": 1, "address": "0x" + "%040x" % rng.getrandbits(160), "name": f"Token {i}", "symbol": f"T{i}", "decimals": 18,
+                          "logoURI": f"https://assets.coingecko.com/coins/images/{i}/thumb/token.png"} for i in range(20000)]}
+    price = {f"coin-{i}": {"usd": rng.uniform(0.001, 70000), "eur": rng.uniform(0.001, 70000)} for i in range(3)}
+    return {name: json.dumps(value).encode() for name, value in {"simple_price": price, "coins_markets": markets, "token_lists_ethereum": tokens}.items()}
+
+
+def load_payloads() -> dict:
+    if os.path.isdir(PAYLOAD_DIR):
+        payloads = {}
+        for name in sorted(os.listdir(PAYLOAD_DIR)):
+            if name.endswith(".json"):
+                with open(os.path.join(PAYLOAD_DIR, name), "rb") as file:
+                    payloads[name[:-5]] = file.read()
+        if payloads:
+            return payloads
+    print("No captured payloads, using synthetic ones (run with --capture to use real responses)\n")
+    return synthetic_payloads()
+
+
+def best_time(loads, body) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        loads(body)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    if "--capture" in sys.argv:
+        capture()
+    payloads = load_payloads()
+    backends = []
+    for name in jsonlib.BACKENDS:
+        try:
+            jsonlib.use(name)
+        except ImportError:
+            continue
+        backends.append((name, jsonlib.loads))
+    jsonlib.use("auto")
+
+    print(f"{'payload':<22} {'size':>10}  " + "  ".join(f"{name:>14}" for name, _ in backends) + "  speedup")
+    for payload, body in payloads.items():
+        times = {name: best_time(loads, body) for name, loads in backends}
+        columns = "  ".join(f"{times[name] * 1000:11.3f} ms" for name, _ in backends)
+        fastest = min(times.values())
+        print(f"{payload:<22} {len(body) / 1024:7.1f} KB  {columns}  {times['json'] / fastest:6.2f}x")
+    print(f'\nmode="raw" skips the parse entirely, "auto" currently picks {jsonlib.backend}')
+
+
+if __name__ == "__main__":
+    main()
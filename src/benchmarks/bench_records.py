@@ -0,0 +1,87 @@
+''' Benchmark: memory held by /coins/markets rows, tickers and onchain pools as plain dicts vs records.Record objects
+
+Run from the src folder:
+    python benchmarks/bench_records.py
+
+Payloads are synthetic but follow the real field sets and value types (markets rows carry a 7-day sparkline).
+'''
+
+import gc, os, random, sys, time, tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # Makes client/config importable when run as a script
+
+import jsonlib
+from records import MarketRow, Pool, Ticker
+
+
+ROWS = 50_000
+
+
+def market_row(rng, i) -> dict:
+    price = rng.uniform(0.001, 70000)
+    return {"id": f"coin-{i}", "symbol": f"c{i}", "name": f"Coin {i}", "image": f"https://coin-images.coingecko.com/coins/images/{i}/large/coin.png",
+            "current_price": price, "market_cap": rng.randint(10**6, 10**12), "market_cap_rank": i + 1, "fully_diluted_valuation": rng.randint(10**6, 10**12),
+            "total_volume": rng.uniform(1e4, 1e10), "high_24h": price * 1.02, "low_24h": price * 0.98, "price_change_24h": rng.uniform(-100, 100),
+            "price_change_percentage_24h": rng.uniform(-20, 20), "market_cap_change_24h": rng.uniform(-1e9, 1e9), "market_cap_change_percentage_24h": rng.uniform(-20, 20),
+            "circulating_supply": rng.uniform(1e6, 1e12), "total_supply": rng.uniform(1e6, 1e12), "max_supply": None, "ath": price * 2,
+            "ath_change_percentage": rng.uniform(-99, 0), "ath_date": "2024-03-14T07:10:36.635Z", "atl": price / 100, "atl_change_percentage": rng.uniform(0, 1e5),
+            "atl_date": "2015-10-20T00:00:00.000Z", "roi": {"times": rng.uniform(0, 100), "currency": "usd", "percentage": rng.uniform(0, 1e4)} if i % 10 == 0 else None,
+            "last_updated": "2024-06-01T12:00:00.000Z", "sparkline_in_7d": {"price": [price * rng.uniform(0.9, 1.1) for _ in range(168)]},
+            "price_change_percentage_1h_in_currency": rng.uniform(-5, 5)}
+
+
+def ticker(rng, i) -> dict:
+    last = rng.uniform(0.001, 70000)
+    return {"base": f"C{i}", "target": "USDT", "market": {"name": f"Exchange {i % 500}", "identifier": f"exchange-{i % 500}", "has_trading_incentive": False},
+            "last": last, "volume": rng.uniform(1, 1e8), "converted_last": {"btc": last / 67000, "eth": last / 3500, "usd": last},
+            "converted_volume": {"btc": rng.uniform(0, 1e4), "eth": rng.uniform(0, 1e5), "usd": rng.uniform(0, 1e9)}, "trust_score": "green",
+            "bid_ask_spread_percentage": rng.uniform(0, 1), "timestamp": "2024-06-01T12:00:00+00:00", "last_traded_at": "2024-06-01T12:00:00+00:00",
+            "last_fetch_at": "2024-06-01T12:00:00+00:00", "is_anomaly": False, "is_stale": False, "trade_url": f"https://exchange-{i % 500}.com/trade/C{i}_USDT",
+            "token_info_url": None, "coin_id": f"coin-{i}", "target_coin_id": "tether"}
+
+
+def pool(rng, i) -> dict:
+    address = "0x" + "%040x" % rng.getrandbits(160)
+    changes = {key: f"{rng.uniform(-20, 20):.3f}" for key in ("m5", "h1", "h6", "h24")}
+    return {"id": f"eth_{address}", "type": "pool",
+            "attributes": {"base_token_price_usd": f"{rng.uniform(0, 5000):.12f}", "base_token_price_native_currency": f"{rng.uniform(0, 2):.12f}",
+                           "quote_token_price_usd": f"{rng.uniform(0, 5000):.12f}", "address": address, "name": f"T{i} / WETH 0.3%",
+                           "pool_created_at": "2024-01-01T00:00:00Z", "fdv_usd": f"{rng.uniform(0, 1e9):.4f}", "market_cap_usd": None,
+                           "price_change_percentage": changes, "transactions": {key: {"buys": rng.randint(0, 999), "sells": rng.randint(0, 999),
+                           "buyers": rng.randint(0, 999), "sellers": rng.randint(0, 999)} for key in ("m5", "m15", "m30", "h1", "h24")},
+                           "volume_usd": {key: f"{rng.uniform(0, 1e7):.4f}" for key in ("m5", "h1", "h6", "h24")}, "reserve_in_usd": f"{rng.uniform(0, 1e8):.4f}"},
+            "relationships": {"base_token": {"data": {"id": f"eth_0x{i:040x}", "type": "token"}}, "quote_token": {"data": {"id": "eth_0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2", "type": "token"}},
+                              "dex": {"data": {"id": "uniswap_v3", "type": "dex"}}}}
+
+
+def retained(build) -> tuple:
+    ''' Returns (bytes still allocated by what build() returns, seconds it takes). Timed without tracemalloc, which slows allocations down. '''
+    gc.collect()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    del result
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size, elapsed
+
+
+def main():
+    rng = random.Random(0)
+    shapes = [("markets rows", MarketRow, market_row), ("tickers", Ticker, ticker), ("onchain pools", Pool, pool)]
+    print(f"{ROWS} items each, JSON backend {jsonlib.backend}\n")
+    print(f"{'shape':<14} {'dicts':>13} {'records':>13} {'saved':>6}  {'build dicts':>11}  {'build records':>13}")
+    for label, record_type, make in shapes:
+        body = jsonlib.dumps([make(rng, i) for i in range(ROWS)]) # Same bytes as a captured response, decoded fresh each time
+        dicts, dict_time = retained(lambda: jsonlib.loads(body))
+        records, record_time = retained(lambda: record_type.from_page(jsonlib.loads(body)))
+        print(f"{label:<14} {dicts / ROWS:7.0f} B/item {records / ROWS:7.0f} B/item {1 - records / dicts:6.0%}  {dict_time:10.3f}s  {record_time:12.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+''' Benchmark: cold requests.get calls vs pooled CoinGeckoClient.run calls against a local stand-in server
+
+Run from the src folder:
+    python benchmarks/bench_session.py
+'''
+
+import json, os, sys, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # Makes client/config importable when run as a script
+
+import requests
+from client import CoinGeckoClient
+from ratelimit import RateLimiter
+
+
+CALLS = 500
+PAYLOAD = json.dumps({"gecko_says": "(V3) To the Moon!"}).encode()
+
+
+class PingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # Needed so the server keeps connections alive between requests
+    disable_nagle_algorithm = True # Headers and body are separate writes, avoids a delayed-ACK stall on reused sockets
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(PAYLOAD)))
+        self.end_headers()
+        self.wfile.write(PAYLOAD)
+
+    def log_message(self, format, *args): # Silences the default per-request logging
+        pass
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<8} {CALLS} calls in {elapsed:.3f}s  ({elapsed / CALLS * 1000:.3f} ms/call)")
+    return elapsed
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/api/v3"
+
+    try:
+        cold = timed("cold", lambda: requests.get(f"{base_url}/ping", timeout=5).json())
+
+        with CoinGeckoClient(rate_limiter=RateLimiter(rate_per_minute=None)) as cg: # Local server, no quota to protect
+            cg.base_url = base_url
+            pooled = timed("pooled", lambda: cg.endpoints.ping.run())
+
+        print(f"speedup  {cold / pooled:.2f}x")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
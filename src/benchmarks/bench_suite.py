@@ -0,0 +1,260 @@
+''' Benchmark suite: client hot paths against a local stand-in server, results saved as JSON to compare across commits
+
+Run from the src folder:
+    python benchmarks/bench_suite.py                                  # Saves benchmarks/results/<commit>.json
+    python benchmarks/bench_suite.py --compare benchmarks/results/abc1234.json   # Also prints the change against an earlier run
+    python benchmarks/bench_suite.py --capture                        # Records the large payloads first (needs network, uses API_KEY from .env)
+
+Measured:
+    run.sequential / run.threaded / run.async   requests per second, p50 and p99 latency of CoinGeckoClient.run
+    cache.miss / cache.hit                      the same with the response cache on, every call a miss or a hit
+    decode.<payload>                            JSON decode time of /coins/list, /coins/markets (per_page=250, sparkline) and /derivatives
+    pagination                                  items per second through iter_items over a stand-in with PAGINATION_ITEMS markets rows
+    memory                                      bytes held by 10k decoded market rows, as dicts and as records.MarketRow
+
+The server answers with no added latency and runs in this process, so the numbers are the client's own overhead plus
+loopback HTTP, and the threaded ones include the server's share of the GIL.
+Payloads recorded in the stand-in fixture directory (see standin.Recorder) are used when present, synthetic ones otherwise.
+With --compare, the run exits with status 1 if a metric got worse by more than REGRESSION_TOLERANCE.
+'''
+
+import argparse, asyncio, json, os, platform, random, statistics, subprocess, sys, time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # Makes client/config importable when run as a script
+
+import jsonlib, standin
+from async_client import AsyncCoinGeckoClient
+from bench_records import market_row, retained
+from cache import ResponseCache
+from client import CoinGeckoClient
+from ratelimit import RateLimiter
+from records import MarketRow
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+CALLS = 1000 # Requests per run.* and cache.* measurement
+WORKERS = 16 # Threads for run.threaded, requests in flight for run.async
+DECODE_REPEAT = 20 # Decodes per payload, the median is reported
+PAGINATION_ITEMS = 20_000 # Markets rows served across the pages of the pagination measurement
+MEMORY_ROWS = 10_000
+REGRESSION_TOLERANCE = 0.15 # Relative change of a metric, in its worse direction, reported as a regression by --compare
+
+MARKETS_PARAMS = {"vs_currency": "usd", "per_page": 250, "sparkline": True}
+CAPTURED = { # Payload name -> (template, path, params) recorded by --capture and decoded by decode.<name>
+    "coins_list": ("/coins/list", "/coins/list", {"include_platform": True}),
+    "coins_markets": ("/coins/markets", "/coins/markets", MARKETS_PARAMS),
+    "derivatives": ("/derivatives", "/derivatives", {}),
+}
+HIGHER_IS_BETTER = ("requests_per_s", "items_per_s", "pages_per_s", "mb_per_s")
+
+
+def synthetic_payloads() -> dict:
+    ''' Bodies with the shape of the captured payloads, for when nothing has been recorded. '''
+    rng = random.Random(0)
+    coins = [{"id": f"coin-{i}", "symbol": f"c{i}", "name": f"Coin {i}",
+              "platforms": {"ethereum": "0x" + "%040x" % rng.getrandbits(160)} if i % 3 == 0 else {}} for i in range(17_000)]
+    markets = [market_row(rng, i) for i in range(250)]
+    derivatives = [{"market": f"Exchange {i % 80} (Futures)", "symbol": f"C{i}USDT", "index_id": f"C{i}", "price": f"{rng.uniform(0.001, 70000):.8f}",
+                    "price_percentage_change_24h": rng.uniform(-20, 20), "contract_type": "perpetual", "index": rng.uniform(0.001, 70000),
+                    "basis": rng.uniform(-1, 1), "spread": rng.uniform(0, 1), "funding_rate": rng.uniform(-0.1, 0.1), "open_interest": rng.uniform(0, 1e9),
+                    "volume_24h": rng.uniform(0, 1e10), "last_traded_at": 1717243200, "expired_at": None} for i in range(18_000)]
+    return {name: jsonlib.dumps(value) for name, value in {"coins_list": coins, "coins_markets": markets, "derivatives": derivatives}.items()}
+
+
+def load_payloads() -> tuple:
+    ''' Returns ({name: body}, {name: "captured" or "synthetic"}), captured bodies taken from the stand-in fixture directory. '''
+    payloads, sources = synthetic_payloads(), {}
+    fixtures = standin.load_fixtures()
+    for name, (template, path, params) in CAPTURED.items():
+        wanted = {key: str(value) for key, value in params.items()}
+        sources[name] = "synthetic"
+        for fixture in fixtures.get(template, ()):
+            if fixture['status'] == 200 and fixture['path'] == path and fixture['params'] == wanted:
+                payloads[name], sources[name] = fixture['body'].encode('utf-8'), "captured"
+    return payloads, sources
+
+
+def capture():
+    ''' Records the CAPTURED requests into the stand-in fixture directory. '''
+    import client
+    with CoinGeckoClient(client.test_api_key, cache=False) as cg:
+        recorder = standin.Recorder(cg)
+        for name, (template, path, params) in CAPTURED.items():
+            saved = recorder.record(cg.request(path).params(params))
+            print(f"{'captured' if saved else 'FAILED  '} {name}")
+
+
+def fixture(template, path, body, params = None) -> dict:
+    return {'template': template, 'path': path, 'params': params or {}, 'status': 200, 'content_type': 'application/json', 'body': body.decode('utf-8')}
+
+
+def summary(latencies, elapsed) -> dict:
+    ''' Returns requests per second and latency percentiles (milliseconds) of one measurement. '''
+    cuts = statistics.quantiles(latencies, n=100)
+    return {"requests_per_s": len(latencies) / elapsed, "p50_ms": statistics.median(latencies) * 1000, "p99_ms": cuts[98] * 1000}
+
+
+def timed_run(request) -> float:
+    start = time.perf_counter()
+    if request.run() is None:
+        raise RuntimeError(f"{request!r} failed during the benchmark")
+    return time.perf_counter() - start
+
+
+def bench_sequential(cg) -> dict:
+    requests = [cg.endpoints.coins(f"coin-{i}") for i in range(CALLS)]
+    start = time.perf_counter()
+    latencies = [timed_run(request) for request in requests]
+    return summary(latencies, time.perf_counter() - start)
+
+
+def bench_threaded(cg) -> dict:
+    ''' Same fan-out as CoinGeckoClient.run_many, with each call timed. '''
+    requests = [cg.endpoints.coins(f"coin-{i}") for i in range(CALLS)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+        latencies = list(executor.map(timed_run, requests))
+    return summary(latencies, time.perf_counter() - start)
+
+
+def bench_async(base_url) -> dict:
+    async def timed(request):
+        start = time.perf_counter()
+        if await request.run() is None:
+            raise RuntimeError(f"{request!r} failed during the benchmark")
+        return time.perf_counter() - start
+
+    async def main():
+        async with AsyncCoinGeckoClient(rate_limiter=RateLimiter(rate_per_minute=None), pool_maxsize=WORKERS, cache=False) as cg:
+            cg.base_url = base_url
+            await cg.gather_many([timed(cg.endpoints.coins(f"warmup-{i}")) for i in range(WORKERS)], concurrency=WORKERS)
+            start = time.perf_counter()
+            latencies = await cg.gather_many([timed(cg.endpoints.coins(f"coin-{i}")) for i in range(CALLS)], concurrency=WORKERS)
+            return summary(latencies, time.perf_counter() - start)
+
+    return asyncio.run(main())
+
+
+def bench_cache(base_url) -> dict:
+    ''' Every call of cache.miss is a new path (fetched and stored), every call of cache.hit the same one. '''
+    with CoinGeckoClient(rate_limiter=RateLimiter(rate_per_minute=None), cache=ResponseCache(ttls={"/coins/{id}": 3600})) as cg:
+        cg.base_url = base_url
+        miss = bench_sequential(cg)
+        request = cg.endpoints.coins("coin-0")
+        start = time.perf_counter()
+        latencies = [timed_run(request) for _ in range(CALLS)]
+        hit = summary(latencies, time.perf_counter() - start)
+        if cg.cache.stats()['hits'] < CALLS:
+            raise RuntimeError("cache.hit calls were not served from the cache")
+    return {"cache.miss": miss, "cache.hit": hit}
+
+
+def bench_decode(payloads) -> dict:
+    results = {}
+    for name, body in payloads.items():
+        times = []
+        for _ in range(DECODE_REPEAT):
+            start = time.perf_counter()
+            jsonlib.loads(body)
+            times.append(time.perf_counter() - start)
+        median = statistics.median(times)
+        results[f"decode.{name}"] = {"bytes": len(body), "median_ms": median * 1000, "mb_per_s": len(body) / median / 1e6}
+    return results
+
+
+def bench_pagination(cg) -> dict:
+    request = cg.endpoints.coins_markets.params(MARKETS_PARAMS)
+    start = time.perf_counter()
+    count = sum(1 for _ in cg.iter_items(request))
+    elapsed = time.perf_counter() - start
+    if count != PAGINATION_ITEMS:
+        raise RuntimeError(f"iter_items returned {count} items, expected {PAGINATION_ITEMS}")
+    return {"items_per_s": count / elapsed, "pages_per_s": count / MARKETS_PARAMS["per_page"] / elapsed}
+
+
+def bench_memory(markets_body) -> dict:
+    items = jsonlib.loads(markets_body)
+    body = jsonlib.dumps([items[index % len(items)] for index in range(MEMORY_ROWS)])
+    dicts, _ = retained(lambda: jsonlib.loads(body))
+    rows, _ = retained(lambda: MarketRow.from_page(jsonlib.loads(body)))
+    return {"dict_bytes_per_row": dicts / MEMORY_ROWS, "record_bytes_per_row": rows / MEMORY_ROWS}
+
+
+def git(*args) -> str:
+    try:
+        return subprocess.run(['git', *args], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run() -> dict:
+    payloads, sources = load_payloads()
+    detail = fixture("/coins/{id}", "/coins/coin-0", jsonlib.dumps(market_row(random.Random(1), 0)))
+    fixtures = {"/coins/{id}": [detail], "/coins/markets": [fixture("/coins/markets", "/coins/markets", payloads["coins_markets"],
+                                                                   {key: str(value) for key, value in MARKETS_PARAMS.items()})]}
+    results = {}
+    with standin.StandInServer(fixtures, total_items=PAGINATION_ITEMS) as server:
+        with CoinGeckoClient(rate_limiter=RateLimiter(rate_per_minute=None), pool_maxsize=WORKERS, cache=False) as cg: # Local server, no quota to protect
+            cg.base_url = server.url
+            for request in [cg.endpoints.coins(f"warmup-{i}") for i in range(WORKERS)]:
+                timed_run(request)
+            results["run.sequential"] = bench_sequential(cg)
+            results["run.threaded"] = bench_threaded(cg)
+            results["run.async"] = bench_async(server.url)
+            results.update(bench_cache(server.url))
+            results["pagination"] = bench_pagination(cg)
+    results.update(bench_decode(payloads))
+    results["memory"] = bench_memory(payloads["coins_markets"])
+    return {"commit": git('rev-parse', '--short', 'HEAD'), "dirty": bool(git('status', '--porcelain', '--untracked-files=no')),
+            "time": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()), "python": platform.python_version(), "platform": platform.platform(),
+            "json_backend": jsonlib.backend, "payloads": sources, "calls": CALLS, "workers": WORKERS, "results": results}
+
+
+def compare(previous, current) -> list:
+    ''' Prints every metric against the previous run and returns the names of those that got worse than REGRESSION_TOLERANCE. '''
+    regressions = []
+    print(f"\nagainst {previous.get('commit') or 'unknown commit'} ({previous.get('time', '?')})")
+    for name, metrics in current["results"].items():
+        for metric, value in metrics.items():
+            before = previous["results"].get(name, {}).get(metric)
+            if not before or metric == "bytes":
+                continue
+            change = value / before - 1
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            flag = "  REGRESSION" if worse > REGRESSION_TOLERANCE else ""
+            print(f"{name + ' ' + metric:<44} {before:12.2f} -> {value:12.2f}  {change:+7.1%}{flag}")
+            if flag:
+                regressions.append(f"{name} {metric}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the client hot paths against a local stand-in server.")
+    parser.add_argument('--output', help="Result file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument('--compare', metavar='RESULT', help="Earlier result file to compare with")
+    parser.add_argument('--capture', action='store_true', help="Record the large payloads from the API first")
+    args = parser.parse_args()
+
+    if args.capture:
+        capture()
+    report = run()
+    for name, metrics in report["results"].items():
+        print(f"{name:<22} " + "  ".join(f"{metric} {value:,.2f}" for metric, value in metrics.items()))
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['commit'] or 'local'}{'-dirty' if report['dirty'] else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(f"\nsaved {output}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(json.load(file), report)
+        if regressions:
+            print(f"\nFAILED: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
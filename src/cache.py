@@ -0,0 +1,232 @@
+''' Response caching: in-memory TTL cache with LRU eviction and a byte budget, plus an optional shared SQLite tier '''
+
+import json, os, threading, time, config, jsonlib, lazy
+from collections import OrderedDict
+
+sqlite3 = lazy.LazyModule("sqlite3") # Only needed by the disk tier
+
+
+MISSING = object() # Returned by ResponseCache.get on a miss, since None can be a cached value
+
+
+class ResponseCache:
+    '''
+    Caches decoded responses per endpoint template for a fixed time (TTL).
+
+    Only endpoints with a TTL are cached: config.CACHE_TTL gives the defaults, ttls overrides or adds to them.
+    Entries are keyed on the endpoint path plus the sorted query params. When the cached response bodies go over
+    max_bytes, the least recently used entries are evicted.
+
+    Cached values are shared between callers, do not modify the dicts/lists that are returned.
+    The raw body is kept next to the value, so raw-mode callers are served without any decoding, and a body
+    stored by a raw-mode call is only decoded (once) when a caller asks for the value.
+
+    With a DiskCache as disk, responses are also written to disk so they survive restarts and can be
+    shared by several processes. Stale disk entries are revalidated with If-None-Match/If-Modified-Since.
+
+    Example:
+        >>> cache = ResponseCache(ttls={"/coins/markets": 30}, max_bytes=16 * 1024 * 1024)
+        >>> cg = CoinGeckoClient("your_api_key", cache=cache)
+        >>> cg.endpoints.coins_list.run(); cg.endpoints.coins_list.run()   # Second call is served from memory
+        >>> cache.stats()
+        {'hits': 1, 'misses': 1, 'evictions': 0, 'entries': 1, 'bytes': ...}
+    '''
+    def __init__(self, ttls = None, max_bytes = config.CACHE_MAX_BYTES, disk = None) -> None:
+        self.ttls = {**config.CACHE_TTL, **(ttls or {})}
+        self.max_bytes = max_bytes
+        self.disk = disk
+        self.entries = OrderedDict() # key -> [expires_at, body, value or MISSING until decoded], oldest first
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_hits = 0
+        self.revalidations = 0
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({len(self.entries)} entries, {self.bytes} bytes)'
+
+    @staticmethod
+    def key(endpoint, params) -> tuple:
+        ''' Returns the cache key for an endpoint path and its query params (order of params does not matter). '''
+        return (endpoint.rstrip('/') or '/', tuple(sorted((str(name), str(value)) for name, value in params.items())))
+
+    def ttl(self, template) -> float:
+        ''' Returns how many seconds responses from the endpoint template stay fresh, 0 if they are not cached. '''
+        return self.ttls.get(template, 0)
+
+    def get(self, key, raw = False):
+        '''
+        Returns the cached value for key (from memory, then from a fresh disk entry), or MISSING if there is none.
+
+        Args:
+            raw: If True return the raw response body (bytes) instead of the decoded value
+        '''
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.entries.move_to_end(key)
+                self.hits += 1
+            elif entry is not None:
+                self._remove(key)
+                entry = None
+        if entry is not None:
+            return self._value(entry, raw)
+        if self.disk is not None:
+            stored = self.disk.get(key)
+            if stored is not None and stored['expires_at'] > time.time():
+                entry = self._store(key, MISSING, stored['body'], stored['expires_at'] - time.time())
+                with self.lock:
+                    self.disk_hits += 1
+                return self._value(entry, raw)
+        with self.lock:
+            self.misses += 1
+        return MISSING
+
+    @staticmethod
+    def _value(entry, raw):
+        if raw:
+            return entry[1]
+        if entry[2] is MISSING:
+            entry[2] = jsonlib.loads(entry[1]) # Two threads may both decode a fresh entry, either result is fine
+        return entry[2]
+
+    def validators(self, key) -> dict:
+        ''' Returns the conditional request headers (If-None-Match/If-Modified-Since) for a stale disk entry, {} if there is none. '''
+        if self.disk is None:
+            return {}
+        stored = self.disk.get(key)
+        if stored is None:
+            return {}
+        headers = {}
+        if stored['etag']:
+            headers['If-None-Match'] = stored['etag']
+        if stored['last_modified']:
+            headers['If-Modified-Since'] = stored['last_modified']
+        return headers
+
+    def revalidated(self, key, ttl, raw = False):
+        '''
+        Called when the API answered 304 Not Modified: refreshes the disk entry for another ttl seconds and returns its value.
+
+        Returns: The cached value (the body if raw is True), or MISSING if the disk entry was removed in the meantime.
+        '''
+        stored = self.disk.touch(key, ttl) if self.disk is not None else None
+        if stored is None:
+            return MISSING
+        entry = self._store(key, MISSING, stored['body'], ttl)
+        with self.lock:
+            self.revalidations += 1
+        return self._value(entry, raw)
+
+    def set(self, key, value, body, ttl, headers = None) -> None:
+        '''
+        Stores value under key for ttl seconds (and on disk, if there is a disk tier).
+
+        Args:
+            value: Decoded body, or MISSING to decode it on the first get() that needs it
+            body: Raw response body, its size is counted against max_bytes
+            headers: Response headers, ETag and Last-Modified are kept for revalidation
+        '''
+        if self.disk is not None:
+            headers = headers or {}
+            self.disk.set(key, body, ttl, headers.get('ETag'), headers.get('Last-Modified'))
+        self._store(key, value, body, ttl)
+
+    def _store(self, key, value, body, ttl) -> list:
+        entry = [time.monotonic() + ttl, body, value]
+        if len(body) > self.max_bytes:
+            return entry
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = entry
+            self.bytes += len(body)
+            while self.bytes > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+        return entry
+
+    def _remove(self, key) -> None:
+        self.bytes -= len(self.entries.pop(key)[1])
+
+    def clear(self) -> None:
+        ''' Empties the memory tier (the disk tier is left alone, see DiskCache.clear). '''
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        ''' Returns the hit/miss/eviction counters and current size. '''
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'entries': len(self.entries), 'bytes': self.bytes,
+                    'disk_hits': self.disk_hits, 'revalidations': self.revalidations}
+
+
+class DiskCache:
+    '''
+    SQLite-backed response store that several processes on the same host can share.
+
+    Keeps the raw response body with its ETag/Last-Modified headers. Entries are not deleted when they
+    expire, so they can still be revalidated with a cheap 304 (call purge() to drop old ones).
+    The database runs in WAL mode so readers in other processes are not blocked by a writer.
+
+    Example:
+        >>> cache = ResponseCache(disk=DiskCache("~/.cache/phegeck/responses.sqlite"))
+        >>> cg = CoinGeckoClient("your_api_key", cache=cache)
+    '''
+    def __init__(self, path = config.DISK_CACHE_PATH) -> None:
+        self.path = os.path.expanduser(path)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None) # Autocommit, each statement is its own transaction
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute('''CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY, body BLOB NOT NULL, etag TEXT, last_modified TEXT, stored_at REAL NOT NULL, expires_at REAL NOT NULL)''')
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.path!r})'
+
+    @staticmethod
+    def _key(key) -> str:
+        return json.dumps(key, separators=(',', ':'))
+
+    def get(self, key):
+        ''' Returns the stored entry as a dict (body, etag, last_modified, stored_at, expires_at), or None. '''
+        with self.lock:
+            row = self.connection.execute('SELECT body, etag, last_modified, stored_at, expires_at FROM responses WHERE key = ?', (self._key(key),)).fetchone()
+        if row is None:
+            return None
+        return {'body': row[0], 'etag': row[1], 'last_modified': row[2], 'stored_at': row[3], 'expires_at': row[4]}
+
+    def set(self, key, body, ttl, etag = None, last_modified = None) -> None:
+        now = time.time()
+        with self.lock:
+            self.connection.execute('INSERT OR REPLACE INTO responses (key, body, etag, last_modified, stored_at, expires_at) VALUES (?, ?, ?, ?, ?, ?)',
+                                    (self._key(key), body, etag, last_modified, now, now + ttl))
+
+    def touch(self, key, ttl):
+        ''' Marks an entry fresh for another ttl seconds and returns it, or None if it does not exist. '''
+        with self.lock:
+            self.connection.execute('UPDATE responses SET expires_at = ? WHERE key = ?', (time.time() + ttl, self._key(key)))
+        return self.get(key)
+
+    def purge(self, older_than = 7 * 24 * 3600) -> int:
+        ''' Deletes entries stored more than older_than seconds ago and returns how many were removed. '''
+        with self.lock:
+            return self.connection.execute('DELETE FROM responses WHERE stored_at < ?', (time.time() - older_than,)).rowcount
+
+    def clear(self) -> None:
+        with self.lock:
+            self.connection.execute('DELETE FROM responses')
+
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
@@ -1,10 +1,48 @@
-import requests, os, config
-from dotenv import load_dotenv
+import math, os, threading, time, config, jsonlib, lazy
+from types import MappingProxyType
+from ratelimit import RateLimiter
+from retry import RetryPolicy
+from keypool import KeyPool
+from cache import ResponseCache, MISSING
+from coalesce import SingleFlight
+from hooks import Hooks
+from batching import chunk_values, merge_results
+
+# Loaded on first use, see lazy.LazyModule. Keeps "import client" fast for short-lived scripts
+requests = lazy.LazyModule("requests")
+futures = lazy.LazyModule("concurrent.futures")
+backfill = lazy.LazyModule("backfill")
+columnar = lazy.LazyModule("columnar")
+endpoints = lazy.LazyModule("endpoints")
+pagination = lazy.LazyModule("pagination")
+records = lazy.LazyModule("records")
+resolver = lazy.LazyModule("resolver")
+scheduling = lazy.LazyModule("scheduling")
+streaming = lazy.LazyModule("streaming")
+timeseries = lazy.LazyModule("timeseries")
+timing = lazy.LazyModule("timing")
 
 # Loading API Key stored in env
-load_dotenv() #Load every environmental variable found in any .env file in project
-test_api_key = os.getenv("API_KEY")
-test_debug = os.getenv("DEBUG")
+_env_loaded = False
+
+
+def load_env() -> None:
+    ''' Loads the .env file once and reads API_KEY and DEBUG from the environment. Runs when the first client is built, not at import. '''
+    global _env_loaded, test_api_key, test_debug
+    if _env_loaded:
+        return
+    from dotenv import load_dotenv
+    load_dotenv() #Load every environmental variable found in any .env file in project
+    test_api_key = os.getenv("API_KEY")
+    test_debug = os.getenv("DEBUG")
+    _env_loaded = True
+
+
+def __getattr__(name): # "from client import test_api_key" before any client is built loads the .env file first
+    if name in ('test_api_key', 'test_debug'):
+        load_env()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 base_url = config.DEFAULT_BASE_URL
@@ -17,15 +55,130 @@ default_retries = config.RETRY_ATTEMPT
 
 
 class CoinGeckoClient : #() Only add parenthesis if inheriting from another class
-    def __init__(self,API_Key = None) -> None:
-        self.base_url = config.DEFAULT_BASE_URL
+    def __init__(self,API_Key = None, pool_connections = config.POOL_CONNECTIONS, pool_maxsize = config.POOL_MAXSIZE, pool_block = config.POOL_BLOCK, rate_limiter = None, retry_policy = None, cache = None, coalesce = True, hooks = None, tier = config.API_KEY_TIER, keys = None, scheduler = None) -> None:
+        load_env()
+        if tier not in config.API_TIERS:
+            raise ValueError(f"Unknown key tier {tier!r}, expected one of {tuple(config.API_TIERS)}")
+        self.tier = tier # "demo" or "pro", picks the base URL, the header API_Key is sent in and the default rate limit (see config.API_TIERS)
+        self.base_url = config.API_TIERS[tier]['base_url']
         self.API_Key = API_Key
-        self.query_params = {}
-        self.custom_headers = {}
-        self.endpoint = None
+        self.custom_headers = {} # Headers sent with every request of this client, set before sharing the client between threads
         self.custom_timeout = config.TIMEOUT
         self.custom_retry_attempt = config.RETRY_ATTEMPT
         self.custom_retry_delay = config.RETRY_DELAY
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self._session = None # Created on first request, see the session property
+        self._session_lock = threading.Lock()
+        self._local = threading.local() # Per-thread stats of the last request, see rate_limit_wait and retry_count
+        self._resolver = None # Created on first use, see the resolver property
+        if rate_limiter is None:
+            rate_limiter = RateLimiter(config.API_TIERS[tier]['rate_per_minute'], config.API_TIERS[tier]['burst'])
+        self.rate_limiter = rate_limiter # Pass the same RateLimiter to several clients to share one quota
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy(self.custom_retry_attempt, self.custom_retry_delay)
+        if cache is None:
+            cache = ResponseCache()
+        self.cache = cache if cache is not False else None # Pass cache=False to turn caching off
+        self.single_flight = SingleFlight() if coalesce else None # Identical requests in flight at the same time share one call
+        self.hooks = hooks if hooks is not None else Hooks() # before_request/after_response/on_error callbacks, see add_hook
+        if keys is not None and API_Key is not None:
+            raise ValueError("Pass either API_Key or keys, add API_Key to keys to use it in the pool")
+        self.key_pool = keys if keys is None or isinstance(keys, KeyPool) else KeyPool(keys, tier=tier) # Several keys, each with its own rate limit, see keypool.KeyPool
+        if scheduler is True: # Pass a scheduling.Scheduler instead to share one queue (and its token source) between clients
+            scheduler = scheduling.Scheduler(self.key_pool if self.key_pool is not None else self.rate_limiter)
+        self.scheduler = scheduler or None # Priority classes and deadlines in front of the rate limiter, see scheduling.Scheduler
+
+    def __enter__(self) -> "CoinGeckoClient":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    @property
+    def session(self) -> "requests.Session":
+        '''
+        Returns the long-lived requests.Session used for every request made by this client.
+
+        The session keeps TCP/TLS connections alive between calls, so repeated requests to the API
+        skip the handshake. It is built on first use (and rebuilt after close()).
+
+        Returns: requests.Session
+        '''
+        if self._session is None:
+            with self._session_lock: # Stops two threads from each building a session on first use
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = timing.TimedAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize, pool_block=self.pool_block)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    self._session = session
+        return self._session
+
+    @property
+    def resolver(self) -> "resolver.CoinResolver":
+        '''
+        Returns the coin identifier resolver of this client (symbol, name, contract address -> coin id), see resolver.CoinResolver.
+
+        The index behind it is kept at config.COIN_INDEX_PATH, so only the first run of a program fetches /coins/list.
+
+        Example:
+            >>> cg.resolver.resolve("0xdac17f958d2ee523a2206206994597c13d831ec7")
+            'tether'
+        '''
+        if self._resolver is None:
+            with self._session_lock:
+                if self._resolver is None:
+                    self._resolver = resolver.CoinResolver(self)
+        return self._resolver
+
+    def close(self) -> None:
+        '''
+        Closes the underlying session and every pooled connection it holds.
+
+        Example:
+            >>> with CoinGeckoClient("your_api_key") as client:
+            ...     client.endpoints.ping.run()
+        '''
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def add_hook(self, event, callback) -> None:
+        '''
+        Registers callback(event) for "before_request", "after_response" or "on_error" on every request this client sends.
+
+        The callback receives a hooks.RequestEvent: endpoint template, params, status, bytes, dns/connect/ttfb/total
+        timings, retry count and rate limiter wait. on_error fires for every failed attempt (event.will_retry tells
+        whether it is retried). Cache hits send nothing and fire nothing. See metrics.MetricsCollector for a ready-made collector.
+
+        Example:
+            >>> cg.add_hook("after_response", lambda event: print(event.template, event.status, f"{event.total:.3f}s"))
+        '''
+        self.hooks.add(event, callback)
+
+    def remove_hook(self, event, callback) -> None:
+        ''' Unregisters a callback added with add_hook. '''
+        self.hooks.remove(event, callback)
+
+    @property
+    def rate_limit_wait(self) -> float:
+        ''' Seconds the last request made by the current thread waited for a rate limit token. '''
+        return getattr(self._local, 'rate_limit_wait', 0.0)
+
+    @rate_limit_wait.setter
+    def rate_limit_wait(self, value):
+        self._local.rate_limit_wait = value
+
+    @property
+    def retry_count(self) -> int:
+        ''' Retries made by the last request of the current thread. '''
+        return getattr(self._local, 'retry_count', 0)
+
+    @retry_count.setter
+    def retry_count(self, value):
+        self._local.retry_count = value
 
     def api_key(self):
         '''
@@ -39,7 +192,8 @@ class CoinGeckoClient : #() Only add parenthesis if inheriting from another clas
         return self.API_Key
 
     def headerAPI_Key(self) -> dict:
-        API_Key_Header = {'x-cg-demo-api-key' : self.API_Key}
+        ''' Returns the header carrying API_Key, x-cg-demo-api-key or x-cg-pro-api-key depending on the tier. '''
+        API_Key_Header = {config.API_TIERS[self.tier]['header'] : self.API_Key}
         return API_Key_Header
 
     def __str__(self) -> str:
@@ -53,34 +207,44 @@ class CoinGeckoClient : #() Only add parenthesis if inheriting from another clas
     @property
     def endpoints(self) :
         '''
-        Uses the provided endpoint string to set the API endpoint for the request.
+        Returns the endpoint accessors. Each accessor builds a new Request, the client itself is never modified.
 
-        Clears the previous endpoint and query parameters if an endpoint was already set 
-    
-        Returns: CoinGeckoClient :Self for chaining.
+        Returns: Endpoints
         '''
-        self.query_params = {}
         return Endpoints(self)
+
+    def request(self, endpoint, route = None) -> "Request":
+        '''
+        Returns a new Request for the given endpoint path (e.g. '/coins/bitcoin').
+
+        The path is matched against endpoints.ROUTES unless its route is given. With config.VALIDATE_REQUESTS,
+        a path that is not in the registry raises ValueError here, before anything is sent.
+        '''
+        if route is None and endpoint is not None:
+            route = endpoints.route_for(endpoint)
+            if route is None and config.VALIDATE_REQUESTS:
+                raise ValueError(f"Unknown endpoint {endpoint!r}, see endpoints.ENDPOINT_ALL (set config.VALIDATE_REQUESTS = False to send it anyway)")
+        return Request(self, endpoint, route=route)
     
-    def params(self,params : dict) -> "CoinGeckoClient":
-        ''' Uses the provided dictionary to set query parameters for the request.
+    def params(self,params : dict) -> "Request":
+        ''' Uses the provided dictionary to build a Request with query parameters and no endpoint yet.
         
         Args : A dictionary of query parameters (e.g., {"ids": "bitcoin", "vs_currencies": "usd"}).
-        Returns: CoinGeckoClient :Self for chaining.'''
-        self.query_params.update(params)
-        return self
+        Returns: Request : A new Request, the client is not modified.'''
+        return Request(self, None).params(params)
     
     
-    def headers(self,headers : dict) -> "CoinGeckoClient":
-        ''' Uses the provided dictionary to set custom headers for the request.
+    def headers(self,headers : dict) -> "Request":
+        ''' Uses the provided dictionary to build a Request with custom headers and no endpoint yet.
         
         Args : A dictionary of custom headers (e.g., {"Authorization": "Bearer token"}).
-        Returns: CoinGeckoClient :Self for chaining.'''
-        self.custom_headers.update(headers)
-        return self
+        Returns: Request : A new Request, the client is not modified.'''
+        return Request(self, None).headers(headers)
     
-    def all_headers(self) -> dict:
-        headers = {**self.headerAPI_Key(),**self.custom_headers}
+    def all_headers(self, request = None) -> dict:
+        headers = {**(self.headerAPI_Key() if self.key_pool is None else {}),**self.custom_headers} # Pooled keys add their own header on every attempt
+        if request is not None:
+            headers.update(request.custom_headers)
         return headers
     
     @property
@@ -104,965 +268,702 @@ class CoinGeckoClient : #() Only add parenthesis if inheriting from another clas
         print(f'Timeout Changed to {value} seconds') 
         
 
-    def run(self):
-        try :
-            response = requests.get(f"{self.base_url}{self.endpoint}", headers=self.all_headers(), params=self.query_params, timeout=config.TIMEOUT)
-            response.raise_for_status()  # Raise an error for bad status codes
-            return response.json() # will change this to return response object later for more flexibility
-        except AttributeError as error:
-            if test_debug :
-                print(f"An error occurred: {error}")
-            else:
-                print("Please ensure that endpoint, params, and headers are set before making a request.")
-            return None
-        except requests.exceptions.HTTPError as error: # Handles HTTP errors eg 4xx and 5xx status codes
-            if test_debug :
-                if error.response.status_code == 429:
-                    print(f"Error {error.response.status_code}, Rate limit exceeded. Please try again later.")
-                elif error.response.status_code == 401:
-                    print(f"Error {error.response.status_code}, Unauthorized access. Please check your API key.")
-                elif error.response.status_code == 404:
-                    print(f"Error {error.response.status_code}, Endpoint not found. Please check the endpoint URL.")
-                elif error.response.status_code == 403:
-                    print(f"Error {error.response.status_code}, Forbidden access. You do not have permission to access this resource.")
-                else:
-                    print(f"HTTP error occurred: {error}")
-            else:
-                if error.response.status_code == 429:
-                    print("Rate limit exceeded. Please try again later.")
-                elif error.response.status_code == 401:
-                    print("Unauthorized access. Please check if you have a valid API key.") 
-                elif error.response.status_code == 404:
-                    print("Endpoint not found. Please enter a valid endpoint URL.")
-                elif error.response.status_code == 403:
-                    print("Forbidden access. You are restricted from accessing this resource.")
-                else:
-                    print("An error occurred while processing your request.")
-            return None
-        except requests.exceptions.RequestException as error: # Handles other requests exceptions eg connection errors, timeouts, etc
-            if test_debug :
-                print(f"An error occurred while making the request: {error}")
-            else:
-                print("An error occurred while making the request. Please check your network connection and try again.")
-            return None
-
-
-class Endpoints:
-    def __init__(self, client): # initializes to take in the original client and return something back
-        self.client = client
-
-    # ENDPOINT_COINS
-    @property # Property decorator makes it so that, it can be called with brackets at the end
-    def ping(self):
+    def run(self, block = True):
         '''
-        Check the API server status.
-        
-        Args:
-            None
-        
-        Params:
-            None
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = '/ping' # Changes the self.endpoint that is in the coin gecko client class from None to the new endpoint
-        return self.client # Returns the client back to coin gecko client class
+        Runs a Request with no endpoint. Kept for backwards compatibility, requests are built with client.endpoints.
 
-    @property
-    def simple_price(self):
+        Returns: None
         '''
-        Query the prices of one or more coins by using their unique Coin API IDs.
-        
-        Args:
-            None
-        
-        Params:
-            ids: Comma-separated coin IDs to query (e.g., bitcoin,ethereum)
-            names: Comma-separated coin names to query (e.g., Bitcoin,Ethereum)
-            symbols: Comma-separated coin symbols to query (e.g., btc,eth)
-            vs_currencies: Target currencies for price data (e.g., usd, eur, gbp, jpy, etc.)
-            include_tokens: For symbol lookups - top (top-ranked tokens only) or all (all matching tokens)
-            include_market_cap: Boolean flag to include market capitalization in response
-            include_24hr_vol: Boolean flag to include 24-hour trading volume in response
-            include_24hr_change: Boolean flag to include 24-hour price change percentage in response
-            include_last_updated_at: Boolean flag to include last updated timestamp (UNIX) in response
-            precision: Decimal places for price values (full or 0-18 digits)
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = '/simple/price'
-        return self.client
+        return self.execute(Request(self, None), block)
 
-    def simple_token_price(self, id):  #Does not include property decorator so it has brackets and can take in arguments 
+    def run_many(self, requests, max_workers = None, mode = "json") -> list:
         '''
-        Query the prices of one or more coins by using their unique Coin API IDs.
-        
-        Args:
-            id: Token contract platform address (e.g., ethereum)
-        
-        Params:
-            contract_addresses: Comma-separated token contract addresses for querying token prices by address
-            vs_currencies: Target currencies for price data (e.g., usd, eur, gbp, jpy, etc.)
-            include_market_cap: Boolean flag to include market capitalization in response
-            include_24hr_vol: Boolean flag to include 24-hour trading volume in response
-            include_24hr_change: Boolean flag to include 24-hour price change percentage in response
-            include_last_updated_at: Boolean flag to include last updated timestamp (UNIX) in response
-            precision: Decimal places for price values (full or 0-18 digits)
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = f'/simple/token_price/{id}'
-        return self.client
+        Runs many Requests on a thread pool and returns their results in the same order.
 
-    @property
-    def simple_supported_vs_currencies(self):
-        '''
-        Query all the supported currencies on CoinGecko.
-        
-        Args:
-            None
-        
-        Params:
-            None
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = '/simple/supported_vs_currencies'
-        return self.client
+        All workers share this client's connection pool, rate limiter and retry budget.
 
-    @property
-    def coins_list(self):
-        '''
-        Query all the supported coins on CoinGecko with coins ID, name and symbol.
-        
         Args:
-            None
-        
-        Params:
-            include_platform: Boolean flag to include platform and token contract addresses in coins list
-            status: Filter by status - active (listed) or inactive (delisted) coins/exchanges
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = '/coins/list'
-        return self.client
+            requests: Iterable of Request objects (e.g. [cg.endpoints.coins(id) for id in ids])
+            max_workers: Number of threads, defaults to pool_maxsize so every worker can keep a connection alive
+            mode: Response mode for every request, see execute
 
-    @property
-    def coins_markets(self):
-        '''
-        Query all the supported coins with price, market cap, volume and market related data.
-        
-        Args:
-            None
-        
-        Params:
-            vs_currency: Target currencies for price data (e.g., usd, eur, gbp, jpy, etc.)
-            ids: Comma-separated coin IDs to query (e.g., bitcoin,ethereum)
-            names: Comma-separated coin names to query (e.g., Bitcoin,Ethereum)
-            symbols: Comma-separated coin symbols to query (e.g., btc,eth)
-            include_tokens: For symbol lookups - top (top-ranked tokens only) or all (all matching tokens)
-            category: Filter coins by category (e.g., layer-1, defi, gaming)
-            order: Sort results by field (market_cap_desc, volume_asc, trust_score_desc, etc.)
-            per_page: Number of results per page (1-250, default varies by endpoint)
-            page: Page number for pagination (starting from 1)
-            sparkline: Boolean flag to include 7-day sparkline chart data
-            price_change_percentage: Include price change percentages for specific timeframes (1h, 24h, 7d, 14d, 30d, 200d, 1y)
-            locale: Language/localization code for response (en, es, fr, ja, zh, etc.)
-            precision: Decimal places for price values (full or 0-18 digits)
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = '/coins/markets'
-        return self.client
+        Returns: list
 
-    def coins(self, id):
-        '''
-        Query all the metadata (image, websites, socials, description, contract address, etc.) from the CoinGecko coin page based on a particular coin ID.
-        
-        Args:
-            id: Coin ID (e.g., bitcoin)
-        
-        Params:
-            localization: Boolean flag to include localized coin names in all supported languages
-            tickers: Boolean flag to include exchange tickers data in coin response
-            market_data: Boolean flag to include market data (price, market cap, volume, ATH, ATL, etc.)
-            community_data: Boolean flag to include community data (Reddit, Telegram followers, etc.) in response
-            developer_data: Boolean flag to include developer data (GitHub stats, commits, etc.) in response
-            sparkline: Boolean flag to include 7-day sparkline chart data
-            include_categories_details: Boolean flag to include detailed category information with metadata
-            dex_pair_format: Display format for DEX pairs - contract_address or symbol (e.g., WETH, USDC)
-        
-        Returns: CoinGeckoClient
+        Example:
+            >>> results = cg.run_many([cg.endpoints.coins(id) for id in ["bitcoin", "ethereum"]], max_workers=8)
         '''
-        self.client.endpoint = f'/coins/{id}'
-        return self.client
+        with futures.ThreadPoolExecutor(max_workers=max_workers or self.pool_maxsize) as executor:
+            return list(executor.map(lambda request: request.run(mode=mode), requests))
 
-    def coins_tickers(self, id):
+    def iter_pages(self, request, start_page = 1, max_pages = None, prefetch = True):
         '''
-        Query the coin tickers on both centralized exchange (CEX) and decentralized exchange (DEX) based on a particular coin ID.
-        
+        Yields the items of each page of a paginated Request, one list per page, fetching pages lazily.
+
+        While a page is being consumed the next one is already being fetched on a background thread.
+        Iteration stops on an empty page, a short page (fewer items than per_page or the endpoint default,
+        see config.PAGE_SIZE) or after max_pages pages. A page whose request fails is fetched again
+        (config.PAGE_RETRY_ROUNDS times), then pagination.PageFetchError is raised with its number,
+        so a failure is never mistaken for the end of the data.
+
         Args:
-            id: Coin ID (e.g., bitcoin)
-        
-        Params:
-            exchange_ids: Comma-separated exchange IDs to filter tickers by specific exchanges
-            include_exchange_logo: Boolean flag to include exchange logo URL in response
-            page: Page number for pagination (starting from 1)
-            order: Sort results by field (market_cap_desc, volume_asc, trust_score_desc, etc.)
-            depth: Boolean flag to include 2% orderbook depth (cost_to_move_up_usd and cost_to_move_down_usd)
-            dex_pair_format: Display format for DEX pairs - contract_address or symbol (e.g., WETH, USDC)
-        
-        Returns: CoinGeckoClient
+            request: Request for a paginated endpoint (e.g., cg.endpoints.coins_markets.params({"vs_currency": "usd", "per_page": 250}))
+            start_page: First page to fetch
+            max_pages: Stop after this many pages
+            prefetch: Set to False to fetch each page only when it is asked for
+
+        Returns: Generator[list]
         '''
-        self.client.endpoint = f'/coins/{id}/tickers'
-        return self.client
+        template = request.template
+        size = pagination.page_size(template, request.query_params)
+        executor = futures.ThreadPoolExecutor(max_workers=1) if prefetch else None
 
-    def coins_history(self, id):
+        def fetch(page):
+            for _ in range(1 + config.PAGE_RETRY_ROUNDS):
+                data = request.params({'page': page}).run()
+                if data is not None:
+                    return pagination.page_items(template, data)
+            raise pagination.PageFetchError(page)
+
+        page = start_page
+        pending = executor.submit(fetch, page) if executor else None
+        try:
+            while True:
+                items = pending.result() if executor else fetch(page)
+                if not items:
+                    return
+                last = (size is not None and len(items) < size) or (max_pages is not None and page - start_page + 1 >= max_pages)
+                if executor and not last:
+                    pending = executor.submit(fetch, page + 1) # Fetched while the caller works through this page
+                yield items
+                if last:
+                    return
+                page += 1
+        finally:
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def iter_items(self, request, max_items = None, start_page = 1, prefetch = True):
         '''
-        Query the historical data (price, market cap, 24hr volume, …) at a given date for a coin based on a particular coin ID.
-        
+        Yields the items of a paginated Request one by one across pages, see iter_pages.
+
         Args:
-            id: Coin ID (e.g., bitcoin)
-        
-        Params:
-            date: Historical data snapshot date in ISO format (YYYY-MM-DD)
-            localization: Boolean flag to include localized coin names in all supported languages
-        
-        Returns: CoinGeckoClient
+            max_items: Stop after this many items (no page past the one holding the last item is fetched)
+
+        Returns: Generator
+
+        Example:
+            >>> for coin in cg.iter_items(cg.endpoints.coins_markets.params({"vs_currency": "usd", "per_page": 250}), max_items=1000):
+            ...     print(coin["id"])
         '''
-        self.client.endpoint = f'/coins/{id}/history'
-        return self.client
+        if max_items is not None and max_items <= 0:
+            return
+        size = pagination.page_size(request.template, request.query_params)
+        max_pages = math.ceil(max_items / size) if max_items is not None and size else None
+        count = 0
+        for items in self.iter_pages(request, start_page, max_pages, prefetch):
+            for item in items:
+                yield item
+                count += 1
+                if max_items is not None and count >= max_items:
+                    return
 
-    def coins_market_chart(self, id):
+    def fetch_pages(self, request, first_page = 1, last_page = None, max_workers = None) -> "pagination.PageScan":
         '''
-        Get the historical chart data of a coin including time in UNIX, price, market cap and 24hr volume based on particular coin ID.
-        
+        Fetches many pages of a paginated Request in parallel and merges their items in page order.
+
+        Without last_page, pages are fetched in waves of max_workers until a wave contains an empty or
+        short page, which marks the end, or until config.PAGE_FAILED_WAVES waves in a row failed on every page
+        (e.g. the API is down). Pages that failed are fetched again (config.PAGE_RETRY_ROUNDS times),
+        pages that succeeded are not. Every request still goes through the client's rate limiter.
+
         Args:
-            id: Coin ID (e.g., bitcoin)
-        
-        Params:
-            vs_currency: Target currencies for price data (e.g., usd, eur, gbp, jpy, etc.)
-            days: Number of days of historical data (1, 7, 14, 30, 90, 180, 365, or max for all available data)
-            interval: Data interval granularity - 5m (5-minute), hourly, or daily (Enterprise plans support 5m and hourly)
-            precision: Decimal places for price values (full or 0-18 digits)
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = f'/coins/{id}/market_chart'
-        return self.client
+            request: Request for a paginated endpoint
+            first_page: First page to fetch
+            last_page: Last page to fetch, if it is known
+            max_workers: Pages fetched at once, defaults to pool_maxsize
+
+        Returns: PageScan : Merged items, per-page latencies and any pages that could not be fetched
+
+        Example:
+            >>> scan = cg.fetch_pages(cg.endpoints.coins_markets.params({"vs_currency": "usd", "per_page": 250}), max_workers=8)
+            >>> len(scan.items), scan.complete, max(scan.latencies.values())
+        '''
+        template = request.template
+        size = pagination.page_size(template, request.query_params)
+        workers = max_workers or self.pool_maxsize
+        pages, latencies, failed = {}, {}, []
+
+        def fetch(page):
+            start = time.perf_counter()
+            data = request.params({'page': page}).run()
+            latencies[page] = time.perf_counter() - start - self.rate_limit_wait # rate_limit_wait is per thread, so this is this page's wait
+            if data is None:
+                failed.append(page)
+            else:
+                pages[page] = pagination.page_items(template, data)
+
+        with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            page = first_page
+            failed_waves = 0
+            while last_page is None or page <= last_page:
+                wave = range(page, page + workers if last_page is None else min(page + workers, last_page + 1))
+                list(executor.map(fetch, wave))
+                page = wave.stop
+                if any(number in pages and pagination.is_last_page(pages[number], size) for number in wave):
+                    break
+                failed_waves = 0 if any(number in pages for number in wave) else failed_waves + 1
+                if last_page is None and failed_waves >= config.PAGE_FAILED_WAVES: # Nothing tells where the end is, leave the rest to the retry rounds
+                    break
+            for _ in range(config.PAGE_RETRY_ROUNDS):
+                end = min((number for number, items in pages.items() if pagination.is_last_page(items, size)), default=None)
+                retry = [number for number in failed if end is None or number < end]
+                if not retry:
+                    break
+                failed.clear()
+                list(executor.map(fetch, retry))
+        return pagination.merge_pages(pages, size, latencies, failed)
+
+    def backfill_market_chart(self, id, start, end, vs_currency = "usd", granularity = "hourly", params = None, max_workers = None, checkpoint_dir = config.BACKFILL_CHECKPOINT_DIR) -> "backfill.BackfillResult":
+        '''
+        Fetches the price/market cap/volume history of a coin over any range with /coins/{id}/market_chart/range.
+
+        The API picks the granularity from the length of the requested range, so [start, end] is split into the
+        largest windows that keep the wanted one (see config.BACKFILL_SPANS). The windows are fetched in parallel
+        through the rate limiter, then stitched in time order with duplicate points removed.
+
+        Every finished window is saved to a checkpoint file in checkpoint_dir. Running the same backfill again
+        (same coin, range, granularity and params) after a crash or with failed windows only fetches what is missing.
+        The file is removed once every window has been fetched.
 
-    def coins_market_chart_range(self, id):
-        '''
-        Get the historical chart data of a coin within certain time range in UNIX along with price, market cap and 24hr volume based on particular coin ID.
-        
         Args:
             id: Coin ID (e.g., bitcoin)
-        
-        Params:
-            vs_currency: Target currencies for price data (e.g., usd, eur, gbp, jpy, etc.)
-            from: Starting date/timestamp for historical data range (ISO date YYYY-MM-DD or UNIX timestamp)
-            to: Ending date/timestamp for historical data range (ISO date YYYY-MM-DD or UNIX timestamp)
-            interval: Data interval granularity - 5m (5-minute), hourly, or daily (Enterprise plans support 5m and hourly)
-            precision: Decimal places for price values (full or 0-18 digits)
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = f'/coins/{id}/market_chart/range'
-        return self.client
+            start, end: UNIX seconds, datetime or ISO date string ("2021-01-01", UTC)
+            granularity: "hourly" or "daily". With an "interval" in params (Enterprise plans) that interval is used instead
+            params: Other /market_chart/range params (e.g., {"precision": "full"} or {"interval": "5m"})
+            max_workers: Windows fetched at once, defaults to pool_maxsize
+            checkpoint_dir: Folder for progress files, None to not checkpoint
 
-    @property
-    def coins_ohlc(self):
-        '''
-        Get the OHLC chart (Open, High, Low, Close) of a coin based on particular coin ID.
-        
-        Args:
-            None
-        
-        Params:
-            vs_currency: Target currencies for price data (e.g., usd, eur, gbp, jpy, etc.)
-            days: Number of days of historical data (1, 7, 14, 30, 90, 180, 365, or max for all available data)
-            interval: Data interval granularity - 5m (5-minute), hourly, or daily (Enterprise plans support 5m and hourly)
-            precision: Decimal places for price values (full or 0-18 digits)
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = '/coins-id-ohlc'
-        return self.client
+        Returns: BackfillResult : .data is shaped like a /market_chart/range response
 
-    @property
-    def coins_categories_list(self):
-        '''
-        Query all the coins categories on CoinGecko.
-        
-        Args:
-            None
-        
-        Params:
-            None
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = '/coins/categories/list'
-        return self.client
+        Example:
+            >>> result = cg.backfill_market_chart("bitcoin", "2019-01-01", "2024-01-01", granularity="hourly")
+            >>> result.complete, len(result.data["prices"])
+            (True, 43825)
+        '''
+        start, end, chunks, checkpoint, done, request = self._backfill_plan(id, start, end, vs_currency, granularity, params, checkpoint_dir)
+        missing = [chunk for chunk in chunks if chunk not in done]
+
+        def fetch(chunk):
+            data = request.params({"from": chunk[0], "to": chunk[1]}).run()
+            if data is not None and checkpoint is not None:
+                checkpoint.save(chunk, data)
+            return chunk, data
+
+        with futures.ThreadPoolExecutor(max_workers=max_workers or self.pool_maxsize) as executor:
+            for _ in range(1 + config.BACKFILL_RETRY_ROUNDS):
+                if not missing:
+                    break
+                pending = [executor.submit(fetch, chunk) for chunk in missing]
+                missing = []
+                for future in futures.as_completed(pending):
+                    chunk, data = future.result()
+                    if data is None:
+                        missing.append(chunk)
+                    else:
+                        done[chunk] = data
+        return self._backfill_result(start, end, chunks, checkpoint, done, missing)
+
+    def _backfill_plan(self, id, start, end, vs_currency, granularity, params, checkpoint_dir) -> tuple:
+        '''
+        Splits a backfill into windows and loads its checkpoint, see backfill_market_chart.
+
+        Returns: tuple : (start, end, windows, Checkpoint | None, windows already fetched -> data, Request for the windows)
+        '''
+        params = dict(params or {})
+        start, end = backfill.to_seconds(start), backfill.to_seconds(end)
+        if "interval" in params:
+            granularity = params["interval"]
+            if granularity not in config.BACKFILL_INTERVAL_SPANS:
+                raise ValueError(f"Unknown interval {granularity!r}, expected one of {tuple(config.BACKFILL_INTERVAL_SPANS)}")
+            low, high = 0, config.BACKFILL_INTERVAL_SPANS[granularity]
+        elif granularity in config.BACKFILL_SPANS:
+            low, high = config.BACKFILL_SPANS[granularity]
+        else:
+            raise ValueError(f"Unknown granularity {granularity!r}, expected one of {tuple(config.BACKFILL_SPANS)} or an interval param")
+        chunks = backfill.plan_chunks(start, end, low, high)
+        checkpoint = None
+        done = {}
+        if checkpoint_dir is not None:
+            checkpoint = backfill.Checkpoint.for_job(checkpoint_dir, id, {"vs_currency": vs_currency, "start": start, "end": end, "granularity": granularity, **params})
+            done = checkpoint.load()
+        request = self.endpoints.coins_market_chart_range(id).params({**params, "vs_currency": vs_currency})
+        return start, end, chunks, checkpoint, done, request
+
+    @staticmethod
+    def _backfill_result(start, end, chunks, checkpoint, done, missing) -> "backfill.BackfillResult":
+        ''' Stitches the fetched windows of a backfill, removing its checkpoint once nothing is missing. '''
+        failed = sorted(missing)
+        if not failed and checkpoint is not None:
+            checkpoint.remove()
+            checkpoint = None
+        data = backfill.stitch([done[chunk] for chunk in chunks if chunk in done], start, end)
+        return backfill.BackfillResult(data, chunks, failed, checkpoint.path if checkpoint is not None else None)
+
+    def time_series(self, directory = config.TIMESERIES_DIR, granularity = "hourly") -> "timeseries.TimeSeriesStore":
+        '''
+        Returns a local time-series store bound to this client, see timeseries.TimeSeriesStore.
 
-    @property
-    def coins_categories(self):
-        '''
-        Query all the coins categories with market data (market cap, volume, …) on CoinGecko.
-        
-        Args:
-            None
-        
-        Params:
-            order: Sort results by field (market_cap_desc, volume_asc, trust_score_desc, etc.)
-            per_page: Number of results per page (1-250, default varies by endpoint)
-            page: Page number for pagination (starting from 1)
-        
-        Returns: CoinGeckoClient
+        Example:
+            >>> store = cg.time_series()
+            >>> store.refresh("bitcoin"); store.series("bitcoin", metric="total_volumes")
         '''
-        self.client.endpoint = '/coins/categories'
-        return self.client
+        return timeseries.TimeSeriesStore(self, directory, granularity)
 
-    # ENDPOINT_NFTS
-    @property
-    def nfts_list(self):
+    def simple_price_many(self, ids, params, max_workers = None) -> dict:
         '''
-        Query all supported NFTs with ID, contract address, name, asset platform ID and symbol on CoinGecko.
-        
-        Args:
-            None
-        
-        Params:
-            order: Sort results by field (market_cap_desc, volume_asc, trust_score_desc, etc.)
-            per_page: Number of results per page (1-250, default varies by endpoint)
-            page: Page number for pagination (starting from 1)
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = '/nfts/list'
-        return self.client
+        Gets /simple/price for any number of coin ids.
 
-    def nfts(self, id):
-        '''
-        Query all the NFT data (name, floor price, 24hr volume, …) based on the NFT collection ID.
-        
-        Args:
-            id: NFT collection ID
-        
-        Params:
-            None
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = f'/nfts/{id}'
-        return self.client
+        The ids are split into URL-safe chunks (see config.BATCH_MAX_IDS and BATCH_MAX_URL_CHARS), the chunks are
+        fetched concurrently with run_many, and the results are merged into one dict. Chunks that fail are left out.
 
-    # ENDPOINT_EXCHANGES_SPOT
-    @property
-    def exchanges(self):
-        '''
-        Query all the supported exchanges with exchanges' data (ID, name, country, …) that have active trading volumes on CoinGecko.
-        
         Args:
-            None
-        
-        Params:
-            per_page: Number of results per page (1-250, default varies by endpoint)
-            page: Page number for pagination (starting from 1)
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = '/exchanges'
-        return self.client
+            ids: List of coin ids, or one comma-separated string
+            params: The other /simple/price params (e.g., {"vs_currencies": "usd", "include_market_cap": "true"})
 
-    @property
-    def exchanges_list(self):
-        '''
-        Query all the exchanges with ID and name.
-        
-        Args:
-            None
-        
-        Params:
-            status: Filter by status - active (listed) or inactive (delisted) coins/exchanges
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = '/exchanges/list'
-        return self.client
+        Returns: dict
 
-    def exchanges_id(self, id):
-        '''
-        Query exchange's data (name, year established, country, …), exchange volume in BTC and tickers based on exchange's ID.
-        
-        Args:
-            id: Exchange ID
-        
-        Params:
-            dex_pair_format: Display format for DEX pairs - contract_address or symbol (e.g., WETH, USDC)
-        
-        Returns: CoinGeckoClient
+        Example:
+            >>> cg.simple_price_many(all_coin_ids, {"vs_currencies": "usd"})   # 5,000 ids -> 20 requests
         '''
-        self.client.endpoint = f'/exchanges/{id}'
-        return self.client
+        request = self.endpoints.simple_price.params(params)
+        return merge_results(self.run_many([request.params({'ids': chunk}) for chunk in chunk_values(ids)], max_workers))
 
-    def exchanges_tickers(self, id):
+    def simple_token_price_many(self, id, contract_addresses, params, max_workers = None) -> dict:
         '''
-        Query exchange's tickers based on exchange's ID.
-        
-        Args:
-            id: Exchange ID
-        
-        Params:
-            coin_ids: Comma-separated coin IDs to filter exchange tickers
-            include_exchange_logo: Boolean flag to include exchange logo URL in response
-            page: Page number for pagination (starting from 1)
-            depth: Boolean flag to include 2% orderbook depth (cost_to_move_up_usd and cost_to_move_down_usd)
-            order: Sort results by field (market_cap_desc, volume_asc, trust_score_desc, etc.)
-            dex_pair_format: Display format for DEX pairs - contract_address or symbol (e.g., WETH, USDC)
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = f'/exchanges/{id}/tickers'
-        return self.client
+        Gets /simple/token_price/{id} for any number of contract addresses, chunked and merged like simple_price_many.
 
-    def exchanges_volume_chart(self, id):
-        '''
-        Query the historical volume chart data with time in UNIX and trading volume data in BTC based on exchange's ID.
-        
         Args:
-            id: Exchange ID
-        
-        Params:
-            days: Number of days of historical data (1, 7, 14, 30, 90, 180, 365, or max for all available data)
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = f'/exchanges/{id}/volume_chart'
-        return self.client
+            id: Asset platform id (e.g., ethereum)
+            contract_addresses: List of contract addresses, or one comma-separated string
+            params: The other /simple/token_price params (e.g., {"vs_currencies": "usd"})
 
-    # ENDPOINT_EXCHANGES_DERIVATIVES
-    @property
-    def derivatives(self):
+        Returns: dict
         '''
-        Query all the tickers from derivatives exchanges on CoinGecko.
-        
-        Args:
-            None
-        
-        Params:
-            None
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = '/derivatives'
-        return self.client
+        request = self.endpoints.simple_token_price(id).params(params)
+        chunks = chunk_values(contract_addresses, max_items=config.BATCH_MAX_ADDRESSES)
+        return merge_results(self.run_many([request.params({'contract_addresses': chunk}) for chunk in chunks], max_workers))
 
-    @property
-    def derivatives_exchanges(self):
-        '''
-        Query all the derivatives exchanges with related data (ID, name, open interest, …) on CoinGecko.
-        
-        Args:
-            None
-        
-        Params:
-            order: Sort results by field (market_cap_desc, volume_asc, trust_score_desc, etc.)
-            per_page: Number of results per page (1-250, default varies by endpoint)
-            page: Page number for pagination (starting from 1)
-        
-        Returns: CoinGeckoClient
+    def execute(self, request, block = True, mode = "json"):
         '''
-        self.client.endpoint = '/derivatives/exchanges'
-        return self.client
+        Sends a Request and returns the decoded JSON (or the raw body or the response, see mode).
 
-    def derivatives_exchanges_id(self, id):
-        '''
-        Query the derivatives exchange's related data (ID, name, open interest, …) based on the exchanges' ID.
-        
-        Args:
-            id: Exchange ID
-        
-        Params:
-            include_tickers: Include tickers data - all (all tickers), unexpired (non-expired only), or empty to omit
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = f'/derivatives/exchanges/{id}'
-        return self.client
+        Bodies are decoded with jsonlib, which uses orjson or ujson when one is installed (see config.JSON_BACKEND).
 
-    @property
-    def derivatives_exchanges_list(self):
-        '''
-        Query all the derivatives exchanges with ID and name on CoinGecko.
-        
-        Args:
-            None
-        
-        Params:
-            None
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = '/derivatives/exchanges/list'
-        return self.client
+        Every request first takes a token from self.rate_limiter (weighted per endpoint, see config.RATE_ENDPOINT_WEIGHTS).
+        The time spent waiting for it is stored in self.rate_limit_wait.
+        With a key pool (keys=...), the token comes from the pooled key with the most budget left, see keypool.KeyPool.
+        With a scheduler (scheduler=True), tokens go out by priority class and requests that cannot be sent before their
+        deadline return None straight away, see scheduling.Scheduler and Request.schedule.
 
-    # ENDPOINT_TREASURY
-    @property
-    def entities_list(self):
-        '''
-        Query all the supported entities (companies/governments) with their ID, name, symbol, and country.
-        
-        Args:
-            None
-        
-        Params:
-            None
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = '/entities/list'
-        return self.client
+        Failed attempts (429, 5xx, timeouts, connection errors) are retried according to self.retry_policy,
+        each retry taking a new rate limit token. The number of retries is stored in self.retry_count.
 
-    def public_treasury_entity_coin(self, entity, coin_id):
-        '''
-        Query the holdings of a specific coin (e.g., bitcoin) by a specific group (e.g., public_companies).
-        
-        Args:
-            entity: Entity name (e.g., public_companies)
-            coin_id: Coin ID (e.g., bitcoin)
-        
-        Params:
-            None
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = f'/{entity}/public_treasury/{coin_id}'
-        return self.client
+        Endpoints with a TTL in self.cache (see config.CACHE_TTL) are answered from memory while fresh,
+        without using a rate limit token. With a disk tier, stale entries are revalidated and a 304 reuses the stored body.
 
-    def public_treasury_entity(self, entity_id):
-        '''
-        Query the full cryptocurrency holdings and profile of a specific organization by its ID.
-        
-        Args:
-            entity_id: Entity ID
-        
-        Params:
-            None
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = f'/public_treasury/{entity_id}'
-        return self.client
+        Identical requests (same endpoint, params and headers) made while one is already in flight wait for it
+        and get the same result instead of using quota, unless the client was built with coalesce=False.
 
-    def public_treasury_holding_chart(self, entity_id, coin_id):
-        '''
-        Query historical chart data of an organization's holdings for a specific coin over time.
-        
         Args:
-            entity_id: Entity ID
-            coin_id: Coin ID (e.g., bitcoin)
-        
-        Params:
-            days: Number of days of historical data (1, 7, 14, 30, 90, 180, 365, or max for all available data)
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = f'/public_treasury/{entity_id}/{coin_id}/holding_chart'
-        return self.client
+            block: If True (default) wait for a token. If False, return None straight away when no token is free.
+            mode: "json" (default) returns the decoded body. "raw" returns the body as bytes without decoding it,
+                  for callers that only pass the payload on. "response" returns the requests.Response itself
+                  (never cached, always sent over the network). "numpy" returns time series (market_chart,
+                  market_chart/range, OHLC, onchain OHLCV) as a dict of NumPy columns, see columnar.to_columns.
+                  "records" returns the items of /coins/markets, tickers and onchain pool responses as compact
+                  __slots__ objects, see records.to_records.
 
-    def public_treasury_transaction_history(self, entity_id):
-        '''
-        Query the specific buy/sell history and transaction links for an organization.
-        
-        Args:
-            entity_id: Entity ID
-        
-        Params:
-            asset_id: Filter by asset ID (used in treasury endpoints to query specific coin holdings)
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = f'/public_treasury/{entity_id}/transaction_history'
-        return self.client
+        Returns: dict | list | bytes | requests.Response | None
 
-    # ENDPOINT_SEARCH
-    @property
-    def search(self):
-        '''
-        Search for specific coins, categories, or markets by name or keyword.
-        
-        Args:
-            None
-        
-        Params:
-            query: Search query string to find coins, categories, exchanges, or NFTs
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = '/search'
-        return self.client
+        Example:
+            >>> payload = cg.endpoints.coins_markets.params({"vs_currency": "usd"}).run(mode="raw")   # b'[{"id":"bitcoin",...'
+        '''
+        if mode not in config.RESPONSE_MODES:
+            raise ValueError(f"Unknown response mode {mode!r}, expected one of {config.RESPONSE_MODES}")
+        if mode == "numpy":
+            columnar.require_numpy()
+            data = self.execute(request, block)
+            return None if data is None else columnar.to_columns(data)
+        if mode == "records":
+            template = request.template
+            records.record_type(template) # Raises ValueError before anything is sent
+            data = self.execute(request, block)
+            return None if data is None else records.to_records(template, data)
+        if request.endpoint is None:
+            return self.report_error(AttributeError("No endpoint set for this request"))
+        template = request.template
+        ttl = self.cache.ttl(template) if self.cache is not None and mode != "response" else 0
+        if ttl:
+            cache_key = self.cache.key(request.endpoint, request.query_params)
+            cached = self.cache.get(cache_key, raw=mode == "raw")
+            if cached is not MISSING:
+                self.rate_limit_wait = 0.0
+                self.retry_count = 0
+                return cached
+        self.rate_limit_wait = 0.0
+        self.retry_count = 0
+        slot = self.scheduler.slot(template, request.priority, request.deadline) if self.scheduler is not None else None
+        if self.single_flight is None or mode == "response": # A response object can only be read by one caller
+            return self._fetch(request, template, ttl, block, mode, slot)
+        flight_key = (ResponseCache.key(request.endpoint, request.query_params), tuple(sorted(request.custom_headers.items())), mode)
+        return self.single_flight.do(flight_key, lambda: self._fetch(request, template, ttl, block, mode, slot))
+
+    def _fetch(self, request, template, ttl, block, mode, slot = None):
+        ''' Sends the request over the network: rate limiting, retries and cache writes. See execute. '''
+        if ttl:
+            cache_key = self.cache.key(request.endpoint, request.query_params)
+            validators = self.cache.validators(cache_key)
+        weight = self.rate_limiter.weight(template)
+        key = self._take_token(weight, block, slot)
+        if key is False:
+            return None
+        self.retry_policy.record_request()
+        event = self.hooks.start(template, request.endpoint, request.query_params, self.rate_limit_wait) if self.hooks.active else None
+        try :
+            headers = self.all_headers(request)
+            if ttl:
+                headers.update(validators)
+            response = self._send(request, headers, weight, event=event, key=key, slot=slot)
+            if ttl and response.status_code == 304:
+                data = self.cache.revalidated(cache_key, ttl, raw=mode == "raw")
+                if data is not MISSING:
+                    if event is not None:
+                        self.hooks.finish(event, 304, len(response.content))
+                    return data
+                response = self._send(request, self.all_headers(request), weight, event=event, key=key, slot=slot) # Entry vanished from disk since the request was sent, fetch it in full
+            if event is not None:
+                self.hooks.finish(event, response.status_code, len(response.content))
+            if mode == "response":
+                return response
+            data = response.content if mode == "raw" else jsonlib.loads(response.content)
+            if ttl:
+                self.cache.set(cache_key, MISSING if mode == "raw" else data, response.content, ttl, response.headers)
+            return data
+        except (AttributeError, ValueError, scheduling.DeadlineExceeded, requests.exceptions.RequestException) as error: # ValueError covers invalid JSON
+            if event is not None and event.error is not error: # Failed attempts were already reported by _send
+                self.hooks.fail(event, error)
+            return self.report_error(error)
+
+    def _take_token(self, weight, block, slot = None):
+        '''
+        Takes a rate limit token (see execute), from the key pool's best key if the client has one,
+        through the scheduler's queue when a slot is given.
+
+        Returns: ApiKey | None | bool : The pooled key to send with (None without a key pool), False if block is False
+                 and no token is free, or if the slot's deadline cannot be met.
+        '''
+        if slot is not None:
+            return self._take_scheduled(weight, block, slot)
+        key = None
+        if block:
+            if self.key_pool is not None:
+                key, self.rate_limit_wait = self.key_pool.acquire(weight)
+            else:
+                self.rate_limit_wait = self.rate_limiter.acquire(weight)
+            if test_debug and self.rate_limit_wait > 0:
+                print(f"Waited {self.rate_limit_wait:.2f} seconds for a rate limit token")
+            return key
+        if self.key_pool is not None:
+            key = self.key_pool.try_acquire(weight)
+            taken = key is not None
+        else:
+            taken = self.rate_limiter.try_acquire(weight)
+        if taken:
+            self.rate_limit_wait = 0.0
+            return key
+        print("Local rate limit reached. Please try again later or call run() with block=True.")
+        return False
+
+    def _take_scheduled(self, weight, block, slot):
+        ''' _take_token through self.scheduler. '''
+        if block:
+            try:
+                grant, self.rate_limit_wait = self.scheduler.acquire(weight, slot)
+            except scheduling.DeadlineExceeded as error:
+                self.report_error(error)
+                return False
+        else:
+            grant = self.scheduler.try_acquire(weight, slot)
+            if grant is None:
+                print("Local rate limit reached. Please try again later or call run() with block=True.")
+                return False
+            self.rate_limit_wait = 0.0
+        return grant if self.key_pool is not None else None
+
+    def _send(self, request, headers, weight, stream = False, event = None, key = None, slot = None) -> "requests.Response":
+        '''
+        GETs the request, retrying failed attempts according to self.retry_policy. Raises the last error if it gives up.
+
+        With an event (hooks registered), each attempt records its timings on it and each failed attempt fires on_error.
+        With a pooled key, the request goes to the key's base URL with its header. A 401/429 sidelines the key and
+        the retry goes out straight away on another key, if one is usable.
+        With a slot, retries queue in the scheduler again and are given up if they cannot start before its deadline.
+        '''
+        while True:
+            if event is not None:
+                event.dns = event.connect = 0.0
+                timing.track(event)
+            try :
+                base_url, attempt_headers = (self.base_url, headers) if key is None else (key.base_url, {**headers, **key.headers})
+                response = self.session.get(f"{base_url}{request.endpoint}", headers=attempt_headers, params=request.query_params, timeout=config.TIMEOUT, stream=stream)
+                if event is not None:
+                    event.ttfb = response.elapsed.total_seconds()
+                response.raise_for_status()  # Raise an error for bad status codes
+                return response
+            except requests.exceptions.RequestException as error:
+                switch = key is not None and self.key_pool.switch(key, error.response)
+                delay = 0.0 if switch else self.retry_policy.delay(error, self.retry_count)
+                if delay is not None and slot is not None and slot.expires_within(delay):
+                    delay = None # The retry would start past the deadline
+                if event is not None:
+                    self.hooks.fail(event, error, error.response.status_code if error.response is not None else None, delay is not None)
+                if delay is None: # Not retryable, out of attempts or out of retry budget
+                    raise
+                self.retry_count += 1
+                if test_debug :
+                    print(f"Attempt {self.retry_count} failed ({error}), retrying in {delay:.2f} seconds")
+                time.sleep(delay)
+                if slot is not None:
+                    grant, waited = self.scheduler.acquire(weight, slot) # Raises DeadlineExceeded, reported by the caller
+                    key = grant if self.key_pool is not None else None
+                    self.rate_limit_wait += waited
+                elif key is not None:
+                    key, waited = self.key_pool.acquire(weight)
+                    self.rate_limit_wait += waited
+                else:
+                    self.rate_limit_wait += self.rate_limiter.acquire(weight)
+                if event is not None:
+                    event.retries = self.retry_count
+                    event.rate_limit_wait = self.rate_limit_wait
+            finally:
+                if event is not None:
+                    timing.track(None)
 
-    @property
-    def search_trending(self):
+    def stream(self, request, path = None, chunk_size = config.STREAM_CHUNK_SIZE, block = True):
         '''
-        Query the top trending coins, NFTs, and categories from the last 24 hours.
-        
-        Args:
-            None
-        
-        Params:
-            show_max: Show maximum results available - coins, nfts, categories (comma-separated for multiple)
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = '/search/trending'
-        return self.client
+        Yields the elements of a JSON array in the response one by one while the body is downloading.
 
-    @property
-    def asset_platforms(self):
-        '''
-        Query all blockchain networks (Ethereum, Solana, etc.) supported by CoinGecko.
-        
-        Args:
-            None
-        
-        Params:
-            filter: Apply filters to results (e.g., nft to get NFT-supporting asset platforms)
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = '/asset_platforms'
-        return self.client
+        Memory stays bounded by one element instead of the whole payload, for very large responses such as
+        /coins/list?include_platform=true, /token_lists/{asset_platform_id}/all.json or /derivatives.
+        Streamed responses are rate limited and retried (until the body starts) but not cached or coalesced.
 
-    def token_lists(self, asset_platform_id):
-        '''
-        Get a full list of tokens for a specific blockchain network.
-        
         Args:
-            asset_platform_id: Asset platform ID (e.g., ethereum, solana)
-        
-        Params:
-            None
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = f'/token_lists/{asset_platform_id}/all.json'
-        return self.client
+            request: The Request to send
+            path: Key(s) of the array inside the response (e.g., "tokens"). Defaults to config.STREAM_ITEMS_KEY
+                  for the endpoint, or the response itself if it is an array. Use "" to force the top level.
+            chunk_size: Bytes read from the socket at a time
 
-    # ENDPOINT_ONCHAIN
-    @property
-    def onchain_networks(self):
-        '''
-        Query all supported blockchain networks on GeckoTerminal.
-        
-        Args:
-            None
-        
-        Params:
-            None
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = '/onchain/networks'
-        return self.client
+        Returns: Generator
 
-    def onchain_networks_dexes(self, network):
-        '''
-        Query all supported decentralized exchanges (DEXs) on a specific network.
-        
-        Args:
-            network: Network name (e.g., ethereum, solana)
-        
-        Params:
-            None
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = f'/onchain/networks/{network}/dexes'
-        return self.client
+        Example:
+            >>> for token in cg.endpoints.token_lists("ethereum").stream():
+            ...     print(token["address"])
+        '''
+        if request.endpoint is None:
+            self.report_error(AttributeError("No endpoint set for this request"))
+            return
+        template = request.template
+        if path is None:
+            path = config.STREAM_ITEMS_KEY.get(template)
+        weight = self.rate_limiter.weight(template)
+        self.retry_count = 0
+        slot = self.scheduler.slot(template, request.priority, request.deadline) if self.scheduler is not None else None
+        key = self._take_token(weight, block, slot)
+        if key is False:
+            return
+        self.retry_policy.record_request()
+        event = self.hooks.start(template, request.endpoint, request.query_params, self.rate_limit_wait) if self.hooks.active else None
+        try :
+            with self._send(request, self.all_headers(request), weight, stream=True, event=event, key=key, slot=slot) as response:
+                if event is not None:
+                    self.hooks.finish(event, response.status_code, None) # Fired when the headers arrive, the body is read by the caller
+                yield from streaming.iter_json_array(response.iter_content(chunk_size), path)
+        except (AttributeError, ValueError, scheduling.DeadlineExceeded, requests.exceptions.RequestException) as error: # ValueError covers invalid or truncated JSON
+            if event is not None and event.error is not error:
+                self.hooks.fail(event, error)
+            self.report_error(error)
 
-    def onchain_networks_token_info(self, network, token_address):
-        '''
-        Query token metadata (socials, description, image) via contract address.
-        
-        Args:
-            network: Network name (e.g., ethereum, solana)
-            token_address: Token contract address
-        
-        Params:
-            None
-        
-        Returns: CoinGeckoClient
+    def report_error(self, error) -> None:
         '''
-        self.client.endpoint = f'/onchain/networks/{network}/tokens/{token_address}/info'
-        return self.client
+        Prints a message for an error raised while making a request (detailed when DEBUG is set).
 
-    def onchain_networks_pools(self, network, pool_address):
+        Returns: None : So callers can return self.report_error(error) as the failed result.
         '''
-        Query a specific liquidity pool's data.
-        
-        Args:
-            network: Network name (e.g., ethereum, solana)
-            pool_address: Pool contract address
-        
-        Params:
-            None
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = f'/onchain/networks/{network}/pools/{pool_address}'
-        return self.client
+        if isinstance(error, AttributeError):
+            if test_debug :
+                print(f"An error occurred: {error}")
+            else:
+                print("Please ensure that endpoint, params, and headers are set before making a request.")
+        elif isinstance(error, requests.exceptions.HTTPError): # Handles HTTP errors eg 4xx and 5xx status codes
+            if test_debug :
+                if error.response.status_code == 429:
+                    print(f"Error {error.response.status_code}, Rate limit exceeded. Please try again later.")
+                elif error.response.status_code == 401:
+                    print(f"Error {error.response.status_code}, Unauthorized access. Please check your API key.")
+                elif error.response.status_code == 404:
+                    print(f"Error {error.response.status_code}, Endpoint not found. Please check the endpoint URL.")
+                elif error.response.status_code == 403:
+                    print(f"Error {error.response.status_code}, Forbidden access. You do not have permission to access this resource.")
+                else:
+                    print(f"HTTP error occurred: {error}")
+            else:
+                if error.response.status_code == 429:
+                    print("Rate limit exceeded. Please try again later.")
+                elif error.response.status_code == 401:
+                    print("Unauthorized access. Please check if you have a valid API key.") 
+                elif error.response.status_code == 404:
+                    print("Endpoint not found. Please enter a valid endpoint URL.")
+                elif error.response.status_code == 403:
+                    print("Forbidden access. You are restricted from accessing this resource.")
+                else:
+                    print("An error occurred while processing your request.")
+        elif isinstance(error, scheduling.DeadlineExceeded): # Dropped by the scheduler before it was sent
+            if test_debug :
+                print(f"Request dropped: {error}")
+            else:
+                print("Request dropped, it could not be sent before its deadline.")
+        else: # Handles other requests exceptions eg connection errors, timeouts, etc
+            if test_debug :
+                print(f"An error occurred while making the request: {error}")
+            else:
+                print("An error occurred while making the request. Please check your network connection and try again.")
+        return None
 
-    def onchain_networks_pools_multi(self, network, pool_addresses):
-        '''
-        Query multiple pools at once.
-        
-        Args:
-            network: Network name (e.g., ethereum, solana)
-            pool_addresses: Comma-separated pool contract addresses
-        
-        Params:
-            None
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = f'/onchain/networks/{network}/pools/multi/{pool_addresses}'
-        return self.client
 
-    @property
-    def onchain_trending_pools(self):
-        '''
-        Query trending pools across all networks.
-        
-        Args:
-            None
-        
-        Params:
-            page: Page number for pagination (starting from 1)
-            per_page: Number of results per page (1-250, default varies by endpoint)
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = '/onchain/networks/trending_pools'
-        return self.client
+class Request:
+    '''
+    Immutable description of one API call: endpoint path, query params and extra headers.
 
-    def onchain_networks_trending_pools(self, network):
-        '''
-        Query trending pools on a specific network.
-        
-        Args:
-            network: Network name (e.g., ethereum, solana)
-        
-        Params:
-            page: Page number for pagination (starting from 1)
-            per_page: Number of results per page (1-250, default varies by endpoint)
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = f'/onchain/networks/{network}/trending_pools'
-        return self.client
+    params() and headers() return a new Request instead of changing this one, so a Request (and the
+    client behind it) can be shared freely between threads.
 
-    def onchain_networks_top_pools(self, network):
-        '''
-        Query top-performing pools on a specific network.
-        
-        Args:
-            network: Network name (e.g., ethereum, solana)
-        
-        Params:
-            page: Page number for pagination (starting from 1)
-            per_page: Number of results per page (1-250, default varies by endpoint)
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = f'/onchain/networks/{network}/pools'
-        return self.client
+    Example:
+        >>> btc = cg.endpoints.simple_price.params({"ids": "bitcoin", "vs_currencies": "usd"})
+        >>> btc_eur = btc.params({"vs_currencies": "eur"})   # btc is unchanged
+        >>> btc.run()
+    '''
+    __slots__ = ('client', 'endpoint', 'query_params', 'custom_headers', 'route', 'priority', 'deadline')
 
-    def onchain_networks_dex_pools(self, network, dex):
-        '''
-        Query top pools for a specific DEX (e.g., Uniswap) on a specific network.
-        
-        Args:
-            network: Network name (e.g., ethereum, solana)
-            dex: DEX name (e.g., uniswap, sushiswap)
-        
-        Params:
-            page: Page number for pagination (starting from 1)
-            per_page: Number of results per page (1-250, default varies by endpoint)
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = f'/onchain/networks/{network}/dexes/{dex}/pools'
-        return self.client
+    def __init__(self, client, endpoint, query_params = None, custom_headers = None, route = None, priority = None, deadline = None) -> None:
+        object.__setattr__(self, 'client', client)
+        object.__setattr__(self, 'endpoint', endpoint)
+        object.__setattr__(self, 'query_params', MappingProxyType(dict(query_params or {}))) # Read-only view of a private copy
+        object.__setattr__(self, 'custom_headers', MappingProxyType(dict(custom_headers or {})))
+        object.__setattr__(self, 'route', route) # endpoints.Route of the endpoint, None if it is not in the registry
+        object.__setattr__(self, 'priority', priority) # Scheduler class, None for the endpoint default (see schedule)
+        object.__setattr__(self, 'deadline', deadline) # Seconds from run() the request must be sent by, None for the endpoint default
 
-    @property
-    def onchain_new_pools(self):
-        '''
-        Query the newest pools created across all networks.
-        
-        Args:
-            None
-        
-        Params:
-            page: Page number for pagination (starting from 1)
-            per_page: Number of results per page (1-250, default varies by endpoint)
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = '/onchain/networks/new_pools'
-        return self.client
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{self.__class__.__name__} is immutable, use params() or headers() to build a new one')
 
-    def onchain_networks_new_pools(self, network):
-        '''
-        Query the latest pools on a specific network.
-        
-        Args:
-            network: Network name (e.g., ethereum, solana)
-        
-        Params:
-            page: Page number for pagination (starting from 1)
-            per_page: Number of results per page (1-250, default varies by endpoint)
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = f'/onchain/networks/{network}/new_pools'
-        return self.client
+    def __delattr__(self, name):
+        raise AttributeError(f'{self.__class__.__name__} is immutable')
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.endpoint!r}, params={dict(self.query_params)})'
 
     @property
-    def onchain_search_pools(self):
-        '''
-        Search for pools by name or address.
-        
-        Args:
-            None
-        
-        Params:
-            query: Search query string to find coins, categories, exchanges, or NFTs
-            page: Page number for pagination (starting from 1)
-            per_page: Number of results per page (1-250, default varies by endpoint)
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = '/onchain/search/pools'
-        return self.client
+    def template(self):
+        ''' Returns the endpoint template (e.g., /coins/{id}/market_chart), used for cache TTLs, rate limit weights and pagination. '''
+        return self.route.template if self.route is not None else self.endpoint
 
-    def onchain_networks_pools_info(self, network, pool_address):
-        '''
-        Query pool metadata (base/quote token details, socials).
-        
-        Args:
-            network: Network name (e.g., ethereum, solana)
-            pool_address: Pool contract address
-        
-        Params:
-            None
-        
-        Returns: CoinGeckoClient
+    def params(self, params : dict) -> "Request":
         '''
-        self.client.endpoint = f'/onchain/networks/{network}/pools/{pool_address}/info'
-        return self.client
+        Returns a new Request with the given query parameters added (e.g., {"ids": "bitcoin", "vs_currencies": "usd"}).
 
-    def onchain_simple_token_price(self, network, token_addresses):
+        With config.VALIDATE_REQUESTS, a param the endpoint does not accept (see params.PARAMS_ALL) raises ValueError.
         '''
-        Get real-time token price based on contract address.
-        
-        Args:
-            network: Network name (e.g., ethereum, solana)
-            token_addresses: Comma-separated token contract addresses
-        
-        Params:
-            None
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = f'/onchain/simple/networks/{network}/token_price/{token_addresses}'
-        return self.client
+        if self.route is not None and config.VALIDATE_REQUESTS:
+            self.route.check_params(params)
+        return Request(self.client, self.endpoint, {**self.query_params, **params}, self.custom_headers, self.route, self.priority, self.deadline)
 
-    def onchain_networks_token_pools(self, network, token_address):
-        '''
-        Query all pools that contain a specific token.
-        
-        Args:
-            network: Network name (e.g., ethereum, solana)
-            token_address: Token contract address
-        
-        Params:
-            page: Page number for pagination (starting from 1)
-            per_page: Number of results per page (1-250, default varies by endpoint)
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = f'/onchain/networks/{network}/tokens/{token_address}/pools'
-        return self.client
+    def headers(self, headers : dict) -> "Request":
+        ''' Returns a new Request with the given custom headers added (e.g., {"Authorization": "Bearer token"}). '''
+        return Request(self.client, self.endpoint, self.query_params, {**self.custom_headers, **headers}, self.route, self.priority, self.deadline)
 
-    def onchain_networks_token(self, network, token_address):
+    def schedule(self, priority = None, deadline = None) -> "Request":
         '''
-        Query specific data for a token on a network.
-        
-        Args:
-            network: Network name (e.g., ethereum, solana)
-            token_address: Token contract address
-        
-        Params:
-            None
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = f'/onchain/networks/{network}/tokens/{token_address}'
-        return self.client
+        Returns a new Request with a scheduler priority class and/or deadline, used when the client has a scheduler.
 
-    @property
-    def onchain_tokens_recently_updated(self):
-        '''
-        Query the 100 most recently updated tokens across all networks.
-        
         Args:
-            None
-        
-        Params:
-            page: Page number for pagination (starting from 1)
-            per_page: Number of results per page (1-250, default varies by endpoint)
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = '/onchain/tokens/info_recently_updated'
-        return self.client
+            priority: Class from config.SCHEDULER_CLASSES ("high", "normal", "low"), overrides config.SCHEDULER_PRIORITY
+            deadline: Seconds from each run() within which the request must be sent, else it is dropped and returns None
 
-    def onchain_networks_pools_ohlcv(self, network, pool_address, timeframe):
-        '''
-        Get OHLCV chart data (Open, High, Low, Close, Volume) for a pool.
-        
-        Args:
-            network: Network name (e.g., ethereum, solana)
-            pool_address: Pool contract address
-            timeframe: Time interval for OHLCV data (e.g., 1h, 4h, 1d)
-        
-        Params:
-            from: Starting date/timestamp for historical data range (ISO date YYYY-MM-DD or UNIX timestamp)
-            to: Ending date/timestamp for historical data range (ISO date YYYY-MM-DD or UNIX timestamp)
-        
-        Returns: CoinGeckoClient
+        Example:
+            >>> price = cg.endpoints.simple_price.params({"ids": "bitcoin", "vs_currencies": "usd"}).schedule("high", deadline=2)
         '''
-        self.client.endpoint = f'/onchain/networks/{network}/pools/{pool_address}/ohlcv/{timeframe}'
-        return self.client
+        return Request(self.client, self.endpoint, self.query_params, self.custom_headers, self.route,
+                       priority if priority is not None else self.priority, deadline if deadline is not None else self.deadline)
 
-    def onchain_networks_pools_trades(self, network, pool_address):
-        '''
-        Query the last 300 trades in the past 24 hours for a pool.
-        
-        Args:
-            network: Network name (e.g., ethereum, solana)
-            pool_address: Pool contract address
-        
-        Params:
-            page: Page number for pagination (starting from 1)
-            per_page: Number of results per page (1-250, default varies by endpoint)
-        
-        Returns: CoinGeckoClient
-        '''
-        self.client.endpoint = f'/onchain/networks/{network}/pools/{pool_address}/trades'
-        return self.client
+    def run(self, block = True, mode = "json"):
+        ''' Sends this request through its client, see CoinGeckoClient.execute for block and mode (config.RESPONSE_MODES). '''
+        return self.client.execute(self, block, mode)
+
+    def stream(self, path = None, block = True):
+        ''' Yields the elements of the JSON array in the response one by one, see CoinGeckoClient.stream. '''
+        return self.client.stream(self, path, block=block)
+
+
+def _accessor_doc(route) -> str:
+    ''' Returns the docstring of an endpoint accessor: description, path args and the query params it accepts. '''
+    from params import PARAMS_ALL, PARAMS_ALL_DETAILS
+    args = [f'{name}: {route.path_details.get(name, name)}' for name in route.path_params] or ['None']
+    params = [f'{name}: {PARAMS_ALL_DETAILS.get(name, name)}' for name in PARAMS_ALL[route.template]] or ['None']
+    indent = '\n            '
+    return (f'\n        {route.description.rstrip(".")}.\n        \n        Args:{indent}{indent.join(args)}\n        \n'
+            f'        Params:{indent}{indent.join(params)}\n        \n        Returns: Request\n        ')
+
+
+def _accessor(route):
+    '''
+    Returns the accessor of one route: a property if its path has no placeholders (cg.endpoints.ping),
+    else a method taking the path values by position or by name (cg.endpoints.coins_ohlc("bitcoin")).
+    '''
+    if not route.path_params:
+        def accessor(self):
+            return self.client.request(route.template, route) # Builds a new Request for this endpoint, the client itself is never modified
+    else:
+        import inspect
+        def accessor(self, *args, **kwargs):
+            return self.client.request(route.format(*args, **kwargs), route) # Raises TypeError/ValueError for missing or invalid path values
+        parameters = [inspect.Parameter(name, inspect.Parameter.POSITIONAL_OR_KEYWORD) for name in ('self',) + route.path_params]
+        accessor.__signature__ = inspect.Signature(parameters)
+    accessor.__name__ = route.name
+    accessor.__qualname__ = f'Endpoints.{route.name}'
+    accessor.__doc__ = _accessor_doc(route)
+    return accessor if route.path_params else property(accessor)
+
+
+class Endpoints:
+    '''
+    Endpoint accessors, one per entry of endpoints.ROUTES, generated from the registry on first access.
+
+    Endpoints without path values are properties, the others are methods:
+        >>> cg.endpoints.simple_price.params({"ids": "bitcoin", "vs_currencies": "usd"}).run()
+        >>> cg.endpoints.coins_market_chart("bitcoin").params({"vs_currency": "usd", "days": 30}).run()
+    '''
+    def __init__(self, client): # initializes to take in the original client and return something back
+        self.client = client
+
+    def __getattr__(self, name): # Only called for accessors not built yet, the registry is loaded by the first one
+        route = endpoints.ROUTES.get(name)
+        if route is None:
+            raise AttributeError(f"{self.__class__.__name__!r} has no endpoint {name!r}, see endpoints.ROUTES")
+        setattr(Endpoints, name, _accessor(route)) # Found on the class from now on
+        return getattr(self, name)
+
+    def __dir__(self):
+        return list(super().__dir__()) + list(endpoints.ROUTES)
 
 #cg = CoinGeckoClient(test_api_key)
 #parameters = {
@@ -0,0 +1,75 @@
+''' Single-flight request coalescing: identical requests in flight at the same time share one network call '''
+
+import threading, lazy
+
+asyncio = lazy.LazyModule("asyncio") # Only needed by AsyncSingleFlight
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    '''
+    Runs func once per key at a time for threads: callers that arrive while a call with the same key
+    is running wait for it and get its result (or its exception) instead of making their own call.
+
+    Every caller gets the same result object, do not modify it.
+
+    Example:
+        >>> flight = SingleFlight()
+        >>> flight.do(('/simple/price', (('ids', 'bitcoin'),)), lambda: fetch())
+    '''
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.shared = 0 # Calls answered by another caller's request
+
+    def do(self, key, func):
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+            else:
+                self.shared += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = func()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.result
+
+
+class AsyncSingleFlight:
+    '''
+    Asyncio version of SingleFlight: coroutines with the same key await one shared task.
+
+    The shared task is shielded, so cancelling one waiter does not cancel the request for the others.
+    '''
+    def __init__(self) -> None:
+        self.calls = {}
+        self.shared = 0
+
+    async def do(self, key, func):
+        task = self.calls.get(key)
+        if task is None:
+            task = self.calls[key] = asyncio.ensure_future(func())
+            task.add_done_callback(lambda _: self.calls.pop(key, None))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
@@ -0,0 +1,94 @@
+''' Columnar NumPy output for time series responses (market_chart, market_chart/range, OHLC and onchain OHLCV) '''
+
+try:
+    import numpy
+except ImportError: # Optional, only needed for run(mode="numpy")
+    numpy = None
+
+
+OHLC_COLUMNS = ('open', 'high', 'low', 'close')
+OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+def require_numpy() -> None:
+    if numpy is None:
+        raise ImportError('NumPy is required for mode="numpy", install it with "pip install numpy"')
+
+
+def _table(rows, width):
+    ''' Packs a list of equal-length rows into a (width, n) float64 array, so each column is one contiguous row. '''
+    return numpy.array(rows, dtype=numpy.float64).reshape(-1, width).T.copy()
+
+
+def _timestamps(column):
+    return column.astype(numpy.int64) # Millisecond timestamps are exact in float64 (below 2**53)
+
+
+def rows_to_columns(rows, names) -> dict:
+    '''
+    Converts [[timestamp, value1, value2, ...], ...] rows into a dict of contiguous columns.
+
+    Returns: dict : {"timestamp": int64 array, names[0]: float64 array, ...}
+    '''
+    table = _table(rows, len(names) + 1)
+    columns = {'timestamp': _timestamps(table[0])}
+    for index, name in enumerate(names, 1):
+        columns[name] = table[index]
+    return columns
+
+
+def market_chart_columns(data) -> dict:
+    '''
+    Converts a market_chart or market_chart/range response into columns sharing one timestamp column.
+
+    The API normally returns prices, market_caps and total_volumes at the same timestamps. When they differ,
+    the timestamps are merged and missing values are NaN.
+
+    Returns: dict : {"timestamp": int64 array, "prices": float64 array, "market_caps": ..., "total_volumes": ...}
+    '''
+    series = {name: _table(pairs, 2) for name, pairs in data.items() if isinstance(pairs, list)}
+    timestamps = [table[0] for table in series.values()]
+    if all(len(stamps) == len(timestamps[0]) and numpy.array_equal(stamps, timestamps[0]) for stamps in timestamps):
+        shared = timestamps[0] if timestamps else numpy.empty(0)
+        columns = {'timestamp': _timestamps(shared)}
+        for name, table in series.items():
+            columns[name] = table[1]
+        return columns
+    shared = numpy.unique(numpy.concatenate(timestamps)) # Sorted union
+    columns = {'timestamp': _timestamps(shared)}
+    for name, table in series.items():
+        values = numpy.full(len(shared), numpy.nan)
+        values[numpy.searchsorted(shared, table[0])] = table[1]
+        columns[name] = values
+    return columns
+
+
+def to_columns(data) -> dict:
+    '''
+    Converts a decoded time series response into a dict of NumPy columns: int64 "timestamp" plus one float64 array per value.
+
+    Every column is a contiguous array, so pandas.DataFrame(columns) and pyarrow.table(columns) can use them without reshaping.
+    Timestamps are kept as the API sends them (milliseconds, or seconds for onchain OHLCV). Null values become NaN.
+
+    Supported shapes:
+        /coins/{id}/market_chart(/range): {"prices": [[t, v], ...], ...} -> timestamp, prices, market_caps, total_volumes
+        /coins/{id}/ohlc: [[t, o, h, l, c], ...] -> timestamp, open, high, low, close
+        /onchain/.../ohlcv/{timeframe}: {"data": {"attributes": {"ohlcv_list": [...]}}} -> timestamp, open, high, low, close, volume
+
+    Returns: dict
+
+    Example:
+        >>> columns = cg.endpoints.coins_market_chart("bitcoin").params({"vs_currency": "usd", "days": 30}).run(mode="numpy")
+        >>> columns["prices"].mean()
+        >>> pandas.DataFrame(columns).set_index("timestamp")
+    '''
+    require_numpy()
+    if isinstance(data, list):
+        return rows_to_columns(data, OHLC_COLUMNS)
+    if isinstance(data, dict) and isinstance(data.get('prices'), list):
+        return market_chart_columns(data)
+    try:
+        rows = data['data']['attributes']['ohlcv_list']
+    except (KeyError, TypeError):
+        raise ValueError('mode="numpy" only supports market_chart, market_chart/range, OHLC and onchain OHLCV responses') from None
+    return rows_to_columns(rows, OHLCV_COLUMNS)
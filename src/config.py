@@ -4,11 +4,134 @@ DEFAULT_BASE_URL = "https://api.coingecko.com/api/v3"
 
 
 TIMEOUT = 30
-RETRY_ATTEMPT = 3
-RETRY_DELAY = 5
+RETRY_ATTEMPT = 3 # Retries for timeouts and connection errors
+RETRY_DELAY = 5 # Base backoff in seconds, doubled on every retry (full jitter)
+RETRY_MAX_DELAY = 60 # Cap on a single backoff
+RETRY_AFTER_MAX = 120 # Cap on how long a Retry-After header can make us wait
+RETRY_STATUS_ATTEMPTS = {429: 5, 500: 2, 502: 3, 503: 5, 504: 3} # Retries per HTTP status, statuses not listed are never retried
+RETRY_AFTER_STATUSES = {429, 503} # Statuses whose Retry-After header is honored
+RETRY_BUDGET_RATIO = 0.2 # Each request earns 0.2 retries, so retries stay under ~20% of traffic
+RETRY_BUDGET_MIN = 10 # Retries available before any request has been made
+RETRY_BUDGET_MAX = 50 # Max retries that can be saved up
 
 
 RATE_REQUEST_PER_MINUTE = 30
+RATE_BURST = 10 # Max requests that can be sent back to back before the limiter starts spacing them out
+RATE_ENDPOINT_WEIGHTS = {} # Tokens used per call, keyed by endpoint template (e.g. {"/coins/list": 2}). Missing endpoints cost 1
+
+
+# API KEYS
+API_KEY_TIER = "demo" # Tier of the API_Key given to CoinGeckoClient, a key of API_TIERS
+API_TIERS = { # Base URL, key header and default rate limit of each key tier
+    "demo": {"base_url": DEFAULT_BASE_URL, "header": "x-cg-demo-api-key", "rate_per_minute": RATE_REQUEST_PER_MINUTE, "burst": RATE_BURST},
+    "pro": {"base_url": "https://pro-api.coingecko.com/api/v3", "header": "x-cg-pro-api-key", "rate_per_minute": 500, "burst": 50},
+}
+KEY_COOLDOWN = {401: 300, 429: 60} # Seconds a pooled key is sidelined after these statuses, a 429 Retry-After header takes precedence
+
+
+# SCHEDULER
+SCHEDULER_CLASSES = ("high", "normal", "low") # Priority classes of scheduling.Scheduler, the first is dispatched first
+SCHEDULER_DEFAULT_CLASS = "normal" # Class of endpoints not listed in SCHEDULER_PRIORITY
+SCHEDULER_PRIORITY = { # Class per endpoint template, Request.schedule(priority=...) overrides it
+    "/simple/price": "high",
+    "/simple/token_price/{id}": "high",
+    "/coins/{id}/market_chart/range": "low",
+    "/coins/{id}/contract/{contract_address}/market_chart/range": "low",
+}
+SCHEDULER_DEADLINE = {} # Default deadline in seconds per endpoint template (e.g. {"/simple/price": 5}), Request.schedule(deadline=...) overrides it
+SCHEDULER_POLL_INTERVAL = 0.05 # Max seconds a queued async request sleeps before checking its place in line again
+
+
+# CONNECTION POOL
+POOL_CONNECTIONS = 10 # Number of per-host connection pools kept by the session
+POOL_MAXSIZE = 10 # Max keep-alive connections kept open per host
+POOL_BLOCK = False # If True, wait for a free connection instead of opening a throwaway one when the pool is full
+ASYNC_CONCURRENCY = 10 # Default max requests in flight for AsyncCoinGeckoClient.gather_many
+
+
+# RESPONSE CACHE
+CACHE_MAX_BYTES = 64 * 1024 * 1024 # Memory budget for cached response bodies
+CACHE_TTL = { # Seconds a response stays fresh, keyed by endpoint template. Endpoints not listed are never cached
+    "/simple/supported_vs_currencies": 6 * 3600,
+    "/coins/list": 3600,
+    "/coins/categories/list": 6 * 3600,
+    "/asset_platforms": 6 * 3600,
+    "/exchanges/list": 3600,
+    "/derivatives/exchanges/list": 3600,
+    "/entities/list": 6 * 3600,
+    "/onchain/networks": 6 * 3600,
+    "/token_lists/{asset_platform_id}/all.json": 3600,
+}
+DISK_CACHE_PATH = "~/.cache/phegeck/responses.sqlite" # Default file for cache.DiskCache
+
+
+# PRICE BATCHING
+BATCH_MAX_IDS = 250 # Max coin ids per /simple/price call
+BATCH_MAX_ADDRESSES = 100 # Max contract addresses per /simple/token_price call
+BATCH_MAX_URL_CHARS = 4000 # Max URL-encoded length of the ids/contract_addresses value, keeps URLs well under server limits
+BATCH_WINDOW = 0.005 # Seconds PriceBatcher waits to collect single lookups into one request
+
+
+# PAGINATION
+PAGE_ITEMS_KEY = {"/coins/{id}/tickers": "tickers", "/exchanges/{id}/tickers": "tickers"} # Where the items are in a page response, onchain endpoints use "data"
+PAGE_SIZE = { # Items in a full page when per_page is not set, a shorter page is the last one
+    "/coins/markets": 100,
+    "/coins/{id}/tickers": 100,
+    "/exchanges": 100,
+    "/exchanges/{id}/tickers": 100,
+    "/nfts/list": 100,
+    "/derivatives/exchanges": 100,
+}
+PAGE_SIZE_ONCHAIN = 20
+PAGE_RETRY_ROUNDS = 2 # Times fetch_pages and iter_pages fetch pages that failed again before giving up on them
+PAGE_FAILED_WAVES = 1 # Waves in a row with every page failed after which fetch_pages (without last_page) stops looking for the last page
+
+
+# STREAMING
+STREAM_CHUNK_SIZE = 64 * 1024 # Bytes read at a time by CoinGeckoClient.stream
+STREAM_ITEMS_KEY = { # Key of the array that stream() yields, endpoints not listed must return an array
+    "/token_lists/{asset_platform_id}/all.json": "tokens",
+    "/coins/{id}/tickers": "tickers",
+    "/exchanges/{id}/tickers": "tickers",
+    "/derivatives/exchanges/{id}": "tickers",
+}
+
+
+# HISTORICAL BACKFILL
+BACKFILL_SPANS = { # Range (seconds) /coins/{id}/market_chart/range answers at each granularity without an interval param: (longer than, up to)
+    "hourly": (86400, 90 * 86400), # Up to 1 day is 5-minutely when the range ends near the current time
+    "daily": (90 * 86400, 365 * 86400), # Anything above 90 days is daily, the upper bound only keeps each response small
+}
+BACKFILL_INTERVAL_SPANS = {"5m": 10 * 86400, "hourly": 100 * 86400, "daily": 365 * 86400} # Max range per call with an explicit interval param (Enterprise plans)
+BACKFILL_RETRY_ROUNDS = 2 # Times backfill_market_chart fetches chunks that failed again before giving up on them
+BACKFILL_CHECKPOINT_DIR = "~/.cache/phegeck/backfill" # Progress files of unfinished backfills
+
+# TIME SERIES STORE
+TIMESERIES_DIR = "~/.cache/phegeck/timeseries" # Default folder of timeseries.TimeSeriesStore
+TIMESERIES_HISTORY_DAYS = 365 # History fetched by the first refresh() of a coin
+
+# COIN INDEX
+COIN_INDEX_PATH = "~/.cache/phegeck/coin_index.json.gz" # Where resolver.CoinResolver keeps the index between runs
+COIN_INDEX_REFRESH = 24 * 3600 # Seconds before the index is rebuilt from /coins/list in the background
+COIN_INDEX_RETRY_DELAY = 60 # Seconds before a failed rebuild is tried again
+
+# JSON DECODING
+JSON_BACKEND = "auto" # "auto" uses orjson, then ujson, whichever is installed first, else the standard library ("json")
+RESPONSE_MODES = ("json", "raw", "response", "numpy", "records") # Decoded JSON, raw body bytes, the response object itself, NumPy columns (time series endpoints) or records.Record objects
+
+# REQUEST VALIDATION
+VALIDATE_REQUESTS = True # Reject unknown endpoint paths and query params locally (ValueError) instead of spending a request on a 4xx, see endpoints.ROUTES
+
+# METRICS
+METRICS_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0) # Upper bounds (seconds) of the latency histogram buckets of metrics.MetricsCollector
+METRICS_NAMESPACE = "coingecko" # Prefix of every exported metric name
+METRICS_HOST = "127.0.0.1" # Interface MetricsCollector.serve() listens on, localhost only by default
+METRICS_PORT = 9464 # Port MetricsCollector.serve() listens on
+
+# STAND-IN SERVER
+STANDIN_FIXTURES_DIR = "~/.cache/phegeck/fixtures" # Where standin.Recorder writes recorded responses and standin.StandInServer reads them
+STANDIN_RETRY_AFTER = 1 # Retry-After seconds sent with injected 429/503 responses
+STANDIN_TOTAL_ITEMS = 1000 # Items the stand-in serves across the pages of a paginated endpoint before its pages come back empty
 
 
 ENDPOINTS_DICT = {}
@@ -0,0 +1,43 @@
+''' Shared pytest fixtures: a local stand-in server (standin.StandInServer) with a few in-memory fixtures, no network needed '''
+
+import json, pytest
+from client import CoinGeckoClient
+from ratelimit import RateLimiter
+from retry import RetryBudget, RetryPolicy
+from standin import StandInServer
+
+
+def fixture(template, body, path = None, params = None) -> dict:
+    return {'template': template, 'path': path or template, 'params': params or {}, 'status': 200,
+            'content_type': 'application/json', 'body': json.dumps(body)}
+
+
+FIXTURES = {
+    '/ping': [fixture('/ping', {'gecko_says': '(V3) To the Moon!'})],
+    '/coins/list': [fixture('/coins/list', [{'id': 'bitcoin', 'symbol': 'btc', 'name': 'Bitcoin'}])],
+    '/simple/price': [fixture('/simple/price', {'bitcoin': {'usd': 65000.0}}, params={'ids': 'bitcoin', 'vs_currencies': 'usd'})],
+}
+
+
+@pytest.fixture
+def standin():
+    ''' Factory of started StandInServers serving FIXTURES, all stopped after the test. Takes StandInServer keyword arguments. '''
+    servers = []
+
+    def start(**kwargs):
+        server = StandInServer(FIXTURES, **kwargs).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+def client_for(server, **kwargs) -> CoinGeckoClient:
+    ''' Returns a client pointed at server, without rate limit and with a retry policy that does not sleep, unless given. '''
+    kwargs.setdefault('rate_limiter', RateLimiter(None))
+    kwargs.setdefault('retry_policy', RetryPolicy(base_delay=0, budget=RetryBudget()))
+    cg = CoinGeckoClient(**kwargs)
+    cg.base_url = server.url
+    return cg
@@ -1,5 +1,8 @@
 ''' Coin Gecko API Endpoints Dictionary '''
 
+import re
+from params import PARAMS_ALL
+
 
 ENDPOINT_COINS = {
     "/ping": "Check the API server status",
@@ -13,10 +16,10 @@ ENDPOINT_COINS = {
     "/coins/{id}/history": "Query the historical data (price, market cap, 24hr volume, …) at a given date for a coin based on a particular coin ID",
     "/coins/{id}/market_chart": "Get the historical chart data of a coin including time in UNIX, price, market cap and 24hr volume based on particular coin ID",
     "/coins/{id}/market_chart/range": "Get the historical chart data of a coin within certain time range in UNIX along with price, market cap and 24hr volume based on particular coin ID",
-    "/coins-id-ohlc": "Get the OHLC chart (Open, High, Low, Close) of a coin based on particular coin ID",
-    "/coins/../contract/..": "Query all the metadata (image, websites, socials, description, contract address, etc.) from the CoinGecko coin page based on an asset platform and a particular token contract address",
-    "/coins/../contract/../market_chart": "Get the historical chart data including time in UNIX, price, market cap and 24hr volume based on asset platform and particular token contract address",
-    "/coins/../contract/../market_chart/range": "Get the historical chart data within certain time range in UNIX along with price, market cap and 24hr volume based on asset platform and particular token contract address",
+    "/coins/{id}/ohlc": "Get the OHLC chart (Open, High, Low, Close) of a coin based on particular coin ID",
+    "/coins/{id}/contract/{contract_address}": "Query all the metadata (image, websites, socials, description, contract address, etc.) from the CoinGecko coin page based on an asset platform and a particular token contract address",
+    "/coins/{id}/contract/{contract_address}/market_chart": "Get the historical chart data including time in UNIX, price, market cap and 24hr volume based on asset platform and particular token contract address",
+    "/coins/{id}/contract/{contract_address}/market_chart/range": "Get the historical chart data within certain time range in UNIX along with price, market cap and 24hr volume based on asset platform and particular token contract address",
     "/coins/categories/list": "Query all the coins categories on CoinGecko",
     "/coins/categories": "Query all the coins categories with market data (market cap, volume, …) on CoinGecko"
 }
@@ -24,8 +27,8 @@ ENDPOINT_COINS = {
 
 ENDPOINT_NFTS = {
     "/nfts/list": "Query all supported NFTs with ID, contract address, name, asset platform ID and symbol on CoinGecko",
-    "/nfts/..": "Query all the NFT data (name, floor price, 24hr volume, …) based on the NFT collection ID",
-    "/nfts/../contract/..": "Query all the NFT data (name, floor price, 24hr volume, …) based on the NFT collection contract address and respective asset platform"
+    "/nfts/{id}": "Query all the NFT data (name, floor price, 24hr volume, …) based on the NFT collection ID",
+    "/nfts/{asset_platform_id}/contract/{contract_address}": "Query all the NFT data (name, floor price, 24hr volume, …) based on the NFT collection contract address and respective asset platform"
 }
 
 ENDPOINT_EXCHANGES_SPOT = {
@@ -84,3 +87,172 @@ ENDPOINT_ONCHAIN = {
 ENDPOINT_ALL = {**ENDPOINT_COINS, **ENDPOINT_NFTS, **ENDPOINT_EXCHANGES_SPOT, **ENDPOINT_EXCHANGES_DERIVATIVES, **ENDPOINT_TREASURY, **ENDPOINT_SEARCH, **ENDPOINT_ONCHAIN}
 
 
+_COIN_ID = 'Coin ID (e.g., bitcoin)'
+_EXCHANGE_ID = 'Exchange ID'
+_PLATFORM_ID = 'Asset platform ID (e.g., ethereum, solana)'
+_NETWORK = 'Network name (e.g., ethereum, solana)'
+_POOL_ADDRESS = 'Pool contract address'
+_TOKEN_ADDRESS = 'Token contract address'
+
+
+class Route:
+    '''
+    One endpoint of the registry, with its path template split and compiled once.
+
+    Attributes:
+        name: Accessor name on client.endpoints (e.g., coins_market_chart)
+        template: Path template, key of ENDPOINT_ALL and PARAMS_ALL (e.g., /coins/{id}/market_chart)
+        path_params: Names of the {placeholders} in the template, in order
+        params: Query params the endpoint accepts (frozenset, from PARAMS_ALL)
+        pattern: Compiled regex matching formatted paths of this endpoint
+    '''
+    __slots__ = ('name', 'template', 'description', 'path_params', 'path_details', 'params', 'pattern', 'parts')
+
+    def __init__(self, name, template, path_details = None) -> None:
+        self.name = name
+        self.template = template
+        self.description = ENDPOINT_ALL[template]
+        self.parts = re.split(r'\{([^/]+?)\}', template) # Literal text at even indexes, placeholder names at odd ones
+        self.path_params = tuple(self.parts[1::2])
+        self.path_details = path_details or {}
+        self.params = frozenset(PARAMS_ALL[template])
+        self.pattern = re.compile(''.join(re.escape(part) if index % 2 == 0 else '[^/]+' for index, part in enumerate(self.parts)) + '$')
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.name!r}, {self.template!r})'
+
+    def format(self, *args, **kwargs) -> str:
+        '''
+        Returns the path with the placeholders filled in, by position or by name.
+
+        Raises TypeError for missing or extra values, ValueError for empty values or values containing "/", "?" or "#"
+        (they would send the request to a different endpoint).
+
+        Example:
+            >>> ROUTES['coins_ohlc'].format('bitcoin')
+            '/coins/bitcoin/ohlc'
+        '''
+        if len(args) > len(self.path_params):
+            raise TypeError(f'{self.name}() takes {len(self.path_params)} path params ({", ".join(self.path_params)}), {len(args)} given')
+        values = list(args)
+        for name in self.path_params[len(args):]:
+            if name not in kwargs:
+                raise TypeError(f'{self.name}() is missing path param {name!r}')
+            values.append(kwargs.pop(name))
+        if kwargs:
+            raise TypeError(f'{self.name}() got unexpected path params {", ".join(map(repr, kwargs))}')
+        parts = list(self.parts)
+        for index, (name, value) in enumerate(zip(self.path_params, values)):
+            value = str(value)
+            if not value or '/' in value or '?' in value or '#' in value:
+                raise ValueError(f'Invalid {name} {value!r} for {self.template}')
+            parts[2 * index + 1] = value
+        return ''.join(parts)
+
+    def check_params(self, names) -> None:
+        ''' Raises ValueError if any of the query param names is not accepted by this endpoint (see PARAMS_ALL). '''
+        unknown = [name for name in names if name not in self.params]
+        if unknown:
+            raise ValueError(f'Unknown param {", ".join(map(repr, unknown))} for {self.template}, it accepts: {", ".join(sorted(self.params)) or "no params"}')
+
+
+ROUTES = {route.name: route for route in ( # Every endpoint, by accessor name on client.endpoints
+    # ENDPOINT_COINS
+    Route('ping', '/ping'),
+    Route('simple_price', '/simple/price'),
+    Route('simple_token_price', '/simple/token_price/{id}', {'id': _PLATFORM_ID}),
+    Route('simple_supported_vs_currencies', '/simple/supported_vs_currencies'),
+    Route('coins_list', '/coins/list'),
+    Route('coins_markets', '/coins/markets'),
+    Route('coins', '/coins/{id}', {'id': _COIN_ID}),
+    Route('coins_tickers', '/coins/{id}/tickers', {'id': _COIN_ID}),
+    Route('coins_history', '/coins/{id}/history', {'id': _COIN_ID}),
+    Route('coins_market_chart', '/coins/{id}/market_chart', {'id': _COIN_ID}),
+    Route('coins_market_chart_range', '/coins/{id}/market_chart/range', {'id': _COIN_ID}),
+    Route('coins_ohlc', '/coins/{id}/ohlc', {'id': _COIN_ID}),
+    Route('coins_contract', '/coins/{id}/contract/{contract_address}', {'id': _PLATFORM_ID, 'contract_address': _TOKEN_ADDRESS}),
+    Route('coins_contract_market_chart', '/coins/{id}/contract/{contract_address}/market_chart', {'id': _PLATFORM_ID, 'contract_address': _TOKEN_ADDRESS}),
+    Route('coins_contract_market_chart_range', '/coins/{id}/contract/{contract_address}/market_chart/range', {'id': _PLATFORM_ID, 'contract_address': _TOKEN_ADDRESS}),
+    Route('coins_categories_list', '/coins/categories/list'),
+    Route('coins_categories', '/coins/categories'),
+    # ENDPOINT_NFTS
+    Route('nfts_list', '/nfts/list'),
+    Route('nfts', '/nfts/{id}', {'id': 'NFT collection ID'}),
+    Route('nfts_contract', '/nfts/{asset_platform_id}/contract/{contract_address}', {'asset_platform_id': _PLATFORM_ID, 'contract_address': 'NFT contract address'}),
+    # ENDPOINT_EXCHANGES_SPOT
+    Route('exchanges', '/exchanges'),
+    Route('exchanges_list', '/exchanges/list'),
+    Route('exchanges_id', '/exchanges/{id}', {'id': _EXCHANGE_ID}),
+    Route('exchanges_tickers', '/exchanges/{id}/tickers', {'id': _EXCHANGE_ID}),
+    Route('exchanges_volume_chart', '/exchanges/{id}/volume_chart', {'id': _EXCHANGE_ID}),
+    # ENDPOINT_EXCHANGES_DERIVATIVES
+    Route('derivatives', '/derivatives'),
+    Route('derivatives_exchanges', '/derivatives/exchanges'),
+    Route('derivatives_exchanges_id', '/derivatives/exchanges/{id}', {'id': _EXCHANGE_ID}),
+    Route('derivatives_exchanges_list', '/derivatives/exchanges/list'),
+    # ENDPOINT_TREASURY
+    Route('entities_list', '/entities/list'),
+    Route('public_treasury_entity_coin', '/{entity}/public_treasury/{coin_id}', {'entity': 'Entity name (e.g., public_companies)', 'coin_id': _COIN_ID}),
+    Route('public_treasury_entity', '/public_treasury/{entity_id}', {'entity_id': 'Entity ID'}),
+    Route('public_treasury_holding_chart', '/public_treasury/{entity_id}/{coin_id}/holding_chart', {'entity_id': 'Entity ID', 'coin_id': _COIN_ID}),
+    Route('public_treasury_transaction_history', '/public_treasury/{entity_id}/transaction_history', {'entity_id': 'Entity ID'}),
+    # ENDPOINT_SEARCH
+    Route('search', '/search'),
+    Route('search_trending', '/search/trending'),
+    Route('asset_platforms', '/asset_platforms'),
+    Route('token_lists', '/token_lists/{asset_platform_id}/all.json', {'asset_platform_id': _PLATFORM_ID}),
+    # ENDPOINT_ONCHAIN
+    Route('onchain_networks', '/onchain/networks'),
+    Route('onchain_networks_dexes', '/onchain/networks/{network}/dexes', {'network': _NETWORK}),
+    Route('onchain_networks_token_info', '/onchain/networks/{network}/tokens/{token_address}/info', {'network': _NETWORK, 'token_address': _TOKEN_ADDRESS}),
+    Route('onchain_networks_pools', '/onchain/networks/{network}/pools/{pool_address}', {'network': _NETWORK, 'pool_address': _POOL_ADDRESS}),
+    Route('onchain_networks_pools_multi', '/onchain/networks/{network}/pools/multi/{pool_addresses}', {'network': _NETWORK, 'pool_addresses': 'Comma-separated pool contract addresses'}),
+    Route('onchain_trending_pools', '/onchain/networks/trending_pools'),
+    Route('onchain_networks_trending_pools', '/onchain/networks/{network}/trending_pools', {'network': _NETWORK}),
+    Route('onchain_networks_top_pools', '/onchain/networks/{network}/pools', {'network': _NETWORK}),
+    Route('onchain_networks_dex_pools', '/onchain/networks/{network}/dexes/{dex}/pools', {'network': _NETWORK, 'dex': 'DEX name (e.g., uniswap, sushiswap)'}),
+    Route('onchain_new_pools', '/onchain/networks/new_pools'),
+    Route('onchain_networks_new_pools', '/onchain/networks/{network}/new_pools', {'network': _NETWORK}),
+    Route('onchain_search_pools', '/onchain/search/pools'),
+    Route('onchain_networks_pools_info', '/onchain/networks/{network}/pools/{pool_address}/info', {'network': _NETWORK, 'pool_address': _POOL_ADDRESS}),
+    Route('onchain_simple_token_price', '/onchain/simple/networks/{network}/token_price/{token_addresses}', {'network': _NETWORK, 'token_addresses': 'Comma-separated token contract addresses'}),
+    Route('onchain_networks_token_pools', '/onchain/networks/{network}/tokens/{token_address}/pools', {'network': _NETWORK, 'token_address': _TOKEN_ADDRESS}),
+    Route('onchain_networks_token', '/onchain/networks/{network}/tokens/{token_address}', {'network': _NETWORK, 'token_address': _TOKEN_ADDRESS}),
+    Route('onchain_tokens_recently_updated', '/onchain/tokens/info_recently_updated'),
+    Route('onchain_networks_pools_ohlcv', '/onchain/networks/{network}/pools/{pool_address}/ohlcv/{timeframe}', {'network': _NETWORK, 'pool_address': _POOL_ADDRESS, 'timeframe': 'Time interval for OHLCV data (e.g., 1h, 4h, 1d)'}),
+    Route('onchain_networks_pools_trades', '/onchain/networks/{network}/pools/{pool_address}/trades', {'network': _NETWORK, 'pool_address': _POOL_ADDRESS}),
+)}
+
+ROUTES_BY_TEMPLATE = {route.template: route for route in ROUTES.values()}
+_PATTERN_ROUTES = sorted((route for route in ROUTES.values() if route.path_params), key=lambda route: -len(''.join(route.parts[0::2]))) # Most literal characters first, so /pools/multi/{x} wins over /pools/{x}
+
+
+def route_for(path):
+    '''
+    Returns the Route that a formatted path belongs to, or None if it is not in the registry.
+
+    Example:
+        >>> route_for('/coins/bitcoin/market_chart').name
+        'coins_market_chart'
+    '''
+    if path is None:
+        return None
+    route = ROUTES_BY_TEMPLATE.get(path)
+    if route is not None and not route.path_params:
+        return route
+    for route in _PATTERN_ROUTES:
+        if route.pattern.match(path):
+            return route
+    return None
+
+
+def template_for(path):
+    '''
+    Returns the endpoint template (key of ENDPOINT_ALL) that a formatted path belongs to, or the path itself if none match.
+
+    Example:
+        >>> template_for('/coins/bitcoin/market_chart')
+        '/coins/{id}/market_chart'
+    '''
+    route = route_for(path)
+    return route.template if route is not None else path
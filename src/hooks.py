@@ -0,0 +1,125 @@
+''' Per-request event hooks: before_request, after_response and on_error callbacks with timings, sizes and retry counts '''
+
+import threading, time
+
+
+HOOK_EVENTS = ('before_request', 'after_response', 'on_error')
+
+
+class RequestEvent:
+    '''
+    What hook callbacks receive for one request sent over the network (cache hits send nothing and fire no events).
+
+    The same object is updated and passed to every event of its request, copy the values a callback keeps.
+
+    Attributes:
+        event: "before_request", "after_response" or "on_error"
+        template: Endpoint template (e.g., /coins/{id}/market_chart), the label to group metrics by
+        endpoint: Formatted path (e.g., /coins/bitcoin/market_chart)
+        params: Query params (read-only mapping)
+        status: HTTP status of the last attempt, None before a response or when none arrived (timeouts, connection errors)
+        bytes: Body size in bytes, None until after_response and for streamed responses
+        dns: Seconds spent resolving the host for the last attempt, 0.0 when a pooled connection was reused
+        connect: Seconds spent opening the connection (TCP and TLS) for the last attempt, 0.0 when a pooled connection was reused
+        ttfb: Seconds from the start of the last attempt to its response headers (includes dns and connect)
+        total: Seconds from the start of the first attempt to the end of the body (to the headers for streams), retries and their waits included
+        retries: Retries made so far
+        rate_limit_wait: Seconds spent waiting for rate limit tokens, the retries' tokens included
+        error: The exception, for on_error
+        will_retry: For on_error, True if the failed attempt is going to be retried
+        finished: True once after_response has fired (an on_error after it means the body could not be decoded or the stream broke)
+    '''
+    __slots__ = ('event', 'template', 'endpoint', 'params', 'status', 'bytes', 'dns', 'connect', 'ttfb', 'total',
+                 'retries', 'rate_limit_wait', 'error', 'will_retry', 'finished', 'started')
+
+    def __init__(self, template, endpoint, params, rate_limit_wait = 0.0) -> None:
+        self.event = None
+        self.template = template
+        self.endpoint = endpoint
+        self.params = params
+        self.status = None
+        self.bytes = None
+        self.dns = 0.0
+        self.connect = 0.0
+        self.ttfb = None
+        self.total = None
+        self.retries = 0
+        self.rate_limit_wait = rate_limit_wait
+        self.error = None
+        self.will_retry = False
+        self.finished = False
+        self.started = time.perf_counter()
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.event!r}, {self.template!r}, status={self.status}, total={self.total})'
+
+
+class Hooks:
+    '''
+    Callbacks per event, shared by every request of a client (pass the same Hooks to several clients to observe them together).
+
+    Callbacks run in the thread (or event loop) that sends the request, so they should be quick. A callback that
+    raises is reported with print and does not affect the request. When no callback is registered, the client
+    skips building events entirely (one attribute check per request).
+
+    Example:
+        >>> cg.hooks.add("after_response", lambda event: print(event.template, event.status, f"{event.total:.3f}s"))
+    '''
+    def __init__(self) -> None:
+        self.callbacks = {event: () for event in HOOK_EVENTS} # Tuples replaced on every change, so emit() never needs the lock
+        self.active = False
+        self.lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({ {event: len(callbacks) for event, callbacks in self.callbacks.items()} })'
+
+    def add(self, event, callback) -> None:
+        ''' Registers callback(RequestEvent) for "before_request", "after_response" or "on_error". '''
+        if event not in self.callbacks:
+            raise ValueError(f"Unknown hook event {event!r}, expected one of {HOOK_EVENTS}")
+        with self.lock:
+            self.callbacks[event] += (callback,)
+            self.active = True
+
+    def remove(self, event, callback) -> None:
+        ''' Unregisters a callback added with add(). Raises ValueError if it is not registered for that event. '''
+        if callback not in self.callbacks.get(event, ()):
+            raise ValueError(f"{callback!r} is not registered for {event!r}")
+        with self.lock:
+            callbacks = list(self.callbacks[event])
+            callbacks.remove(callback)
+            self.callbacks[event] = tuple(callbacks)
+            self.active = any(self.callbacks.values())
+
+    def emit(self, event, data) -> None:
+        data.event = event
+        for callback in self.callbacks[event]:
+            try:
+                callback(data)
+            except Exception as error: # A broken hook must not break the request it observes
+                print(f"Hook {getattr(callback, '__name__', callback)!r} failed on {event}: {error!r}")
+
+    def start(self, template, endpoint, params, rate_limit_wait = 0.0) -> RequestEvent:
+        ''' Returns the event of a request about to be sent (its rate limit token already taken) and fires before_request. '''
+        data = RequestEvent(template, endpoint, params, rate_limit_wait)
+        self.emit('before_request', data)
+        return data
+
+    def finish(self, data, status, size) -> None:
+        ''' Fires after_response once the body of the request has arrived (size is None for streams). '''
+        data.status = status
+        data.bytes = size
+        data.error = None
+        data.will_retry = False
+        data.finished = True
+        data.total = time.perf_counter() - data.started
+        self.emit('after_response', data)
+
+    def fail(self, data, error, status = None, will_retry = False) -> None:
+        ''' Fires on_error for a failed attempt, or for a response that could not be decoded. '''
+        if not data.finished:
+            data.status = status
+        data.error = error
+        data.will_retry = will_retry
+        data.total = time.perf_counter() - data.started
+        self.emit('on_error', data)
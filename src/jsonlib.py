@@ -0,0 +1,63 @@
+''' JSON backend: a fast library (orjson, ujson) when installed, the standard library json module otherwise '''
+
+import json, config
+
+
+BACKENDS = ('orjson', 'ujson', 'json') # Order tried by "auto"
+
+
+def _json_dumps(value) -> bytes:
+    return json.dumps(value, separators=(',', ':')).encode()
+
+
+def _orjson():
+    import orjson
+
+    def orjson_loads(data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return json.loads(data) # orjson rejects integers above 64 bits and NaN/Infinity, the stdlib accepts them
+    return orjson_loads, orjson.dumps
+
+
+def _ujson():
+    import ujson
+    return ujson.loads, lambda value: ujson.dumps(value, ensure_ascii=False).encode()
+
+
+_LOADERS = {'orjson': _orjson, 'ujson': _ujson, 'json': lambda: (json.loads, _json_dumps)}
+
+
+def use(name = 'auto') -> str:
+    '''
+    Switches the JSON backend used to decode responses and returns the name of the one in use.
+
+    Args:
+        name: "orjson", "ujson", "json" or "auto" (the first of those that is installed)
+
+    Returns: str
+
+    Example:
+        >>> jsonlib.use("json")   # e.g. to compare against the stdlib
+        'json'
+    '''
+    global backend, loads, dumps
+    if name == 'auto':
+        for candidate in BACKENDS:
+            try:
+                return use(candidate)
+            except ImportError:
+                continue
+    if name not in _LOADERS:
+        raise ValueError(f'Unknown JSON backend {name!r}, expected one of {BACKENDS} or "auto"')
+    loads, dumps = _LOADERS[name]() # Raises ImportError if the library is not installed
+    backend = name
+    return backend
+
+
+def __getattr__(name): # backend, loads and dumps (returns bytes) are set by use(), called on first access so the library is imported when needed
+    if name in ('backend', 'loads', 'dumps'):
+        use(config.JSON_BACKEND)
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,153 @@
+''' Pool of API keys: per-key tier (base URL and header) and rate limiter, requests spread over the key with the most budget left '''
+
+import threading, time, config
+from ratelimit import RateLimiter
+from retry import retry_after_seconds
+
+
+class ApiKey:
+    '''
+    One API key of a KeyPool, with its own rate limiter.
+
+    Args:
+        key: The API key
+        tier: "demo" or "pro" (see config.API_TIERS), sets the base URL, the key header and the default rate
+        rate_per_minute, burst: Rate limit of this key, defaulting to its tier's
+        base_url: Overrides the tier's base URL (e.g., a local stand-in server)
+    '''
+    __slots__ = ('key', 'tier', 'base_url', 'headers', 'limiter', 'sidelined_until', 'sidelined_status')
+
+    def __init__(self, key, tier = config.API_KEY_TIER, rate_per_minute = None, burst = None, base_url = None) -> None:
+        if tier not in config.API_TIERS:
+            raise ValueError(f"Unknown key tier {tier!r}, expected one of {tuple(config.API_TIERS)}")
+        settings = config.API_TIERS[tier]
+        self.key = key
+        self.tier = tier
+        self.base_url = base_url or settings['base_url']
+        self.headers = {settings['header']: key}
+        self.limiter = RateLimiter(rate_per_minute or settings['rate_per_minute'], burst or settings['burst'])
+        self.sidelined_until = 0.0 # time.monotonic() at which a sidelined key is used again
+        self.sidelined_status = None
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.key[:4]}..., {self.tier!r})' # Keys stay out of logs
+
+    def sidelined(self, now) -> bool:
+        return self.sidelined_until > now
+
+
+class KeyPool:
+    '''
+    Spreads requests over several API keys, each with its own rate limit, to multiply the usable throughput.
+
+    Every request goes to the key that can send it soonest (the most tokens left, among keys that are not sidelined).
+    A key that gets a 401 or 429 is sidelined for config.KEY_COOLDOWN seconds (or the 429's Retry-After), and the
+    client retries the request on another key straight away. When every key is sidelined, requests wait for the first one back.
+
+    Args:
+        keys: API keys as strings (of the given tier), (key, tier) tuples or ApiKey objects
+        cooldowns: {status: seconds} overriding config.KEY_COOLDOWN
+        tier: Tier of the keys given as strings
+
+    Example:
+        >>> pool = KeyPool([("pro_key_1", "pro"), ("pro_key_2", "pro"), "demo_key"])
+        >>> cg = CoinGeckoClient(keys=pool)     # Pass the same pool to several clients to share the keys' quotas
+        >>> pool.stats()
+    '''
+    def __init__(self, keys, cooldowns = None, tier = config.API_KEY_TIER) -> None:
+        self.keys = [key if isinstance(key, ApiKey) else ApiKey(*key) if isinstance(key, tuple) else ApiKey(key, tier) for key in keys]
+        if not self.keys:
+            raise ValueError("KeyPool needs at least one key")
+        self.cooldowns = {**config.KEY_COOLDOWN, **(cooldowns or {})}
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({len(self.keys)} keys, {self.usable()} usable)'
+
+    def usable(self) -> int:
+        ''' Returns how many keys are not sidelined right now. '''
+        now = time.monotonic()
+        return sum(not key.sidelined(now) for key in self.keys)
+
+    def reserve(self, weight = 1) -> tuple:
+        '''
+        Picks a key and takes weight tokens from it, going into debt if needed.
+
+        Returns: tuple : (ApiKey, seconds to wait before sending). Used directly by callers that sleep on their own (e.g. asyncio.sleep).
+        '''
+        with self.lock: # Picking and reserving together, so two threads do not both count on the same free tokens
+            now = time.monotonic()
+            candidates = [key for key in self.keys if not key.sidelined(now)]
+            if candidates:
+                key = min(candidates, key=lambda key: (key.limiter.wait_time(weight), -key.limiter.available()))
+                return key, key.limiter.reserve(weight)
+            key = min(self.keys, key=lambda key: key.sidelined_until)
+            return key, key.sidelined_until - now + key.limiter.reserve(weight)
+
+    def acquire(self, weight = 1) -> tuple:
+        '''
+        Blocks until a key has weight tokens free.
+
+        Returns: tuple : (ApiKey to send with, seconds spent waiting).
+        '''
+        key, wait = self.reserve(weight)
+        if wait > 0:
+            time.sleep(wait)
+        return key, wait
+
+    def wait_time(self, weight = 1) -> float:
+        ''' Returns about how long weight tokens take to free up across the usable keys (their rates add up), without taking anything. '''
+        now = time.monotonic()
+        usable = [key for key in self.keys if not key.sidelined(now)]
+        if not usable:
+            key = min(self.keys, key=lambda key: key.sidelined_until)
+            return key.sidelined_until - now + key.limiter.wait_time(weight)
+        if any(not key.limiter.rate_per_minute for key in usable):
+            return 0.0
+        shortfall = weight - sum(key.limiter.available() for key in usable)
+        return shortfall * 60 / sum(key.limiter.rate_per_minute for key in usable) if shortfall > 0 else 0.0
+
+    def try_acquire(self, weight = 1):
+        '''
+        Takes weight tokens from the usable key with the most free right now.
+
+        Returns: ApiKey | None : None if no key has the tokens (nothing is taken).
+        '''
+        with self.lock:
+            now = time.monotonic()
+            for key in sorted((key for key in self.keys if not key.sidelined(now)), key=lambda key: -key.limiter.available()):
+                if key.limiter.try_acquire(weight):
+                    return key
+            return None
+
+    def sideline(self, key, response) -> bool:
+        '''
+        Sidelines key if response has one of the cooldown statuses (401, 429 by default).
+
+        Returns: bool : True if the key was sidelined.
+        '''
+        status = response.status_code if response is not None else None
+        if status not in self.cooldowns:
+            return False
+        cooldown = self.cooldowns[status]
+        if status == 429:
+            retry_after = retry_after_seconds(response)
+            if retry_after is not None:
+                cooldown = min(retry_after, config.RETRY_AFTER_MAX)
+        with self.lock:
+            key.sidelined_until = max(key.sidelined_until, time.monotonic() + cooldown)
+            key.sidelined_status = status
+        return True
+
+    def switch(self, key, response) -> bool:
+        ''' Sidelines key after a cooldown status and returns True if another key can take the retry right away. '''
+        return self.sideline(key, response) and self.usable() > 0
+
+    def stats(self) -> list:
+        ''' Returns one dict per key: tier, free tokens and, for a sidelined key, the status and seconds left. '''
+        now = time.monotonic()
+        return [{'key': repr(key), 'tier': key.tier, 'tokens': key.limiter.available(),
+                 'sidelined': max(0.0, key.sidelined_until - now), 'status': key.sidelined_status if key.sidelined(now) else None} for key in self.keys]
@@ -0,0 +1,32 @@
+''' Deferred imports: a module is only loaded the first time one of its attributes is used '''
+
+import importlib
+
+
+class LazyModule:
+    '''
+    Stand-in for a module that imports it on first attribute access, then forwards every access to it.
+
+    Keeps heavy or rarely used dependencies (requests, numpy, sqlite3, the endpoint tables) out of the cold start
+    of "import client", so short-lived scripts only pay for what they use. Annotations that name a lazy module
+    must be strings, or they would import it when the function is defined.
+
+    Example:
+        >>> requests = LazyModule("requests")   # Nothing imported yet
+        >>> requests.Session()                  # Imports requests now
+    '''
+    __slots__ = ('_name', '_module')
+
+    def __init__(self, name) -> None:
+        self._name = name
+        self._module = None
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f'{self.__class__.__name__}({self._name!r}, {state})'
+
+    def __getattr__(self, attr):
+        module = self._module
+        if module is None:
+            module = self._module = importlib.import_module(self._name) # Thread-safe, the import lock makes other threads wait for it
+        return getattr(module, attr)
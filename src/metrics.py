@@ -0,0 +1,223 @@
+''' Built-in metrics for request hooks: counters and latency histograms per endpoint template, exported in Prometheus text format '''
+
+import os, threading, config
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class Histogram:
+    ''' Cumulative-bucket histogram in the Prometheus layout: counts per upper bound, plus sum and count. '''
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1) # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1 # bisect_left keeps value == bound in that bucket (le means <=)
+        self.sum += value
+        self.count += 1
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels) -> str:
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+class MetricsCollector:
+    '''
+    Collects request events into counters and histograms per endpoint template.
+
+    Metrics (with the default namespace "coingecko"):
+        coingecko_requests_total{endpoint}                  Requests sent (cache hits are not sent and not counted)
+        coingecko_responses_total{endpoint,status}          Attempts that got an HTTP response, per status (e.g. the 429 rate)
+        coingecko_errors_total{endpoint,error}              Failed attempts, per error type (HTTPError, Timeout, ConnectionError, ...)
+        coingecko_failures_total{endpoint}                  Requests that failed after their last retry
+        coingecko_retries_total{endpoint}                   Retries made
+        coingecko_response_bytes_total{endpoint}            Body bytes received
+        coingecko_rate_limit_wait_seconds_total{endpoint}   Time spent waiting for rate limit tokens
+        coingecko_new_connections_total{endpoint}           Connections opened, with their dns and connect seconds in the two counters below
+        coingecko_dns_seconds_total{endpoint}
+        coingecko_connect_seconds_total{endpoint}
+        coingecko_request_duration_seconds{endpoint}        Histogram of the total time of finished requests, retries included
+        coingecko_ttfb_seconds{endpoint}                    Histogram of the time to response headers of the last attempt
+
+    With a client built with a scheduler (see scheduling.Scheduler), per priority class:
+        coingecko_scheduler_queue_depth{priority}           Requests waiting for a token right now (gauge)
+        coingecko_scheduler_dispatched_total{priority}      Requests given a token
+        coingecko_scheduler_dropped_total{priority}         Requests failed fast because their deadline could not be met
+        coingecko_scheduler_wait_seconds{priority}          Histogram of the time dispatched requests spent in the queue
+
+    Example:
+        >>> metrics = MetricsCollector().install(cg)
+        >>> server = metrics.serve(9464)            # Scrape http://127.0.0.1:9464/metrics
+        >>> metrics.write("/var/lib/node_exporter/coingecko.prom")   # Or a file for the node_exporter textfile collector
+    '''
+    COUNTERS = (('requests_total', 'Requests sent'), ('responses_total', 'Attempts that got an HTTP response'),
+                ('errors_total', 'Failed attempts'), ('failures_total', 'Requests that failed after their last retry'),
+                ('retries_total', 'Retries made'), ('response_bytes_total', 'Body bytes received'),
+                ('rate_limit_wait_seconds_total', 'Seconds spent waiting for rate limit tokens'),
+                ('new_connections_total', 'Connections opened'), ('dns_seconds_total', 'Seconds spent resolving hosts'),
+                ('connect_seconds_total', 'Seconds spent opening connections (TCP and TLS)'))
+    HISTOGRAMS = (('request_duration_seconds', 'Total time of finished requests, retries included'),
+                  ('ttfb_seconds', 'Time to response headers of the last attempt'))
+
+    def __init__(self, buckets = config.METRICS_BUCKETS, namespace = config.METRICS_NAMESPACE) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.namespace = namespace
+        self.lock = threading.Lock()
+        self.counters = {name: {} for name, _ in self.COUNTERS} # name -> {labels tuple: value}
+        self.histograms = {name: {} for name, _ in self.HISTOGRAMS} # name -> {endpoint: Histogram}
+        self.scheduler = None # Scheduler of the installed client, its queue metrics are rendered too
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({sum(self.counters["requests_total"].values())} requests)'
+
+    def install(self, client) -> "MetricsCollector":
+        ''' Registers the collector on the client's hooks and returns it. '''
+        for event in ('before_request', 'after_response', 'on_error'):
+            client.hooks.add(event, getattr(self, event))
+        if client.scheduler is not None:
+            self.scheduler = client.scheduler
+        return self
+
+    def uninstall(self, client) -> None:
+        for event in ('before_request', 'after_response', 'on_error'):
+            client.hooks.remove(event, getattr(self, event))
+
+    def _add(self, name, labels, value = 1) -> None:
+        counter = self.counters[name]
+        counter[labels] = counter.get(labels, 0) + value
+
+    def _observe(self, name, endpoint, value) -> None:
+        histograms = self.histograms[name]
+        if endpoint not in histograms:
+            histograms[endpoint] = Histogram(self.buckets)
+        histograms[endpoint].observe(value)
+
+    def _attempt(self, event) -> None:
+        ''' Counts what every attempt has: its status and a new connection, if one was opened. '''
+        endpoint = (event.template,)
+        if event.status is not None:
+            self._add('responses_total', (event.template, str(event.status)))
+        if event.connect:
+            self._add('new_connections_total', endpoint)
+            self._add('dns_seconds_total', endpoint, event.dns)
+            self._add('connect_seconds_total', endpoint, event.connect)
+
+    def _done(self, event) -> None:
+        ''' Counts what a request has once it is over, successful or not. '''
+        endpoint = (event.template,)
+        self._add('retries_total', endpoint, event.retries)
+        self._add('rate_limit_wait_seconds_total', endpoint, event.rate_limit_wait)
+        self._observe('request_duration_seconds', event.template, event.total)
+
+    def before_request(self, event) -> None:
+        with self.lock:
+            self._add('requests_total', (event.template,))
+
+    def after_response(self, event) -> None:
+        with self.lock:
+            self._attempt(event)
+            self._done(event)
+            if event.bytes is not None:
+                self._add('response_bytes_total', (event.template,), event.bytes)
+            if event.ttfb is not None:
+                self._observe('ttfb_seconds', event.template, event.ttfb)
+
+    def on_error(self, event) -> None:
+        with self.lock:
+            self._add('errors_total', (event.template, type(event.error).__name__))
+            if event.finished: # Undecodable body or broken stream, after_response already counted the request
+                self._add('failures_total', (event.template,))
+                return
+            self._attempt(event)
+            if not event.will_retry:
+                self._add('failures_total', (event.template,))
+                self._done(event)
+
+    def render(self) -> str:
+        ''' Returns every metric in the Prometheus text exposition format (version 0.0.4). '''
+        lines = []
+        with self.lock:
+            for name, help in self.COUNTERS:
+                full = f'{self.namespace}_{name}'
+                lines += [f'# HELP {full} {help}', f'# TYPE {full} counter']
+                label_names = ('endpoint', 'status') if name == 'responses_total' else ('endpoint', 'error') if name == 'errors_total' else ('endpoint',)
+                for labels, value in sorted(self.counters[name].items()):
+                    lines.append(f'{full}{_labels(**dict(zip(label_names, labels)))} {value}')
+            for name, help in self.HISTOGRAMS:
+                full = f'{self.namespace}_{name}'
+                lines += [f'# HELP {full} {help}', f'# TYPE {full} histogram']
+                for endpoint, histogram in sorted(self.histograms[name].items()):
+                    cumulative = 0
+                    for bound, count in zip(self.buckets + ('+Inf',), histogram.counts):
+                        cumulative += count
+                        lines.append(f'{full}_bucket{_labels(endpoint=endpoint, le=bound)} {cumulative}')
+                    lines.append(f'{full}_sum{_labels(endpoint=endpoint)} {histogram.sum}')
+                    lines.append(f'{full}_count{_labels(endpoint=endpoint)} {histogram.count}')
+        if self.scheduler is not None:
+            lines += self._render_scheduler()
+        return '\n'.join(lines) + '\n'
+
+    def _render_scheduler(self) -> list:
+        lines = []
+        prefix = f'{self.namespace}_scheduler'
+        scheduler = self.scheduler
+        with scheduler.condition:
+            for name, kind, help, value in (('queue_depth', 'gauge', 'Requests waiting for a token', 'depth'),
+                                            ('dispatched_total', 'counter', 'Requests given a token', 'dispatched'),
+                                            ('dropped_total', 'counter', 'Requests failed fast because their deadline could not be met', 'dropped')):
+                lines += [f'# HELP {prefix}_{name} {help}', f'# TYPE {prefix}_{name} {kind}']
+                lines += [f'{prefix}_{name}{_labels(priority=priority)} {getattr(stats, value)}' for priority, stats in scheduler.class_stats.items()]
+            full = f'{prefix}_wait_seconds'
+            lines += [f'# HELP {full} Time dispatched requests spent in the queue', f'# TYPE {full} histogram']
+            for priority, stats in scheduler.class_stats.items():
+                cumulative = 0
+                for bound, count in zip(scheduler.buckets + ('+Inf',), stats.wait.counts):
+                    cumulative += count
+                    lines.append(f'{full}_bucket{_labels(priority=priority, le=bound)} {cumulative}')
+                lines.append(f'{full}_sum{_labels(priority=priority)} {stats.wait.sum}')
+                lines.append(f'{full}_count{_labels(priority=priority)} {stats.wait.count}')
+        return lines
+
+    def write(self, path) -> None:
+        ''' Writes render() to path, replacing the file atomically so readers never see a partial export. '''
+        path = os.path.expanduser(path)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temporary, 'w') as file:
+            file.write(self.render())
+        os.replace(temporary, path)
+
+    def serve(self, port = config.METRICS_PORT, host = config.METRICS_HOST) -> ThreadingHTTPServer:
+        '''
+        Serves render() over HTTP (any path, e.g. /metrics) on a background thread. Returns the server, call shutdown() on it to stop.
+
+        Binds to localhost by default, pass host="0.0.0.0" to let other machines scrape it.
+        '''
+        collector = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = collector.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args): # Silences the default per-request logging
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
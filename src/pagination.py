@@ -0,0 +1,89 @@
+''' Page shapes of the paginated endpoints: where the items are in a response and how many a full page holds '''
+
+import config
+
+
+def _is_onchain(template) -> bool:
+    return template is not None and template.startswith('/onchain/')
+
+
+class PageFetchError(Exception):
+    ''' A page of iter_pages still failed after config.PAGE_RETRY_ROUNDS retries, so the items after it are unknown. '''
+    def __init__(self, page) -> None:
+        super().__init__(f"Page {page} could not be fetched, iteration stopped before it")
+        self.page = page
+
+
+def page_items(template, data) -> list:
+    '''
+    Returns the list of items in one page response.
+
+    Most endpoints return the list itself, tickers endpoints wrap it in {"tickers": [...]} and
+    onchain endpoints in {"data": [...]} (see config.PAGE_ITEMS_KEY).
+    '''
+    if data is None:
+        return []
+    key = config.PAGE_ITEMS_KEY.get(template, 'data' if _is_onchain(template) else None)
+    if key is not None and isinstance(data, dict):
+        data = data.get(key)
+    return data if isinstance(data, list) else []
+
+
+def page_size(template, query_params):
+    '''
+    Returns how many items a full page holds: the per_page param if set, else the endpoint default
+    from config.PAGE_SIZE, or None if it is not known (iteration then stops on an empty page only).
+    '''
+    if 'per_page' in query_params:
+        return int(query_params['per_page'])
+    return config.PAGE_SIZE.get(template, config.PAGE_SIZE_ONCHAIN if _is_onchain(template) else None)
+
+
+def is_last_page(items, size) -> bool:
+    ''' Returns True if a page has no items or fewer than a full page. '''
+    return not items or (size is not None and len(items) < size)
+
+
+class PageScan:
+    '''
+    Result of CoinGeckoClient.fetch_pages.
+
+    Attributes:
+        items: Items of every page up to the last one, in page order
+        pages: Page numbers that were merged into items
+        latencies: Seconds each page took (rate limiter wait excluded), keyed by page number
+        failed_pages: Pages that still failed after the page retries, their items are missing
+    '''
+    __slots__ = ('items', 'pages', 'latencies', 'failed_pages')
+
+    def __init__(self, items, pages, latencies, failed_pages) -> None:
+        self.items = items
+        self.pages = pages
+        self.latencies = latencies
+        self.failed_pages = failed_pages
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({len(self.items)} items, {len(self.pages)} pages, failed={self.failed_pages})'
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    @property
+    def complete(self) -> bool:
+        return not self.failed_pages
+
+
+def merge_pages(pages, size, latencies, failed) -> PageScan:
+    ''' Joins fetched pages (page number -> items) in page order, stopping at the first last page. '''
+    end = min((page for page, items in pages.items() if is_last_page(items, size)), default=None)
+    items, merged = [], []
+    for page in sorted(pages):
+        if end is not None and page > end:
+            break
+        items.extend(pages[page])
+        merged.append(page)
+    failed = sorted(page for page in failed if end is None or page < end)
+    return PageScan(items, merged, {page: latencies[page] for page in merged if page in latencies}, failed)
@@ -16,6 +16,9 @@ PARAMS_COINS = {
     '/coins/{id}/market_chart': ['vs_currency', 'days', 'interval', 'precision'],
     '/coins/{id}/market_chart/range': ['vs_currency', 'from', 'to', 'interval', 'precision'],
     '/coins/{id}/ohlc': ['vs_currency', 'days', 'interval', 'precision'],
+    '/coins/{id}/contract/{contract_address}': [],
+    '/coins/{id}/contract/{contract_address}/market_chart': ['vs_currency', 'days', 'interval', 'precision'],
+    '/coins/{id}/contract/{contract_address}/market_chart/range': ['vs_currency', 'from', 'to', 'interval', 'precision'],
     '/coins/categories/list': [],
     '/coins/categories': ['order', 'per_page', 'page']
 }
@@ -122,7 +125,8 @@ PARAMS_ALL_DETAILS = {
     'symbols': 'Comma-separated coin symbols to query (e.g., btc,eth)',
     'tickers': 'Boolean flag to include exchange tickers data in coin response',
     'to': 'Ending date/timestamp for historical data range (ISO date YYYY-MM-DD or UNIX timestamp)',
-    'vs_currencies': 'Target currencies for price data (e.g., usd, eur, gbp, jpy, etc.)'
+    'vs_currencies': 'Target currencies for price data (e.g., usd, eur, gbp, jpy, etc.)',
+    'vs_currency': 'Target currency for price data (e.g., usd, eur, gbp, jpy, etc.)'
 }
 
 
@@ -0,0 +1,90 @@
+''' Client-side token bucket rate limiter '''
+
+import math, threading, time, config
+
+
+class RateLimiter:
+    '''
+    Token bucket that keeps requests under a per-minute rate.
+
+    Tokens refill continuously at rate_per_minute / 60 per second, up to burst tokens.
+    A blocking acquire reserves its tokens straight away and sleeps for the shortfall, so waiting
+    callers are served in the order they arrived instead of racing each other for the next token.
+
+    Example:
+        >>> limiter = RateLimiter(rate_per_minute=30, burst=10)
+        >>> waited = limiter.acquire()      # Blocks until a token is free, returns seconds waited
+        >>> limiter.try_acquire(weight=2)   # Never blocks, returns False if 2 tokens are not free
+    '''
+    def __init__(self, rate_per_minute = config.RATE_REQUEST_PER_MINUTE, burst = config.RATE_BURST, weights = None) -> None:
+        self.rate_per_minute = rate_per_minute
+        self.burst = burst
+        self.weights = config.RATE_ENDPOINT_WEIGHTS if weights is None else weights
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.rate_per_minute}/min, burst {self.burst})'
+
+    def weight(self, template) -> float:
+        ''' Returns how many tokens a call to the given endpoint template costs. '''
+        return self.weights.get(template, 1)
+
+    def _refill(self, now) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate_per_minute / 60)
+        self.updated = now
+
+    def reserve(self, weight = 1) -> float:
+        '''
+        Takes weight tokens, going into debt if needed, and returns the seconds to wait before the request may be sent.
+
+        Used directly by callers that sleep on their own (e.g. asyncio.sleep). Everyone else should call acquire().
+        '''
+        if not self.rate_per_minute:
+            return 0.0
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens -= weight
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens * 60 / self.rate_per_minute
+
+    def acquire(self, weight = 1) -> float:
+        '''
+        Blocks until weight tokens are available.
+
+        Returns: float : Seconds spent waiting for the tokens (0.0 if none).
+        '''
+        wait = self.reserve(weight)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def available(self) -> float:
+        ''' Returns the tokens free right now, negative while earlier reservations are still being waited for (inf without a limit). '''
+        if not self.rate_per_minute:
+            return math.inf
+        with self.lock:
+            self._refill(time.monotonic())
+            return self.tokens
+
+    def wait_time(self, weight = 1) -> float:
+        ''' Returns the seconds reserve(weight) would wait right now, without taking anything. '''
+        shortfall = weight - self.available()
+        return shortfall * 60 / self.rate_per_minute if shortfall > 0 else 0.0
+
+    def try_acquire(self, weight = 1) -> bool:
+        '''
+        Takes weight tokens only if they are available right now.
+
+        Returns: bool : True if the tokens were taken, False otherwise (nothing is taken).
+        '''
+        if not self.rate_per_minute:
+            return True
+        with self.lock:
+            self._refill(time.monotonic())
+            if self.tokens < weight:
+                return False
+            self.tokens -= weight
+            return True
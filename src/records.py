@@ -0,0 +1,195 @@
+''' Compact __slots__ record types for the hottest response shapes: /coins/markets rows, tickers and onchain pools '''
+
+import math, jsonlib, pagination
+from array import array
+
+
+class Lazy:
+    '''
+    Field kept as compact JSON bytes and decoded on first access.
+
+    Used for nested values that are big but rarely read, such as roi or onchain attributes.
+    Decoded values are kept, so each field is decoded at most once.
+    '''
+    __slots__ = ('name', 'slot')
+    packed_type = bytes # JSON never decodes to bytes, so bytes means not decoded yet
+
+    def __init__(self, name) -> None:
+        self.name = name
+        self.slot = '_' + name
+
+    def pack(self, value):
+        ''' Returns the stored form of a decoded dict/list. '''
+        return bytes(memoryview(jsonlib.dumps(value))) # Exact-size copy, orjson over-allocates its output to about 1 KB
+
+    def unpack(self, packed):
+        return jsonlib.loads(packed)
+
+    def __get__(self, record, owner = None):
+        if record is None:
+            return self
+        value = getattr(record, self.slot)
+        if isinstance(value, self.packed_type):
+            value = self.unpack(value)
+            setattr(record, self.slot, value)
+        return value
+
+    def __set__(self, record, value) -> None:
+        setattr(record, self.slot, value)
+
+
+class Sparkline(Lazy):
+    ''' {"price": [floats]} field kept as a packed float64 array (8 bytes per point) and turned back into a dict on first access. '''
+    __slots__ = ()
+    packed_type = (array, bytes) # bytes for a value of another shape, packed as JSON
+
+    def pack(self, value):
+        prices = value.get('price') if isinstance(value, dict) else None
+        if not isinstance(prices, list) or len(value) != 1:
+            return super().pack(value) # Unexpected shape, keep it as JSON
+        return array('d', (math.nan if price is None else price for price in prices))
+
+    def unpack(self, packed):
+        if isinstance(packed, bytes):
+            return super().unpack(packed)
+        return {'price': [None if price != price else price for price in packed]} # NaN stands for null
+
+
+class Record:
+    '''
+    Base of the record types: one slot per known field instead of a dict per object.
+
+    Subclasses list plain fields in FIELDS and nested, rarely read fields in LAZY, and set
+    __slots__ = FIELDS + lazy_slots(LAZY). LAZY fields are Lazy descriptors unless the class defines its own
+    (e.g. Sparkline). Fields the API adds later land in extra (None if there are none).
+
+    Records can be read like the dicts they replace (record["current_price"], record.get("roi")),
+    or as attributes (record.current_price). to_dict() gives the original dict back.
+    '''
+    __slots__ = ('extra',)
+    FIELDS = ()
+    LAZY = ()
+    _known = frozenset()
+    _lazy = ()
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        for name in cls.LAZY:
+            if not isinstance(cls.__dict__.get(name), Lazy):
+                setattr(cls, name, Lazy(name))
+        cls._known = frozenset(cls.FIELDS + cls.LAZY)
+        cls._lazy = tuple(cls.__dict__[name] for name in cls.LAZY)
+
+    def __init__(self, data) -> None:
+        get = data.get
+        for name in self.FIELDS:
+            setattr(self, name, get(name))
+        for field in self._lazy:
+            value = get(field.name)
+            setattr(self, field.slot, field.pack(value) if isinstance(value, (dict, list)) else value)
+        known = self._known
+        self.extra = {key: value for key, value in data.items() if key not in known} or None
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({getattr(self, self.FIELDS[0])!r})'
+
+    def __getitem__(self, key):
+        if key in self._known:
+            return getattr(self, key)
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __contains__(self, key) -> bool:
+        return key in self._known or (self.extra is not None and key in self.extra)
+
+    def get(self, key, default = None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> list:
+        return list(self.FIELDS + self.LAZY) + list(self.extra or ())
+
+    def to_dict(self) -> dict:
+        ''' Returns the record as a plain dict (decoding its lazy fields). '''
+        return {key: self[key] for key in self.keys()}
+
+    @classmethod
+    def from_page(cls, items) -> list:
+        ''' Converts a page of decoded items (a list of dicts) into records in one pass. '''
+        return list(map(cls, items))
+
+
+def lazy_slots(names) -> tuple:
+    ''' Returns the slot names that hold the raw value of lazy fields. '''
+    return tuple('_' + name for name in names)
+
+
+class MarketRow(Record):
+    ''' One row of /coins/markets. roi and sparkline_in_7d are decoded on first access. '''
+    sparkline_in_7d = Sparkline('sparkline_in_7d')
+    FIELDS = ('id', 'symbol', 'name', 'image', 'current_price', 'market_cap', 'market_cap_rank', 'fully_diluted_valuation',
+              'total_volume', 'high_24h', 'low_24h', 'price_change_24h', 'price_change_percentage_24h', 'market_cap_change_24h',
+              'market_cap_change_percentage_24h', 'circulating_supply', 'total_supply', 'max_supply', 'ath', 'ath_change_percentage',
+              'ath_date', 'atl', 'atl_change_percentage', 'atl_date', 'last_updated')
+    LAZY = ('roi', 'sparkline_in_7d')
+    __slots__ = FIELDS + lazy_slots(LAZY)
+
+
+class Ticker(Record):
+    ''' One entry of a tickers list (/coins/{id}/tickers, /exchanges/{id}/tickers). market and the converted values are decoded on first access. '''
+    FIELDS = ('base', 'target', 'last', 'volume', 'trust_score', 'bid_ask_spread_percentage', 'timestamp', 'last_traded_at',
+              'last_fetch_at', 'is_anomaly', 'is_stale', 'trade_url', 'token_info_url', 'coin_id', 'target_coin_id')
+    LAZY = ('market', 'converted_last', 'converted_volume')
+    __slots__ = FIELDS + lazy_slots(LAZY)
+
+
+class Pool(Record):
+    ''' One onchain pool object ({"id", "type", "attributes", "relationships"}). attributes and relationships are decoded on first access. '''
+    FIELDS = ('id', 'type')
+    LAZY = ('attributes', 'relationships')
+    __slots__ = FIELDS + lazy_slots(LAZY)
+
+
+RECORD_TYPES = { # Record type of the items of each endpoint template, used by run(mode="records")
+    '/coins/markets': MarketRow,
+    '/coins/{id}/tickers': Ticker,
+    '/exchanges/{id}/tickers': Ticker,
+    '/onchain/networks/{network}/pools/{pool_address}': Pool,
+    '/onchain/networks/{network}/pools/multi/{pool_addresses}': Pool,
+    '/onchain/networks/trending_pools': Pool,
+    '/onchain/networks/{network}/trending_pools': Pool,
+    '/onchain/networks/{network}/pools': Pool,
+    '/onchain/networks/{network}/dexes/{dex}/pools': Pool,
+    '/onchain/networks/new_pools': Pool,
+    '/onchain/networks/{network}/new_pools': Pool,
+    '/onchain/search/pools': Pool,
+    '/onchain/networks/{network}/tokens/{token_address}/pools': Pool,
+}
+
+
+def record_type(template) -> type:
+    ''' Returns the record type of an endpoint template. Raises ValueError if it has none. '''
+    if template not in RECORD_TYPES:
+        raise ValueError(f'mode="records" is not available for {template}, it supports {", ".join(RECORD_TYPES)}')
+    return RECORD_TYPES[template]
+
+
+def to_records(template, data) -> list:
+    '''
+    Converts a decoded response into a list of records, using the record type of its endpoint template.
+
+    A single onchain pool ({"data": {...}}) becomes a list of one.
+
+    Returns: list
+
+    Example:
+        >>> rows = cg.endpoints.coins_markets.params({"vs_currency": "usd", "per_page": 250, "sparkline": True}).run(mode="records")
+        >>> rows[0].current_price, rows[0]["market_cap"]
+    '''
+    cls = record_type(template)
+    if isinstance(data, dict) and isinstance(data.get('data'), dict):
+        return [cls(data['data'])]
+    return cls.from_page(pagination.page_items(template, data))
@@ -0,0 +1,189 @@
+''' Local coin identifier index: coin id, symbol, name and contract address lookups without an API call '''
+
+import gzip, os, threading, time, config, jsonlib
+
+
+def normalize_address(address) -> str:
+    ''' EVM (0x) addresses are case-insensitive and lowercased, other chains (e.g. Solana) are case-sensitive and kept as is. '''
+    address = address.strip()
+    return address.lower() if address[:2].lower() == '0x' else address
+
+
+class CoinIndex:
+    '''
+    Immutable snapshot of /coins/list?include_platform=true with a dict per lookup key.
+
+    Attributes:
+        coins: id -> {"id", "symbol", "name", "platforms"}
+        symbols: lowercase symbol -> tuple of ids (several coins share symbols)
+        names: lowercase name -> tuple of ids
+        contracts: (platform, address) -> id
+        addresses: address -> tuple of ids, for addresses given without a platform
+        fetched_at: UNIX time the list was fetched
+    '''
+    __slots__ = ('coins', 'symbols', 'names', 'contracts', 'addresses', 'fetched_at')
+
+    def __init__(self, coins, fetched_at = 0.0) -> None:
+        self.coins = {}
+        self.contracts = {}
+        symbols, names, addresses = {}, {}, {}
+        for coin in coins:
+            id = coin['id']
+            platforms = {platform: normalize_address(address) for platform, address in (coin.get('platforms') or {}).items() if platform and address}
+            self.coins[id] = {'id': id, 'symbol': coin.get('symbol') or '', 'name': coin.get('name') or '', 'platforms': platforms}
+            symbols.setdefault(self.coins[id]['symbol'].lower(), []).append(id)
+            names.setdefault(self.coins[id]['name'].lower(), []).append(id)
+            for platform, address in platforms.items():
+                self.contracts[(platform, address)] = id
+                addresses.setdefault(address, []).append(id)
+        self.symbols = {key: tuple(ids) for key, ids in symbols.items()}
+        self.names = {key: tuple(ids) for key, ids in names.items()}
+        self.addresses = {key: tuple(dict.fromkeys(ids)) for key, ids in addresses.items()}
+        self.fetched_at = fetched_at
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({len(self.coins)} coins, {len(self.contracts)} contracts)'
+
+    def __len__(self) -> int:
+        return len(self.coins)
+
+    def dump(self) -> bytes:
+        ''' Returns the index as gzipped JSON rows [id, symbol, name, {platform: address}], about a tenth of the API response. '''
+        rows = [[coin['id'], coin['symbol'], coin['name'], coin['platforms']] for coin in self.coins.values()]
+        return gzip.compress(jsonlib.dumps({'fetched_at': self.fetched_at, 'coins': rows}), compresslevel=6)
+
+    @classmethod
+    def load(cls, data) -> "CoinIndex":
+        ''' Rebuilds an index from dump() output. '''
+        payload = jsonlib.loads(gzip.decompress(data))
+        coins = ({'id': row[0], 'symbol': row[1], 'name': row[2], 'platforms': row[3]} for row in payload['coins'])
+        return cls(coins, payload['fetched_at'])
+
+
+class CoinResolver:
+    '''
+    Resolves symbols, names and contract addresses to CoinGecko coin ids from a local CoinIndex.
+
+    The index is loaded from path at first use (or fetched from /coins/list?include_platform=true if there is
+    no file yet), then rebuilt in a background thread every refresh_interval seconds. Lookups keep using the
+    previous index while a rebuild runs, and are plain dict lookups.
+
+    Example:
+        >>> cg.resolver.resolve("0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2")
+        'weth'
+        >>> cg.resolver.by_symbol("usdc")   # Several coins share a symbol
+        ('usd-coin', 'bridged-usdc-polygon-pos-bridge', ...)
+        >>> cg.resolver.by_contract("ethereum", "0xdac17f958d2ee523a2206206994597c13d831ec7")
+        'tether'
+    '''
+    def __init__(self, client, path = config.COIN_INDEX_PATH, refresh_interval = config.COIN_INDEX_REFRESH) -> None:
+        self.client = client
+        self.path = os.path.expanduser(path) if path is not None else None
+        self.refresh_interval = refresh_interval
+        self.lock = threading.Lock()
+        self.refreshing = False
+        self.next_refresh = 0.0
+        self._index = None
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self._index!r})'
+
+    @property
+    def index(self) -> CoinIndex:
+        ''' Returns the current CoinIndex, loading or fetching it on first use and starting a background rebuild when it is stale. '''
+        index = self._index
+        if index is None:
+            with self.lock:
+                if self._index is None:
+                    self._index = self._load() or self._fetch() or CoinIndex([])
+                    self.next_refresh = self._index.fetched_at + self.refresh_interval if self._index.fetched_at else time.time() + config.COIN_INDEX_RETRY_DELAY
+                index = self._index
+        elif time.time() >= self.next_refresh and not self.refreshing:
+            with self.lock:
+                if not self.refreshing:
+                    self.refreshing = True
+                    threading.Thread(target=self._refresh_in_background, daemon=True).start()
+        return index
+
+    def _load(self):
+        if self.path is None or not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, 'rb') as file:
+                return CoinIndex.load(file.read())
+        except (OSError, ValueError, KeyError, EOFError): # Unreadable or half-written file, fetch a new one
+            return None
+
+    def _fetch(self):
+        data = self.client.endpoints.coins_list.params({'include_platform': 'true'}).run()
+        if not isinstance(data, list):
+            return None
+        index = CoinIndex(data, time.time())
+        if self.path is not None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temporary = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(temporary, 'wb') as file:
+                file.write(index.dump())
+            os.replace(temporary, self.path) # Atomic, other processes never read a partial file
+        return index
+
+    def _refresh_in_background(self) -> None:
+        try:
+            self.refresh()
+        finally:
+            self.refreshing = False
+
+    def refresh(self) -> bool:
+        ''' Rebuilds the index from the API now. Returns False (keeping the old index) if the request failed. '''
+        index = self._fetch()
+        if index is None:
+            self.next_refresh = time.time() + config.COIN_INDEX_RETRY_DELAY
+            return False
+        self._index = index
+        self.next_refresh = index.fetched_at + self.refresh_interval
+        return True
+
+    def coin(self, id):
+        ''' Returns {"id", "symbol", "name", "platforms"} for a coin id, or None. '''
+        return self.index.coins.get(id)
+
+    def by_symbol(self, symbol) -> tuple:
+        ''' Returns every coin id with this symbol (case-insensitive), () if there is none. '''
+        return self.index.symbols.get(symbol.lower(), ())
+
+    def by_name(self, name) -> tuple:
+        ''' Returns every coin id with this name (case-insensitive), () if there is none. '''
+        return self.index.names.get(name.lower(), ())
+
+    def by_contract(self, platform, address):
+        ''' Returns the coin id of a token contract on an asset platform (e.g., "ethereum", "solana"), or None. '''
+        return self.index.contracts.get((platform, normalize_address(address)))
+
+    def by_address(self, address) -> tuple:
+        ''' Returns the coin ids of a contract address on any platform, () if there is none. '''
+        return self.index.addresses.get(normalize_address(address), ())
+
+    def resolve(self, value, platform = None):
+        '''
+        Returns the one coin id that value stands for, or None if it is unknown or ambiguous.
+
+        value is tried as a coin id, then a contract address (on platform if given), then a symbol, then a name.
+        An ambiguous symbol (e.g. "eth") resolves to None, use by_symbol to see the candidates.
+
+        Args:
+            value: Coin id, symbol, name or contract address
+            platform: Asset platform id for contract addresses (e.g., "ethereum")
+
+        Returns: str | None
+        '''
+        index = self.index
+        if value in index.coins:
+            return value
+        if platform is not None:
+            return index.contracts.get((platform, normalize_address(value)))
+        for candidates in (index.addresses.get(normalize_address(value)), index.symbols.get(value.lower()), index.names.get(value.lower())):
+            if candidates:
+                return candidates[0] if len(candidates) == 1 else None
+        return None
@@ -0,0 +1,111 @@
+''' Retry policy for idempotent GET requests: exponential backoff, full jitter, Retry-After and a shared retry budget '''
+
+import random, threading, time, config, lazy
+
+requests = lazy.LazyModule("requests") # Only needed once a request has failed
+
+
+class RetryBudget:
+    '''
+    Caps retries to a fraction of the requests sent, so retries cannot multiply load during an outage.
+
+    Every request deposits ratio tokens (up to maximum) and every retry spends one whole token.
+    With ratio = 0.2, at most about 1 retry is sent for every 5 requests once the initial
+    minimum tokens are used up.
+    '''
+    def __init__(self, ratio = config.RETRY_BUDGET_RATIO, minimum = config.RETRY_BUDGET_MIN, maximum = config.RETRY_BUDGET_MAX) -> None:
+        self.ratio = ratio
+        self.maximum = maximum
+        self.tokens = float(minimum)
+        self.lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self.lock:
+            self.tokens = min(self.maximum, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self.lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+default_budget = RetryBudget() # Shared by every client in the process unless one is given its own
+
+
+def retry_after_seconds(response):
+    '''
+    Parses a Retry-After header (delay in seconds or an HTTP date).
+
+    Returns: float | None : Seconds to wait, or None if the header is missing or invalid.
+    '''
+    value = response.headers.get('Retry-After') if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime # Rarely needed, most servers send seconds
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    '''
+    Decides whether a failed GET should be retried and how long to wait first.
+
+    Status codes only retry if they are listed in status_attempts (status -> max retries),
+    timeouts and connection errors retry up to attempts times. The wait is full jitter,
+    random between 0 and min(max_delay, base_delay * 2 ** retry), unless the response sent
+    a Retry-After header on one of the retry_after_statuses, in which case it is honored.
+
+    Example:
+        >>> policy = RetryPolicy(attempts=3, base_delay=1, status_attempts={429: 5, 503: 5})
+        >>> client = CoinGeckoClient("your_api_key", retry_policy=policy)
+    '''
+    def __init__(self, attempts = config.RETRY_ATTEMPT, base_delay = config.RETRY_DELAY, max_delay = config.RETRY_MAX_DELAY, status_attempts = None, retry_after_statuses = None, budget = None) -> None:
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.status_attempts = config.RETRY_STATUS_ATTEMPTS if status_attempts is None else status_attempts
+        self.retry_after_statuses = config.RETRY_AFTER_STATUSES if retry_after_statuses is None else retry_after_statuses
+        self.budget = default_budget if budget is None else budget
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(attempts={self.attempts}, base_delay={self.base_delay}, max_delay={self.max_delay})'
+
+    def record_request(self) -> None:
+        ''' Called once per new (non retry) request, adds to the retry budget. '''
+        self.budget.deposit()
+
+    def backoff(self, retry) -> float:
+        ''' Full jitter delay before a retry, retry counting from 0: random between 0 and min(max_delay, base_delay * 2 ** retry). '''
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry))
+
+    def delay(self, error, retry):
+        '''
+        Returns the seconds to wait before retrying after error, or None if it should not be retried.
+
+        Args:
+            error: The requests exception raised by the failed attempt
+            retry: How many retries were already made for this request
+        '''
+        if isinstance(error, requests.exceptions.HTTPError):
+            status = error.response.status_code
+            max_retries = self.status_attempts.get(status, 0)
+        elif isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+            status = None
+            max_retries = self.attempts
+        else:
+            return None
+        if retry >= max_retries or not self.budget.try_spend():
+            return None
+        if status in self.retry_after_statuses:
+            retry_after = retry_after_seconds(error.response)
+            if retry_after is not None:
+                return min(retry_after, config.RETRY_AFTER_MAX)
+        return self.backoff(retry)
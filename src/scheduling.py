@@ -0,0 +1,224 @@
+''' Priority and deadline-aware dispatch of rate limit tokens: interactive calls go first, bulk work gets the leftover quota '''
+
+import heapq, itertools, math, threading, time, config, lazy
+
+asyncio = lazy.LazyModule("asyncio") # Only needed by the async client
+metrics = lazy.LazyModule("metrics") # For its Histogram, loaded when a Scheduler is built
+
+
+class DeadlineExceeded(Exception):
+    ''' A request could not get a rate limit token (or its retry could not be sent) before its deadline. It is dropped, not sent. '''
+
+
+class Slot:
+    '''
+    Scheduling of one call: its priority class and the time.monotonic() it must start by (None for no deadline).
+
+    Built by Scheduler.slot when the call starts, so a Request's relative deadline counts from each run().
+    '''
+    __slots__ = ('priority', 'rank', 'deadline')
+
+    def __init__(self, priority, rank, deadline = None) -> None:
+        self.priority = priority
+        self.rank = rank
+        self.deadline = deadline
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.priority!r}, deadline={self.deadline})'
+
+    def expires_within(self, seconds) -> bool:
+        ''' Returns True if the deadline passes before seconds from now. '''
+        return self.deadline is not None and time.monotonic() + seconds > self.deadline
+
+
+class _ClassStats:
+    __slots__ = ('depth', 'dispatched', 'dropped', 'wait')
+
+    def __init__(self, buckets) -> None:
+        self.depth = 0 # Requests waiting right now
+        self.dispatched = 0
+        self.dropped = 0 # Requests failed fast because their deadline could not be met
+        self.wait = metrics.Histogram(buckets) # Seconds dispatched requests spent in the queue
+
+
+class Scheduler:
+    '''
+    Queue in front of a RateLimiter (or a keypool.KeyPool) that hands out tokens by priority class, then deadline, then arrival.
+
+    Without it the limiter serves callers first come, first served, so a bulk backfill that fills the quota delays
+    every price poll behind it. With it, a high-priority request waits only for the next free token, and a request
+    with a deadline is failed fast with DeadlineExceeded as soon as its estimated wait goes past the deadline,
+    instead of being sent late.
+
+    The class of a request is set with Request.schedule(priority=...), else taken from config.SCHEDULER_PRIORITY
+    for its endpoint template (config.SCHEDULER_DEFAULT_CLASS otherwise). Retries go through the queue again with
+    the same class and deadline. A weight larger than the source's burst can never be free at once: once first
+    in line it takes its tokens on credit (source.reserve) and waits out the debt, like RateLimiter.acquire does.
+
+    Args:
+        source: RateLimiter or KeyPool the tokens come from
+        classes: Priority classes, most urgent first
+        buckets: Upper bounds of the queue wait histograms (seconds)
+
+    Example:
+        >>> cg = CoinGeckoClient("your_api_key", scheduler=True)
+        >>> cg.endpoints.simple_price.params({"ids": "bitcoin", "vs_currencies": "usd"}).schedule(deadline=2).run()
+        >>> cg.scheduler.stats()["high"]
+        {'depth': 0, 'dispatched': 1, 'dropped': 0, 'wait_seconds_sum': 0.0, 'wait_seconds_count': 1}
+    '''
+    def __init__(self, source, classes = config.SCHEDULER_CLASSES, buckets = config.METRICS_BUCKETS) -> None:
+        self.source = source
+        self.classes = tuple(classes)
+        self.ranks = {name: rank for rank, name in enumerate(self.classes)}
+        self.buckets = tuple(sorted(buckets))
+        self.queue = [] # Heap of [rank, deadline, arrival, weight, slot]
+        self.sequence = itertools.count()
+        self.condition = threading.Condition()
+        self.class_stats = {name: _ClassStats(self.buckets) for name in self.classes}
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.source!r}, {len(self.queue)} queued)'
+
+    def slot(self, template, priority = None, deadline = None) -> Slot:
+        '''
+        Returns the Slot of a call starting now.
+
+        Args:
+            template: Endpoint template, picks the default class (config.SCHEDULER_PRIORITY) and deadline (config.SCHEDULER_DEADLINE)
+            priority: Class overriding the endpoint default
+            deadline: Seconds from now overriding the endpoint default
+        '''
+        priority = priority or config.SCHEDULER_PRIORITY.get(template, config.SCHEDULER_DEFAULT_CLASS)
+        if priority not in self.ranks:
+            raise ValueError(f"Unknown priority class {priority!r}, expected one of {self.classes}")
+        if deadline is None:
+            deadline = config.SCHEDULER_DEADLINE.get(template)
+        return Slot(priority, self.ranks[priority], None if deadline is None else time.monotonic() + deadline)
+
+    def _burst(self) -> float:
+        ''' Returns the most tokens the source can hold at once (its largest key's burst for a KeyPool). '''
+        keys = getattr(self.source, 'keys', None)
+        return max(key.limiter.burst for key in keys) if keys is not None else self.source.burst
+
+    @staticmethod
+    def _granted(grant) -> bool:
+        return grant is not None and grant is not False # RateLimiter.try_acquire returns a bool, KeyPool.try_acquire a key or None
+
+    def _poll(self, ticket):
+        '''
+        Called with the condition held. Takes the tokens if ticket is first in line and they are free,
+        or on credit if it is first in line and weight is more than the source can ever have free.
+
+        Returns: tuple : (grant, seconds to wait before sending) or (None, seconds to wait before polling again).
+                 Raises DeadlineExceeded after dropping ticket.
+        '''
+        weight, slot = ticket[3], ticket[4]
+        if self.queue[0] is ticket:
+            grant = self.source.try_acquire(weight)
+            if self._granted(grant):
+                heapq.heappop(self.queue)
+                self.condition.notify_all() # The next in line becomes first
+                return grant, 0.0
+        ahead = sum(other[3] for other in self.queue if other < ticket) + weight
+        estimate = self.source.wait_time(ahead) # Tokens for everyone ahead and this one, at the source's refill rate
+        if slot.expires_within(estimate):
+            self._remove(ticket)
+            self.class_stats[slot.priority].dropped += 1
+            raise DeadlineExceeded(f"{slot.priority} request needs about {estimate:.2f}s for a token, past its deadline")
+        if self.queue[0] is ticket and weight > self._burst():
+            heapq.heappop(self.queue)
+            self.condition.notify_all()
+            reserved = self.source.reserve(weight) # RateLimiter returns the wait, KeyPool (key, wait)
+            return reserved if isinstance(reserved, tuple) else (True, reserved)
+        return None, max(estimate if self.queue[0] is ticket else self.source.wait_time(weight), 0.001)
+
+    def _remove(self, ticket) -> None:
+        self.queue.remove(ticket)
+        heapq.heapify(self.queue)
+        self.class_stats[ticket[4].priority].depth -= 1
+        self.condition.notify_all()
+
+    def _enqueue(self, weight, slot) -> list:
+        ticket = [slot.rank, slot.deadline if slot.deadline is not None else math.inf, next(self.sequence), weight, slot]
+        heapq.heappush(self.queue, ticket)
+        self.class_stats[slot.priority].depth += 1
+        self.condition.notify_all() # A more urgent ticket may now be first in line
+        return ticket
+
+    def _dispatched(self, slot, started, debt = 0.0) -> float:
+        waited = time.monotonic() - started + debt
+        stats = self.class_stats[slot.priority]
+        stats.depth -= 1
+        stats.dispatched += 1
+        stats.wait.observe(waited)
+        return waited
+
+    def try_acquire(self, weight, slot):
+        '''
+        Takes weight tokens only if they are free right now and nothing is queued ahead of slot.
+
+        Returns: RateLimiter grant (True) | ApiKey | None : None if nothing was taken.
+        '''
+        with self.condition:
+            if self.queue and self.queue[0][:3] <= [slot.rank, slot.deadline if slot.deadline is not None else math.inf, math.inf]:
+                return None
+            grant = self.source.try_acquire(weight)
+            if not self._granted(grant):
+                return None
+            stats = self.class_stats[slot.priority]
+            stats.dispatched += 1
+            stats.wait.observe(0.0)
+            return grant
+
+    def acquire(self, weight, slot) -> tuple:
+        '''
+        Blocks until slot is first in line and weight tokens are free.
+
+        Returns: tuple : (grant, seconds waited). The grant is True for a RateLimiter, the ApiKey to send with for a KeyPool.
+        Raises: DeadlineExceeded as soon as the estimated wait goes past the slot's deadline.
+        '''
+        started = time.monotonic()
+        with self.condition:
+            ticket = self._enqueue(weight, slot)
+            try:
+                while True:
+                    grant, wait = self._poll(ticket)
+                    if grant is not None:
+                        waited = self._dispatched(slot, started, wait)
+                        break
+                    self.condition.wait(wait)
+            except BaseException: # Interrupted while queued, a ticket dropped for its deadline is already gone
+                if ticket in self.queue:
+                    self._remove(ticket)
+                raise
+        if wait > 0: # Tokens taken on credit, slept outside the lock so the queue keeps moving
+            time.sleep(wait)
+        return grant, waited
+
+    async def acquire_async(self, weight, slot) -> tuple:
+        ''' Same as acquire for the async client, polling every config.SCHEDULER_POLL_INTERVAL seconds at most. '''
+        started = time.monotonic()
+        with self.condition:
+            ticket = self._enqueue(weight, slot)
+        try:
+            while True:
+                with self.condition:
+                    grant, wait = self._poll(ticket)
+                    if grant is not None:
+                        waited = self._dispatched(slot, started, wait)
+                        break
+                await asyncio.sleep(min(wait, config.SCHEDULER_POLL_INTERVAL))
+        except BaseException: # Cancelled while queued
+            with self.condition:
+                if ticket in self.queue:
+                    self._remove(ticket)
+            raise
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return grant, waited
+
+    def stats(self) -> dict:
+        ''' Returns {class: {"depth", "dispatched", "dropped", "wait_seconds_sum", "wait_seconds_count"}}. '''
+        with self.condition:
+            return {name: {'depth': stats.depth, 'dispatched': stats.dispatched, 'dropped': stats.dropped,
+                           'wait_seconds_sum': stats.wait.sum, 'wait_seconds_count': stats.wait.count} for name, stats in self.class_stats.items()}
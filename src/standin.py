@@ -0,0 +1,387 @@
+''' Record/replay stand-in for the CoinGecko API: real responses captured into fixtures, served locally with latency, errors and rate limits
+
+Record fixtures (needs the network and uses quota once), from the src folder:
+    python standin.py record
+
+Serve them:
+    python standin.py serve --port 8000 --latency 0.15 --error 429=0.05 --rate-limit 30/60
+
+then point a client at it:
+    >>> cg = CoinGeckoClient()
+    >>> cg.base_url = "http://127.0.0.1:8000"
+'''
+
+import argparse, collections, hashlib, math, os, random, threading, time, config, endpoints, jsonlib, pagination
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+from backfill import file_name
+
+
+PATH_SAMPLES = { # Value used for each path placeholder when recording, see TEMPLATE_SAMPLES for per-endpoint overrides
+    'id': 'bitcoin',
+    'coin_id': 'bitcoin',
+    'contract_address': '0xdac17f958d2ee523a2206206994597c13d831ec7',
+    'asset_platform_id': 'ethereum',
+    'entity': 'companies',
+    'entity_id': 'strategy',
+    'network': 'eth',
+    'dex': 'uniswap_v3',
+    'token_address': '0xdac17f958d2ee523a2206206994597c13d831ec7',
+    'token_addresses': '0xdac17f958d2ee523a2206206994597c13d831ec7',
+    'pool_address': '0x88e6a0c2ddd26feeb64f039a2c41296fcb3f5640',
+    'pool_addresses': '0x88e6a0c2ddd26feeb64f039a2c41296fcb3f5640',
+    'timeframe': 'day',
+}
+
+TEMPLATE_SAMPLES = { # Template -> (path values, query params) for endpoints that need more than PATH_SAMPLES
+    '/simple/price': ({}, {'ids': 'bitcoin,ethereum', 'vs_currencies': 'usd'}),
+    '/simple/token_price/{id}': ({'id': 'ethereum'}, {'contract_addresses': '0xdac17f958d2ee523a2206206994597c13d831ec7', 'vs_currencies': 'usd'}),
+    '/coins/markets': ({}, {'vs_currency': 'usd'}),
+    '/coins/{id}/history': ({}, {'date': '30-12-2024'}),
+    '/coins/{id}/market_chart': ({}, {'vs_currency': 'usd', 'days': 30}),
+    '/coins/{id}/market_chart/range': ({}, {'vs_currency': 'usd', 'from': 1704067200, 'to': 1711929600}),
+    '/coins/{id}/ohlc': ({}, {'vs_currency': 'usd', 'days': 30}),
+    '/coins/{id}/contract/{contract_address}': ({'id': 'ethereum'}, {}),
+    '/coins/{id}/contract/{contract_address}/market_chart': ({'id': 'ethereum'}, {'vs_currency': 'usd', 'days': 30}),
+    '/coins/{id}/contract/{contract_address}/market_chart/range': ({'id': 'ethereum'}, {'vs_currency': 'usd', 'from': 1704067200, 'to': 1711929600}),
+    '/nfts/{id}': ({'id': 'pudgy-penguins'}, {}),
+    '/nfts/{asset_platform_id}/contract/{contract_address}': ({'contract_address': '0xbd3531da5cf5857e7cfaa92426877b022e612cf8'}, {}),
+    '/exchanges/{id}': ({'id': 'binance'}, {}),
+    '/exchanges/{id}/tickers': ({'id': 'binance'}, {}),
+    '/exchanges/{id}/volume_chart': ({'id': 'binance'}, {'days': 30}),
+    '/derivatives/exchanges/{id}': ({'id': 'binance_futures'}, {}),
+    '/public_treasury/{entity_id}/{coin_id}/holding_chart': ({}, {'days': 365}),
+    '/search': ({}, {'query': 'bitcoin'}),
+    '/onchain/search/pools': ({}, {'query': 'weth'}),
+}
+
+ERROR_MESSAGES = {
+    429: "You've exceeded the Rate Limit. Please visit https://www.coingecko.com/en/api/pricing to subscribe to our API plans for higher rate limits.",
+    500: "Internal server error",
+    502: "Bad gateway",
+    503: "Service unavailable",
+    504: "Gateway timeout",
+}
+
+
+def fixture_path(directory, template) -> str:
+    return os.path.join(os.path.expanduser(directory), file_name(template) + '.jsonl')
+
+
+def load_fixtures(directory = config.STANDIN_FIXTURES_DIR) -> dict:
+    ''' Returns {template: [fixture, ...]} from the fixture files in directory (see Recorder for the format). '''
+    fixtures = {}
+    directory = os.path.expanduser(directory)
+    if not os.path.isdir(directory):
+        return fixtures
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith('.jsonl'):
+            continue
+        with open(os.path.join(directory, name), 'rb') as file:
+            for line in file:
+                if line.strip():
+                    fixture = jsonlib.loads(line)
+                    fixtures.setdefault(fixture['template'], []).append(fixture)
+    return fixtures
+
+
+def sample_request(client, template):
+    ''' Returns a Request for template built from PATH_SAMPLES and TEMPLATE_SAMPLES. '''
+    route = endpoints.ROUTES_BY_TEMPLATE[template]
+    values, params = TEMPLATE_SAMPLES.get(template, ({}, {}))
+    path = route.format(**{name: values.get(name, PATH_SAMPLES[name]) for name in route.path_params})
+    return client.request(path, route).params(params)
+
+
+class Recorder:
+    '''
+    Captures real API responses into fixture files, one JSON-lines file per endpoint template.
+
+    Each line is {"template", "path", "params", "status", "content_type", "body"}. Recording the same path and
+    params again replaces the earlier line. Requests go through the client, so its rate limiter and retries apply.
+
+    Example:
+        >>> recorder = Recorder(CoinGeckoClient("your_api_key"))
+        >>> recorder.record_all()    # One sample per template of endpoints.ENDPOINT_ALL
+        >>> recorder.record(cg.endpoints.coins_markets.params({"vs_currency": "eur", "per_page": 250}))
+    '''
+    def __init__(self, client, directory = config.STANDIN_FIXTURES_DIR) -> None:
+        self.client = client
+        self.directory = os.path.expanduser(directory)
+        self.lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.directory!r})'
+
+    def record(self, request) -> bool:
+        ''' Sends request and saves its response as a fixture. Returns False if the request failed (nothing is saved). '''
+        response = request.run(mode="response")
+        if response is None:
+            return False
+        fixture = {'template': request.template, 'path': request.endpoint, 'params': {key: str(value) for key, value in request.query_params.items()},
+                   'status': response.status_code, 'content_type': response.headers.get('Content-Type', 'application/json'),
+                   'body': response.content.decode('utf-8')}
+        path = fixture_path(self.directory, request.template)
+        with self.lock:
+            os.makedirs(self.directory, exist_ok=True)
+            kept = [line for line in self._lines(path) if (line['path'], line['params']) != (fixture['path'], fixture['params'])]
+            temporary = f'{path}.{os.getpid()}.tmp'
+            with open(temporary, 'wb') as file:
+                for line in kept + [fixture]:
+                    file.write(jsonlib.dumps(line) + b'\n')
+            os.replace(temporary, path)
+        return True
+
+    @staticmethod
+    def _lines(path) -> list:
+        if not os.path.exists(path):
+            return []
+        with open(path, 'rb') as file:
+            return [jsonlib.loads(line) for line in file if line.strip()]
+
+    def record_all(self, templates = None) -> dict:
+        '''
+        Records one sample response for every template (all of endpoints.ENDPOINT_ALL by default).
+
+        Returns: dict : {template: True if it was saved}. Paid-plan endpoints fail on a demo key and are skipped.
+        '''
+        results = {}
+        for template in templates or endpoints.ENDPOINT_ALL:
+            results[template] = self.record(sample_request(self.client, template))
+        return results
+
+
+def fixed(seconds):
+    ''' Latency distribution: always seconds. '''
+    return lambda rng: seconds
+
+
+def uniform(low, high):
+    ''' Latency distribution: uniform between low and high seconds. '''
+    return lambda rng: rng.uniform(low, high)
+
+
+def lognormal(median, sigma = 0.5):
+    ''' Latency distribution: log-normal around median seconds, a long right tail like real network latency. '''
+    return lambda rng: rng.lognormvariate(math.log(median), sigma)
+
+
+class StandInServer:
+    '''
+    Local HTTP server that replays recorded fixtures in place of the CoinGecko API.
+
+    A request is matched to its endpoint template with endpoints.route_for, then to the fixture with the same path
+    and params, else the same path, else any fixture of the template (so every coin id gets an answer).
+    Unknown templates get a 404.
+
+    Args:
+        fixtures: Fixture directory, or a {template: [fixture, ...]} dict (see load_fixtures)
+        latency: Seconds added to every response, a number or a distribution (fixed, uniform, lognormal or any callable(rng))
+        endpoint_latency: {template: latency} overrides
+        error_rates: {status: probability} of answering with that error instead (e.g., {429: 0.05, 503: 0.01})
+        retry_after: Retry-After seconds sent with 429 and 503 responses, None to leave the header out
+        rate_limit: (calls, period seconds) allowed before the server answers 429, like the real API, None for no limit
+        total_items: Items served across the pages of a paginated endpoint (recorded items are repeated), then pages are empty
+        seed: Seed of the random draws (latency, injected errors), so a run with the same request order is reproducible
+
+    Example:
+        >>> with StandInServer(latency=lognormal(0.12), error_rates={429: 0.05}, seed=1) as server:
+        ...     cg.base_url = server.url
+        ...     cg.endpoints.coins_markets.params({"vs_currency": "usd"}).run()
+        ...     server.stats()
+    '''
+    def __init__(self, fixtures = config.STANDIN_FIXTURES_DIR, latency = 0.0, endpoint_latency = None, error_rates = None, retry_after = config.STANDIN_RETRY_AFTER,
+                 rate_limit = None, total_items = config.STANDIN_TOTAL_ITEMS, seed = None, host = "127.0.0.1", port = 0) -> None:
+        self.fixtures = fixtures if isinstance(fixtures, dict) else load_fixtures(fixtures)
+        self.latency = latency
+        self.endpoint_latency = endpoint_latency or {}
+        self.error_rates = error_rates or {}
+        self.retry_after = retry_after
+        self.rate_limit = rate_limit
+        self.total_items = total_items
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.sent = collections.deque() # Times of the requests inside the rate limit window
+        self.counts = collections.Counter() # (template, status) -> responses
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.url!r}, {len(self.fixtures)} templates)'
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        ''' Base URL to give the client (client.base_url = server.url). '''
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> "StandInServer":
+        ''' Serves on a background thread and returns self. '''
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self.thread is not None:
+            self.server.shutdown()
+            self.thread = None
+        self.server.server_close()
+
+    def stats(self) -> dict:
+        ''' Returns {template: {status: responses}} of everything served so far. '''
+        with self.lock:
+            stats = {}
+            for (template, status), count in self.counts.items():
+                stats.setdefault(template, {})[status] = count
+            return stats
+
+    def _delay(self, template) -> float:
+        latency = self.endpoint_latency.get(template, self.latency)
+        return latency(self.rng) if callable(latency) else latency
+
+    def _limited(self):
+        ''' Returns the Retry-After seconds if this request is over the rate limit, else None and counts it. '''
+        if self.rate_limit is None:
+            return None
+        calls, period = self.rate_limit
+        now = time.monotonic()
+        while self.sent and self.sent[0] <= now - period:
+            self.sent.popleft()
+        if len(self.sent) >= calls:
+            return max(1, math.ceil(self.sent[0] + period - now))
+        self.sent.append(now)
+        return None
+
+    def _injected(self):
+        ''' Returns the status of an injected error for this request, or None. '''
+        draw = self.rng.random()
+        for status, rate in self.error_rates.items():
+            if draw < rate:
+                return status
+            draw -= rate
+        return None
+
+    def _fixture(self, template, path, params):
+        candidates = self.fixtures.get(template)
+        if not candidates:
+            return None
+        request_params = {key: value for key, value in params.items() if key not in ('page', 'per_page')}
+        same_path = None
+        for fixture in candidates:
+            if fixture['path'] == path:
+                if {key: value for key, value in fixture['params'].items() if key not in ('page', 'per_page')} == request_params:
+                    return fixture
+                same_path = same_path or fixture
+        return same_path or candidates[0]
+
+    def _page(self, route, body, params) -> bytes:
+        ''' Returns page "page" of a paginated endpoint, cut from total_items items made by repeating the recorded ones. '''
+        if route is None or 'page' not in route.params:
+            return body
+        data = jsonlib.loads(body)
+        items = pagination.page_items(route.template, data)
+        if not items:
+            return body
+        size = pagination.page_size(route.template, params) or len(items)
+        page = max(1, int(params.get('page', 1)))
+        start = min((page - 1) * size, self.total_items)
+        served = [items[index % len(items)] for index in range(start, min(start + size, self.total_items))]
+        key = config.PAGE_ITEMS_KEY.get(route.template, 'data' if isinstance(data, dict) else None)
+        if key is not None and isinstance(data, dict):
+            return jsonlib.dumps({**data, key: served})
+        return jsonlib.dumps(served)
+
+    def respond(self, path, params, headers):
+        '''
+        Returns (status, headers, body) for one request, after sleeping for its latency. Used by the HTTP handler.
+        '''
+        route = endpoints.route_for(path)
+        template = route.template if route is not None else path
+        with self.lock:
+            delay = self._delay(template)
+            retry_after = self._limited()
+            status = 429 if retry_after is not None else self._injected()
+        time.sleep(delay)
+        if status is None:
+            fixture = self._fixture(template, path, params)
+            if fixture is None:
+                status, response_headers, body = 404, {'Content-Type': 'application/json'}, jsonlib.dumps({'error': 'Not Found'})
+            else:
+                status = fixture['status']
+                body = self._page(route, fixture['body'].encode('utf-8'), params)
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+                response_headers = {'Content-Type': fixture['content_type'], 'ETag': etag}
+                if headers.get('If-None-Match') == etag:
+                    status, body = 304, b''
+        else:
+            body = jsonlib.dumps({'status': {'error_code': status, 'error_message': ERROR_MESSAGES.get(status, 'Error')}})
+            response_headers = {'Content-Type': 'application/json'}
+            retry_after = retry_after if retry_after is not None else self.retry_after
+            if status in (429, 503) and retry_after is not None:
+                response_headers['Retry-After'] = str(retry_after)
+        with self.lock:
+            self.counts[(template, status)] += 1
+        return status, response_headers, body
+
+    def _handler(self):
+        standin = self
+
+        class StandInHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1" # Keeps connections alive between requests, like the real API
+            disable_nagle_algorithm = True # Headers and body are separate writes, avoids a delayed-ACK stall on reused sockets
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                status, headers, body = standin.respond(url.path, dict(parse_qsl(url.query, keep_blank_values=True)), self.headers)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args): # Silences the default per-request logging
+                pass
+
+        return StandInHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record CoinGecko API fixtures or serve them locally.")
+    parser.add_argument('command', choices=('record', 'serve'))
+    parser.add_argument('templates', nargs='*', help="Templates to record (default: every template of endpoints.ENDPOINT_ALL)")
+    parser.add_argument('--dir', default=config.STANDIN_FIXTURES_DIR, help="Fixture directory")
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0.0, help="Median latency in seconds (log-normal)")
+    parser.add_argument('--error', action='append', default=[], metavar='STATUS=RATE', help="Injected error rate, e.g. 429=0.05 (repeatable)")
+    parser.add_argument('--rate-limit', metavar='CALLS/SECONDS', help="Answer 429 past CALLS requests per SECONDS, e.g. 30/60")
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        import client
+        results = Recorder(client.CoinGeckoClient(client.test_api_key), args.dir).record_all(args.templates or None)
+        for template, saved in results.items():
+            print(f"{'saved ' if saved else 'FAILED'} {template}")
+        return
+    rate_limit = tuple(map(float, args.rate_limit.split('/'))) if args.rate_limit else None
+    error_rates = {int(status): float(rate) for status, rate in (item.split('=') for item in args.error)}
+    server = StandInServer(args.dir, lognormal(args.latency) if args.latency else 0.0, error_rates=error_rates,
+                           rate_limit=rate_limit, seed=args.seed, port=args.port).start()
+    print(f"Serving {len(server.fixtures)} templates from {args.dir} at {server.url}, Ctrl+C to stop")
+    try:
+        server.thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+''' Incremental JSON decoding: yields the elements of one array in a response body while it is still downloading '''
+
+import codecs, json
+
+
+_WHITESPACE = ' \t\n\r'
+_NUMBER = '0123456789+-.eE'
+
+
+class ArrayStreamDecoder:
+    '''
+    Push parser that decodes the elements of a JSON array one by one as bytes arrive.
+
+    The array is either the whole document (path None) or found by following object keys, e.g. path "tokens"
+    for {"name": ..., "tokens": [...]} or "data.items" for nested objects. Only the unparsed tail of the body
+    is kept, so memory stays bounded by the largest single element rather than the whole response.
+
+    Example:
+        >>> decoder = ArrayStreamDecoder("tokens")
+        >>> decoder.feed(b'{"name": "x", "tokens": [{"a": 1}, {"a"')
+        [{'a': 1}]
+        >>> decoder.feed(b': 2}]}') + decoder.close()
+        [{'a': 2}]
+    '''
+    def __init__(self, path = None) -> None:
+        if isinstance(path, str):
+            path = path.split('.') if path else []
+        self.path = list(path or [])
+        self.level = 0 # How many keys of path have been found
+        self.key = None
+        self.state = 'object' if self.path else 'array'
+        self.buffer = ''
+        self.pos = 0
+        self.final = False
+        self.text = codecs.getincrementaldecoder('utf-8')() # Handles multi-byte characters split between chunks
+        self.decoder = json.JSONDecoder()
+
+    def feed(self, data) -> list:
+        ''' Adds the next chunk of the body and returns the elements completed by it. '''
+        self.buffer = self.buffer[self.pos:] + self.text.decode(data)
+        self.pos = 0
+        return list(self._parse())
+
+    def close(self) -> list:
+        ''' Signals the end of the body and returns the last elements. Raises ValueError if the array was not complete. '''
+        self.final = True
+        items = self.feed(b'')
+        if self.state != 'done':
+            raise ValueError('Response ended before the JSON array was complete')
+        return items
+
+    def _char(self) -> str:
+        ''' Returns the next non-whitespace character without consuming it, '' if more data is needed. '''
+        while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+            self.pos += 1
+        return self.buffer[self.pos] if self.pos < len(self.buffer) else ''
+
+    def _expect(self, char, expected) -> None:
+        if char != expected:
+            raise ValueError(f'Expected {expected!r} in JSON stream, found {char!r}')
+        self.pos += 1
+
+    def _value(self):
+        ''' Decodes one value at pos. Returns (True, value), or (False, None) if it is not complete yet. '''
+        try:
+            value, end = self.decoder.raw_decode(self.buffer, self.pos)
+        except json.JSONDecodeError:
+            if self.final:
+                raise
+            return False, None
+        if self.buffer[self.pos] in '-0123456789' and not self.final and (end == len(self.buffer) or self.buffer[end] in _NUMBER):
+            return False, None # A number only ends at a non-number character, "1." or "1e" may continue in the next chunk
+        self.pos = end
+        return True, value
+
+    def _parse(self):
+        while self.state != 'done':
+            char = self._char()
+            if not char:
+                return
+            if self.state == 'object':
+                self._expect(char, '{')
+                self.state = 'key'
+            elif self.state == 'key':
+                if char == '}':
+                    raise ValueError(f'Key {self.path[self.level]!r} not found in JSON stream')
+                complete, self.key = self._value()
+                if not complete:
+                    return
+                self.state = 'colon'
+            elif self.state == 'colon':
+                self._expect(char, ':')
+                if self.key == self.path[self.level]:
+                    self.level += 1
+                    self.state = 'object' if self.level < len(self.path) else 'array'
+                else:
+                    self.state = 'skip'
+            elif self.state == 'skip': # Value of a key that is not on the path
+                complete, _ = self._value()
+                if not complete:
+                    return
+                self.state = 'next_key'
+            elif self.state == 'next_key':
+                if char == '}':
+                    raise ValueError(f'Key {self.path[self.level]!r} not found in JSON stream')
+                self._expect(char, ',')
+                self.state = 'key'
+            elif self.state == 'array':
+                self._expect(char, '[')
+                self.state = 'first'
+            elif self.state == 'first':
+                if char == ']':
+                    self.pos += 1
+                    self.state = 'done'
+                else:
+                    self.state = 'element'
+            elif self.state == 'element':
+                complete, value = self._value()
+                if not complete:
+                    return
+                self.state = 'after'
+                yield value
+            elif self.state == 'after':
+                if char == ']':
+                    self.pos += 1
+                    self.state = 'done'
+                else:
+                    self._expect(char, ',')
+                    self.state = 'element'
+
+
+def iter_json_array(chunks, path = None):
+    '''
+    Yields the elements of a JSON array from an iterable of byte chunks (e.g. response.iter_content()).
+
+    Args:
+        chunks: Iterable of bytes
+        path: None for a top-level array, or the key(s) leading to a nested one (e.g. "tokens")
+
+    Returns: Generator
+    '''
+    decoder = ArrayStreamDecoder(path)
+    for chunk in chunks:
+        yield from decoder.feed(chunk)
+    yield from decoder.close()
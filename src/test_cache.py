@@ -0,0 +1,93 @@
+''' Tests for cache.ResponseCache (TTL, LRU, byte budget, disk tier and revalidation), expiry set through the TTL, no sleeping. Run with pytest from src/ '''
+
+from cache import MISSING, DiskCache, ResponseCache
+from conftest import client_for
+
+
+def key(endpoint, **params):
+    return ResponseCache.key(endpoint, params)
+
+
+def test_fresh_entry_is_served_until_it_expires():
+    cache = ResponseCache()
+    cache.set(key('/coins/list'), [1], b'[1]', ttl=60)
+    cache.set(key('/asset_platforms'), [2], b'[2]', ttl=-1) # Already expired
+    assert cache.get(key('/coins/list')) == [1]
+    assert cache.get(key('/asset_platforms')) is MISSING
+    assert len(cache) == 1
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_key_ignores_param_order_and_trailing_slash():
+    assert ResponseCache.key('/coins/list/', {'b': 1, 'a': True}) == ResponseCache.key('/coins/list', {'a': 'True', 'b': '1'})
+
+
+def test_ttls_per_template():
+    cache = ResponseCache(ttls={'/coins/markets': 30})
+    assert cache.ttl('/coins/markets') == 30
+    assert cache.ttl('/coins/list') == 3600 # config.CACHE_TTL default
+    assert cache.ttl('/simple/price') == 0
+
+
+def test_raw_body_and_lazy_decoding():
+    cache = ResponseCache()
+    cache.set(key('/coins/list'), MISSING, b'{"a": 1}', ttl=60)
+    assert cache.get(key('/coins/list'), raw=True) == b'{"a": 1}'
+    assert cache.get(key('/coins/list')) == {'a': 1}
+
+
+def test_lru_eviction_keeps_the_byte_budget():
+    cache = ResponseCache(max_bytes=30)
+    for name in 'abc':
+        cache.set(key('/' + name), name, b'x' * 10, ttl=60)
+    cache.get(key('/a')) # a is now the most recently used
+    cache.set(key('/d'), 'd', b'x' * 10, ttl=60)
+    assert cache.get(key('/b')) is MISSING
+    assert [cache.get(key('/' + name)) for name in 'acd'] == ['a', 'c', 'd']
+    assert cache.stats()['evictions'] == 1 and cache.stats()['bytes'] == 30
+
+
+def test_body_over_the_budget_is_not_stored():
+    cache = ResponseCache(max_bytes=10)
+    cache.set(key('/big'), 'big', b'x' * 11, ttl=60)
+    assert len(cache) == 0 and cache.stats()['bytes'] == 0
+
+
+def test_client_serves_cached_endpoints_from_memory(standin):
+    server = standin()
+    cg = client_for(server)
+    assert cg.endpoints.coins_list.run() == cg.endpoints.coins_list.run()
+    cg.endpoints.ping.run()
+    cg.endpoints.ping.run()
+    assert server.stats() == {'/coins/list': {200: 1}, '/ping': {200: 2}} # /ping has no TTL
+    assert cg.cache.stats()['hits'] == 1
+
+
+def test_disk_tier_is_shared_between_caches(tmp_path):
+    disk = DiskCache(str(tmp_path / 'responses.sqlite'))
+    ResponseCache(disk=disk).set(key('/coins/list'), [1], b'[1]', ttl=60, headers={'ETag': '"v1"'})
+    other = ResponseCache(disk=DiskCache(str(tmp_path / 'responses.sqlite'))) # Another process
+    assert other.get(key('/coins/list')) == [1]
+    assert other.stats()['disk_hits'] == 1
+
+
+def test_stale_disk_entry_gives_validators(tmp_path):
+    cache = ResponseCache(disk=DiskCache(str(tmp_path / 'responses.sqlite')))
+    cache.set(key('/coins/list'), [1], b'[1]', ttl=-1, headers={'ETag': '"v1"', 'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'})
+    assert cache.get(key('/coins/list')) is MISSING
+    assert cache.validators(key('/coins/list')) == {'If-None-Match': '"v1"', 'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT'}
+    assert cache.revalidated(key('/coins/list'), 60) == [1]
+    assert cache.get(key('/coins/list')) == [1]
+    assert cache.revalidated(key('/exchanges/list'), 60) is MISSING
+
+
+def test_client_revalidates_with_etag(standin, tmp_path):
+    server = standin()
+    cache = ResponseCache(disk=DiskCache(str(tmp_path / 'responses.sqlite')))
+    cg = client_for(server, cache=cache)
+    data = cg.endpoints.coins_list.run()
+    cache.disk.touch(key('/coins/list'), -1) # Stale on disk
+    cache.clear()
+    assert cg.endpoints.coins_list.run() == data
+    assert server.stats() == {'/coins/list': {200: 1, 304: 1}}
+    assert cache.stats()['revalidations'] == 1
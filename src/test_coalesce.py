@@ -0,0 +1,115 @@
+''' Tests for coalesce.SingleFlight and AsyncSingleFlight: the leader is held until every follower has joined. Run with pytest from src/ '''
+
+import asyncio, threading, time, pytest
+from coalesce import AsyncSingleFlight, SingleFlight
+from conftest import client_for
+
+
+def wait_for(condition, timeout = 5) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def run_followers(flight, func, count) -> list:
+    ''' Starts a leader and count - 1 followers on one key, releases the leader once all have joined. Returns every outcome. '''
+    release = threading.Event()
+    outcomes = [None] * count
+
+    def held():
+        release.wait(5)
+        return func()
+
+    def call(index):
+        try:
+            outcomes[index] = flight.do('key', held)
+        except Exception as error:
+            outcomes[index] = error
+
+    threads = [threading.Thread(target=call, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    wait_for(lambda: flight.shared == count - 1)
+    release.set()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+
+def test_followers_share_the_leaders_result():
+    flight, calls = SingleFlight(), []
+    result = object()
+    outcomes = run_followers(flight, lambda: calls.append(1) or result, 8)
+    assert calls == [1]
+    assert all(outcome is result for outcome in outcomes)
+    assert not flight.calls
+
+
+def test_followers_get_the_leaders_error():
+    flight = SingleFlight()
+    error = RuntimeError("boom")
+
+    def fail():
+        raise error
+
+    assert all(outcome is error for outcome in run_followers(flight, fail, 4))
+
+
+def test_calls_after_completion_run_again():
+    flight, calls = SingleFlight(), []
+    assert flight.do('key', lambda: calls.append(1) or 1) == 1
+    assert flight.do('key', lambda: calls.append(2) or 2) == 2
+    assert calls == [1, 2] and flight.shared == 0
+
+
+def test_async_followers_share_one_task():
+    async def main():
+        flight, calls = AsyncSingleFlight(), []
+        release = asyncio.Event()
+
+        async def fetch():
+            calls.append(1)
+            await release.wait()
+            return {'ok': 1}
+
+        tasks = [asyncio.ensure_future(flight.do('key', fetch)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+        return flight, calls, results
+
+    flight, calls, results = asyncio.run(main())
+    assert calls == [1] and flight.shared == 4 and not flight.calls
+    assert all(result is results[0] for result in results)
+
+
+def test_async_cancelled_follower_does_not_cancel_the_call():
+    async def main():
+        flight = AsyncSingleFlight()
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return 1
+
+        leader = asyncio.ensure_future(flight.do('key', fetch))
+        follower = asyncio.ensure_future(flight.do('key', fetch))
+        await asyncio.sleep(0)
+        follower.cancel()
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        return await leader
+
+    assert asyncio.run(main()) == 1
+
+
+def test_client_coalesces_identical_requests(standin):
+    server = standin(latency=0.3)
+    cg = client_for(server)
+    request = cg.endpoints.simple_price.params({'ids': 'bitcoin', 'vs_currencies': 'usd'})
+    results = cg.run_many([request] * 10, max_workers=10)
+    assert all(result is results[0] for result in results)
+    sent = server.stats()['/simple/price'][200]
+    assert sent + cg.single_flight.shared == 10 and sent < 10
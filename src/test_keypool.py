@@ -0,0 +1,75 @@
+''' Tests for keypool.KeyPool: key choice, sidelining and rotation in the client. Run with pytest from src/ '''
+
+import time, config, pytest, requests
+from client import CoinGeckoClient
+from keypool import ApiKey, KeyPool
+from conftest import client_for
+
+
+def response(status, headers = None):
+    result = requests.Response()
+    result.status_code = status
+    result.headers.update(headers or {})
+    return result
+
+
+def key(name, burst = 5, tier = "pro", base_url = None):
+    return ApiKey(name * 4, tier, rate_per_minute=60, burst=burst, base_url=base_url)
+
+
+def test_keys_from_strings_tuples_and_objects():
+    pool = KeyPool(["aaaa", ("bbbb", "pro"), key("c", tier="demo")], tier="pro")
+    assert [api_key.tier for api_key in pool.keys] == ["pro", "pro", "demo"]
+    assert pool.keys[0].headers == {config.API_TIERS["pro"]["header"]: "aaaa"}
+    with pytest.raises(ValueError):
+        KeyPool([])
+    with pytest.raises(ValueError):
+        ApiKey("dddd", "enterprise")
+
+
+def test_requests_go_to_the_key_with_most_tokens():
+    pool = KeyPool([key("a", burst=2), key("b", burst=4)])
+    taken = [pool.try_acquire().key for _ in range(6)]
+    assert taken.count("bbbb") == 4 and taken.count("aaaa") == 2
+    assert pool.try_acquire() is None
+
+
+def test_429_sidelines_for_retry_after_and_401_for_the_cooldown():
+    pool = KeyPool([key("a"), key("b"), key("c")], cooldowns={401: 300})
+    assert pool.switch(pool.keys[0], response(429, {'Retry-After': '30'}))
+    assert pool.sideline(pool.keys[1], response(401))
+    assert not pool.sideline(pool.keys[2], response(500))
+    stats = pool.stats()
+    assert [entry['status'] for entry in stats] == [429, 401, None]
+    assert 29 < stats[0]['sidelined'] <= 30 and 299 < stats[1]['sidelined'] <= 300
+    assert pool.usable() == 1
+    assert all(pool.try_acquire() is pool.keys[2] for _ in range(5))
+
+
+def test_every_key_sidelined_waits_for_the_first_back():
+    pool = KeyPool([key("a"), key("b")])
+    pool.sideline(pool.keys[0], response(429, {'Retry-After': '20'}))
+    assert not pool.switch(pool.keys[1], response(429, {'Retry-After': '10'}))
+    api_key, wait = pool.reserve()
+    assert api_key is pool.keys[1] and 9 < wait <= 10
+    assert pool.try_acquire() is None
+
+
+def test_client_gives_pooled_string_keys_its_tier():
+    cg = CoinGeckoClient(tier="pro", keys=["aaaa", "bbbb"])
+    assert {api_key.base_url for api_key in cg.key_pool.keys} == {config.API_TIERS["pro"]["base_url"]}
+    with pytest.raises(ValueError):
+        CoinGeckoClient("cccc", keys=["aaaa"])
+
+
+def test_client_rotates_to_another_key_on_429(standin):
+    limited, healthy = standin(error_rates={429: 1.0}, retry_after=30), standin()
+    pool = KeyPool([key("a", burst=5, base_url=limited.url), key("b", burst=4, base_url=healthy.url)])
+    cg = client_for(limited, keys=pool, cache=False)
+    start = time.monotonic()
+    for _ in range(3):
+        assert cg.endpoints.ping.run() == {'gecko_says': '(V3) To the Moon!'}
+    assert time.monotonic() - start < 5 # The retry went to the other key straight away, no Retry-After wait
+    assert limited.stats() == {'/ping': {429: 1}}
+    assert healthy.stats() == {'/ping': {200: 3}}
+    assert pool.stats()[0]['status'] == 429
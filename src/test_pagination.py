@@ -0,0 +1,78 @@
+''' Tests for fetch_pages and iter_pages against stub clients, no network needed. Run with pytest from src/ '''
+
+import asyncio, config, pagination, pytest
+from client import CoinGeckoClient
+from async_client import AsyncCoinGeckoClient
+
+
+class FailingClient(CoinGeckoClient):
+    ''' Client whose every request fails, like execute() does after report_error. '''
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.sent = []
+
+    def execute(self, request, block = True, mode = "json"):
+        self.sent.append(request.query_params.get('page'))
+        return None
+
+
+class AsyncFailingClient(AsyncCoinGeckoClient):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.sent = []
+
+    async def _fail(self):
+        return None
+
+    def execute(self, request, block = True, mode = "json"):
+        self.sent.append(request.query_params.get('page'))
+        return self._fail()
+
+
+def markets(cg):
+    return cg.endpoints.coins_markets.params({"vs_currency": "usd", "per_page": 250})
+
+
+def test_fetch_pages_stops_when_every_page_fails():
+    cg = FailingClient()
+    scan = cg.fetch_pages(markets(cg), max_workers=4)
+    assert not scan.complete
+    assert scan.items == []
+    assert scan.failed_pages == [1, 2, 3, 4]
+    assert len(cg.sent) == 4 * config.PAGE_FAILED_WAVES * (1 + config.PAGE_RETRY_ROUNDS)
+
+
+def test_fetch_pages_with_last_page_fails_every_page_once():
+    cg = FailingClient()
+    scan = cg.fetch_pages(markets(cg), last_page=6, max_workers=4)
+    assert scan.failed_pages == [1, 2, 3, 4, 5, 6]
+    assert len(cg.sent) == 6 * (1 + config.PAGE_RETRY_ROUNDS)
+
+
+def test_async_fetch_pages_stops_when_every_page_fails():
+    async def scan_pages():
+        async with AsyncFailingClient(concurrency=4) as cg:
+            return cg, await cg.fetch_pages(markets(cg))
+
+    cg, scan = asyncio.run(scan_pages())
+    assert not scan.complete
+    assert scan.failed_pages == [1, 2, 3, 4]
+    assert len(cg.sent) == 4 * config.PAGE_FAILED_WAVES * (1 + config.PAGE_RETRY_ROUNDS)
+
+
+def test_iter_pages_raises_after_retrying_a_failed_page():
+    cg = FailingClient()
+    with pytest.raises(pagination.PageFetchError) as error:
+        list(cg.iter_items(markets(cg), start_page=3))
+    assert error.value.page == 3
+    assert cg.sent == [3] * (1 + config.PAGE_RETRY_ROUNDS)
+
+
+def test_async_iter_pages_raises_after_retrying_a_failed_page():
+    async def consume():
+        async with AsyncFailingClient() as cg:
+            return cg, [items async for items in cg.iter_pages(markets(cg), prefetch=False)]
+
+    with pytest.raises(pagination.PageFetchError) as error:
+        asyncio.run(consume())
+    assert error.value.page == 1
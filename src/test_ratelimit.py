@@ -0,0 +1,70 @@
+''' Tests for ratelimit.RateLimiter, time moved by hand so nothing sleeps. Run with pytest from src/ '''
+
+import math, threading
+from ratelimit import RateLimiter
+
+
+def advance(limiter, seconds) -> None:
+    ''' Makes the limiter refill as if seconds had passed. '''
+    limiter.updated -= seconds
+
+
+def test_burst_then_empty():
+    limiter = RateLimiter(rate_per_minute=60, burst=3)
+    assert [limiter.try_acquire() for _ in range(4)] == [True, True, True, False]
+    assert limiter.available() < 1
+
+
+def test_refill_at_rate_up_to_burst():
+    limiter = RateLimiter(rate_per_minute=60, burst=3)
+    for _ in range(3):
+        limiter.try_acquire()
+    advance(limiter, 2)
+    assert 2 <= limiter.available() < 2.1
+    advance(limiter, 100)
+    assert limiter.available() == 3
+
+
+def test_reserve_goes_into_debt_in_arrival_order():
+    limiter = RateLimiter(rate_per_minute=60, burst=1)
+    assert limiter.reserve() == 0
+    first, second = limiter.reserve(), limiter.reserve()
+    assert 0.9 < first <= 1 and 1.9 < second <= 2
+    assert limiter.wait_time() > 2.8
+    assert not limiter.try_acquire()
+
+
+def test_weights():
+    limiter = RateLimiter(rate_per_minute=60, burst=5, weights={"/coins/list": 4})
+    assert limiter.weight("/coins/list") == 4 and limiter.weight("/ping") == 1
+    assert limiter.try_acquire(limiter.weight("/coins/list"))
+    assert not limiter.try_acquire(2)
+    assert 0.9 < limiter.wait_time(2) <= 1
+
+
+def test_failed_try_acquire_takes_nothing():
+    limiter = RateLimiter(rate_per_minute=60, burst=2)
+    assert not limiter.try_acquire(3)
+    assert limiter.available() > 1.99
+
+
+def test_no_limit():
+    limiter = RateLimiter(None)
+    assert all(limiter.try_acquire() for _ in range(1000))
+    assert limiter.reserve(100) == 0 and limiter.acquire() == 0
+    assert limiter.available() == math.inf
+
+
+def test_threads_never_share_tokens():
+    limiter = RateLimiter(rate_per_minute=1, burst=50)
+    taken = []
+
+    def take():
+        taken.extend(limiter.try_acquire() for _ in range(20))
+
+    threads = [threading.Thread(target=take) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert taken.count(True) == 50
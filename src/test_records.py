@@ -0,0 +1,31 @@
+''' Tests for the record types of records.py, no network needed. Run with pytest from src/ '''
+
+import pytest
+from array import array
+from records import MarketRow
+
+
+@pytest.mark.parametrize("sparkline", [
+    {"price": [1.5, None, 3.25]},
+    [1, 2],
+    {"price": [1.5, 2.0], "extra": 1},
+    {"price": "not a list"},
+])
+def test_sparkline_round_trips_every_shape(sparkline):
+    row = MarketRow({"id": "bitcoin", "sparkline_in_7d": sparkline})
+    assert row.sparkline_in_7d == sparkline
+    assert row.to_dict()["sparkline_in_7d"] == sparkline
+
+
+def test_sparkline_is_packed_as_an_array():
+    row = MarketRow({"id": "bitcoin", "sparkline_in_7d": {"price": [1.0, 2.0]}})
+    assert isinstance(row._sparkline_in_7d, array)
+    assert row.sparkline_in_7d == {"price": [1.0, 2.0]}
+
+
+def test_lazy_and_extra_fields():
+    row = MarketRow({"id": "bitcoin", "roi": {"times": 2.5}, "new_field": 1})
+    assert isinstance(row._roi, bytes)
+    assert row["roi"] == {"times": 2.5}
+    assert row.get("new_field") == 1
+    assert row.to_dict() == {**{name: None for name in MarketRow.FIELDS + MarketRow.LAZY}, "id": "bitcoin", "roi": {"times": 2.5}, "new_field": 1}
@@ -0,0 +1,92 @@
+''' Tests for retry.RetryPolicy, RetryBudget and client retries against the stand-in server. Run with pytest from src/ '''
+
+import pytest, requests
+from email.utils import formatdate
+import retry
+from retry import RetryBudget, RetryPolicy, retry_after_seconds
+from conftest import client_for
+
+
+def http_error(status, headers = None):
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    return requests.exceptions.HTTPError(f"{status} Error", response=response)
+
+
+def policy(**kwargs):
+    kwargs.setdefault('budget', RetryBudget())
+    return RetryPolicy(**kwargs)
+
+
+@pytest.mark.parametrize("attempt", range(8))
+def test_backoff_is_full_jitter_under_the_capped_exponential(attempt, monkeypatch):
+    monkeypatch.setattr(retry.random, 'uniform', lambda low, high: (low, high))
+    assert policy(base_delay=0.5, max_delay=10).backoff(attempt) == (0, min(10, 0.5 * 2 ** attempt))
+
+
+def test_backoff_stays_in_range():
+    retry.random.seed(3)
+    delays = [policy(base_delay=1, max_delay=4).backoff(2) for _ in range(200)]
+    assert all(0 <= delay <= 4 for delay in delays) and max(delays) > 2
+
+
+def test_status_codes_retry_only_when_listed():
+    retries = policy(status_attempts={503: 2}, retry_after_statuses=set(), base_delay=0)
+    assert retries.delay(http_error(404), 0) is None
+    assert retries.delay(http_error(503), 0) == 0
+    assert retries.delay(http_error(503), 1) == 0
+    assert retries.delay(http_error(503), 2) is None
+
+
+def test_timeouts_and_connection_errors_use_attempts():
+    retries = policy(attempts=1, base_delay=0)
+    assert retries.delay(requests.exceptions.Timeout(), 0) == 0
+    assert retries.delay(requests.exceptions.ConnectionError(), 1) is None
+    assert retries.delay(ValueError("not a request error"), 0) is None
+
+
+def test_retry_after_is_honored_and_capped():
+    retries = policy(status_attempts={429: 5}, retry_after_statuses={429}, base_delay=100)
+    assert retries.delay(http_error(429, {'Retry-After': '7'}), 0) == 7
+    assert retries.delay(http_error(429, {'Retry-After': '100000'}), 0) == retry.config.RETRY_AFTER_MAX
+
+
+def test_retry_after_http_date():
+    seconds = retry_after_seconds(http_error(503, {'Retry-After': formatdate(retry.time.time() + 30, usegmt=True)}).response)
+    assert 28 <= seconds <= 30
+    assert retry_after_seconds(http_error(503, {'Retry-After': 'soon'}).response) is None
+    assert retry_after_seconds(http_error(503).response) is None
+
+
+def test_budget_caps_retries():
+    budget = RetryBudget(ratio=0.5, minimum=1, maximum=2)
+    retries = RetryPolicy(base_delay=0, status_attempts={503: 10}, budget=budget)
+    assert retries.delay(http_error(503), 0) == 0
+    assert retries.delay(http_error(503), 1) is None # Budget spent
+    retries.record_request()
+    retries.record_request()
+    assert retries.delay(http_error(503), 1) == 0
+    for _ in range(10):
+        retries.record_request()
+    assert budget.tokens == 2 # Capped at maximum
+
+
+def test_client_retries_injected_errors(standin):
+    server = standin(error_rates={503: 0.4}, retry_after=0, seed=7)
+    cg = client_for(server, cache=False, retry_policy=policy(base_delay=0, status_attempts={503: 20}, budget=RetryBudget(minimum=100, maximum=100)))
+    retries = 0
+    for _ in range(30):
+        assert cg.endpoints.ping.run() == {'gecko_says': '(V3) To the Moon!'}
+        retries += cg.retry_count
+    stats = server.stats()['/ping']
+    assert stats[200] == 30
+    assert stats.get(503, 0) == retries > 0
+
+
+def test_client_gives_up_on_unlisted_status(standin):
+    server = standin(error_rates={500: 1.0}, seed=1)
+    cg = client_for(server, cache=False, retry_policy=policy(base_delay=0, status_attempts={}))
+    assert cg.endpoints.ping.run() is None
+    assert server.stats()['/ping'] == {500: 1}
+    assert cg.retry_count == 0
@@ -0,0 +1,40 @@
+''' Tests for scheduling.Scheduler with weights above the source's burst, no network needed. Run with pytest from src/ '''
+
+import asyncio, time, pytest
+from keypool import ApiKey, KeyPool
+from ratelimit import RateLimiter
+from scheduling import DeadlineExceeded, Scheduler
+
+
+def test_weight_above_burst_takes_tokens_on_credit():
+    scheduler = Scheduler(RateLimiter(rate_per_minute=600, burst=2))
+    grant, waited = scheduler.acquire(5, scheduler.slot(None, "low"))
+    assert grant is True
+    assert 0.25 < waited < 0.4 # 3 tokens short at 10 per second
+    start = time.monotonic()
+    scheduler.acquire(1, scheduler.slot(None, "high"))
+    assert time.monotonic() - start > 0.05 # The debt is paid before the next request
+    assert scheduler.stats()["low"]["depth"] == 0
+
+
+def test_weight_above_burst_respects_deadline():
+    scheduler = Scheduler(RateLimiter(rate_per_minute=60, burst=2))
+    with pytest.raises(DeadlineExceeded):
+        scheduler.acquire(10, scheduler.slot(None, "high", deadline=1))
+    assert not scheduler.queue
+
+
+def test_weight_above_every_key_burst_uses_a_key():
+    pool = KeyPool([ApiKey("a" * 8, "pro", rate_per_minute=600, burst=2), ApiKey("b" * 8, "pro", rate_per_minute=600, burst=1)])
+    scheduler = Scheduler(pool)
+    key, waited = scheduler.acquire(3, scheduler.slot(None))
+    assert key in pool.keys
+    assert waited < 0.3
+
+
+def test_async_weight_above_burst_takes_tokens_on_credit():
+    scheduler = Scheduler(RateLimiter(rate_per_minute=600, burst=2))
+    grant, waited = asyncio.run(scheduler.acquire_async(5, scheduler.slot(None)))
+    assert grant is True
+    assert 0.25 < waited < 0.4
+    assert not scheduler.queue
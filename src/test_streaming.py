@@ -0,0 +1,44 @@
+''' Tests for streaming.ArrayStreamDecoder with the body split into chunks at every offset. Run with pytest from src/ '''
+
+import json, pytest
+from streaming import ArrayStreamDecoder, iter_json_array
+
+
+ITEMS = [1.5, -2e-3, 10, 0, 3.25E+2, -0.0, {"id": "bété", "price": 65000.125, "ok": True},
+         [1e10, None, False], "\\\"quoted\\\" €", -17, 12.0]
+PAYLOAD = json.dumps({"name": "x", "skip": {"nested": [1.0, 2e5]}, "tokens": ITEMS}, ensure_ascii=False).encode()
+
+
+def decode(chunks, path):
+    decoder = ArrayStreamDecoder(path)
+    items = []
+    for chunk in chunks:
+        items.extend(decoder.feed(chunk))
+    return items + decoder.close()
+
+
+@pytest.mark.parametrize("split", range(len(PAYLOAD) + 1))
+def test_every_split_point(split):
+    assert decode([PAYLOAD[:split], PAYLOAD[split:]], "tokens") == ITEMS
+
+
+def test_one_byte_chunks():
+    assert decode([PAYLOAD[index:index + 1] for index in range(len(PAYLOAD))], "tokens") == ITEMS
+
+
+@pytest.mark.parametrize("split", range(1, 16))
+def test_top_level_array_of_numbers(split):
+    body = b'[1.5,2e3,-7,0.25E-1]'
+    assert list(iter_json_array([body[:split], body[split:]])) == [1.5, 2e3, -7, 0.25e-1]
+
+
+def test_number_split_at_decimal_point():
+    decoder = ArrayStreamDecoder()
+    assert decoder.feed(b'[1.') == []
+    assert decoder.feed(b'5]') == [1.5]
+    assert decoder.close() == []
+
+
+def test_truncated_body_raises():
+    with pytest.raises(ValueError):
+        decode([PAYLOAD[:-3]], "tokens")
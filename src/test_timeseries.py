@@ -0,0 +1,32 @@
+''' Tests for timeseries.SeriesFile, no network needed. Run with pytest from src/ '''
+
+import os, threading
+from timeseries import SeriesFile
+
+
+def test_concurrent_appends_store_each_point_once(tmp_path):
+    series = SeriesFile(os.path.join(tmp_path, "bitcoin", "usd", "prices"))
+    batches = [[[stamp * 1000, float(stamp)] for stamp in range(start, start + 50)] for start in (0, 0, 25, 25, 40, 60)]
+    barrier = threading.Barrier(len(batches))
+
+    def append(points):
+        barrier.wait()
+        series.append(points)
+
+    threads = [threading.Thread(target=append, args=(points,)) for points in batches]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    timestamps, values = series.view()
+    assert list(timestamps) == sorted(set(timestamps))
+    assert list(values) == [timestamp / 1000 for timestamp in timestamps]
+
+
+def test_append_keeps_only_newer_points(tmp_path):
+    series = SeriesFile(os.path.join(tmp_path, "prices"))
+    assert series.append([[2000, 2.0], [1000, None]]) == 2
+    assert series.append([[1000, 1.0], [3000, 3.0], [3000, 3.0]]) == 1
+    timestamps, values = series.view()
+    assert list(timestamps) == [1000, 2000, 3000]
+    assert values[0] != values[0] # Null is stored as NaN
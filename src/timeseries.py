@@ -0,0 +1,197 @@
+''' Local append-only time-series store for chart data, refreshed with delta-only /market_chart calls '''
+
+import mmap, os, threading, time, config
+from array import array
+from bisect import bisect_left, bisect_right
+from backfill import SERIES, file_name, stitch
+
+
+_RECORD = 8 # Bytes per timestamp (int64) and per value (float64)
+
+
+class Series:
+    '''
+    Read-only slice of one stored series.
+
+    timestamps (int64, milliseconds) and values (float64) are memoryviews straight into the memory-mapped files,
+    nothing is copied. numpy.frombuffer(series.values) wraps them without copying too, see columns().
+    '''
+    __slots__ = ('timestamps', 'values')
+
+    def __init__(self, timestamps, values) -> None:
+        self.timestamps = timestamps
+        self.values = values
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({len(self)} points)'
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __iter__(self):
+        return zip(self.timestamps, self.values)
+
+    def columns(self) -> dict:
+        ''' Returns {"timestamp": int64 array, "value": float64 array} as NumPy arrays sharing memory with the store (read-only). '''
+        import columnar
+        columnar.require_numpy()
+        return {'timestamp': columnar.numpy.frombuffer(self.timestamps, dtype=columnar.numpy.int64),
+                'value': columnar.numpy.frombuffer(self.values, dtype=columnar.numpy.float64)}
+
+
+class SeriesFile:
+    '''
+    One append-only series on disk: path.ts holds int64 timestamps and path.val float64 values (native byte order), sorted by time.
+
+    Reads map the files into memory. A crash between the two writes of an append can leave one file longer
+    than the other, the extra records are ignored and cut off on the next append.
+    '''
+    def __init__(self, path) -> None:
+        self.path = path
+        self.lock = threading.RLock() # Reentrant, append() reads the mapping through last() while holding it
+        self.maps = None # (length, timestamps memoryview, values memoryview) of the current mapping
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.path!r})'
+
+    def _count(self) -> int:
+        try:
+            return min(os.path.getsize(self.path + '.ts'), os.path.getsize(self.path + '.val')) // _RECORD
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _map(path, length, format):
+        with open(path, 'rb') as file:
+            mapped = mmap.mmap(file.fileno(), length * _RECORD, access=mmap.ACCESS_READ) # Stays valid after the file is closed
+        return memoryview(mapped).cast(format)
+
+    def view(self):
+        ''' Returns (timestamps, values) memoryviews of every stored point. Views handed out earlier stay valid after appends. '''
+        length = self._count()
+        with self.lock:
+            if self.maps is None or self.maps[0] != length:
+                if length == 0:
+                    self.maps = (0, memoryview(b'').cast('q'), memoryview(b'').cast('d'))
+                else:
+                    self.maps = (length, self._map(self.path + '.ts', length, 'q'), self._map(self.path + '.val', length, 'd'))
+            return self.maps[1], self.maps[2]
+
+    def last(self):
+        ''' Returns the newest stored timestamp, or None if the series is empty. '''
+        timestamps, _ = self.view()
+        return timestamps[-1] if len(timestamps) else None
+
+    def append(self, points) -> int:
+        '''
+        Appends [timestamp, value] points newer than the last stored one, in time order. Returns how many were added.
+
+        Null values are stored as NaN.
+        '''
+        with self.lock: # Held from reading the last timestamp to the write, so two refreshes cannot both append the same points
+            last = self.last()
+            points = sorted({point[0]: point for point in points if last is None or point[0] > last}.values())
+            if not points:
+                return 0
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            length = self._count()
+            for suffix, data in (('.ts', array('q', (int(point[0]) for point in points))),
+                                 ('.val', array('d', (float('nan') if point[1] is None else point[1] for point in points)))):
+                with open(self.path + suffix, 'ab') as file:
+                    file.truncate(length * _RECORD) # Drops records left over by an interrupted append
+                    file.write(data)
+        return len(points)
+
+
+class TimeSeriesStore:
+    '''
+    Keeps price, market cap and volume history per coin and currency on disk, fetching only what is new.
+
+    refresh(coin_id) asks /market_chart/range for the range after the last stored timestamp and appends it
+    (the first refresh fetches config.TIMESERIES_HISTORY_DAYS of history with backfill_market_chart).
+    series() serves reads as zero-copy slices of memory-mapped files, so dashboards can read as often as they like
+    without any API calls.
+
+    Every series has one granularity ("hourly" or "daily"). A short hourly refresh range is widened to a day so
+    the API keeps answering hourly (see config.BACKFILL_SPANS), and only the points after the last stored one are kept.
+    /market_chart/range only answers daily for ranges over 90 days, so daily refreshes of up to 90 days use
+    /market_chart?days=N&interval=daily instead and download only the few days that are new.
+
+    Example:
+        >>> store = cg.time_series()
+        >>> store.refresh("bitcoin")    # Every few minutes, one call of at most a day of points
+        {'prices': 1, 'market_caps': 1, 'total_volumes': 1}
+        >>> prices = store.series("bitcoin", start=time.time() - 7 * 86400)
+        >>> prices.values[-1]
+    '''
+    def __init__(self, client, directory = config.TIMESERIES_DIR, granularity = "hourly") -> None:
+        if granularity not in config.BACKFILL_SPANS:
+            raise ValueError(f"Unknown granularity {granularity!r}, expected one of {tuple(config.BACKFILL_SPANS)}")
+        self.client = client
+        self.directory = os.path.expanduser(directory)
+        self.granularity = granularity
+        self.lock = threading.Lock()
+        self.files = {}
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.directory!r}, granularity={self.granularity!r})'
+
+    def file(self, coin_id, vs_currency = "usd", metric = "prices") -> SeriesFile:
+        key = (coin_id, vs_currency.lower(), metric)
+        with self.lock:
+            if key not in self.files:
+                path = os.path.join(self.directory, self.granularity, file_name(coin_id), file_name(key[1]), file_name(metric))
+                self.files[key] = SeriesFile(path)
+            return self.files[key]
+
+    def last_timestamp(self, coin_id, vs_currency = "usd"):
+        ''' Returns the newest timestamp (milliseconds) stored for every metric of the coin, or None if any is empty. '''
+        stamps = [self.file(coin_id, vs_currency, metric).last() for metric in SERIES]
+        return None if None in stamps else min(stamps)
+
+    def refresh(self, coin_id, vs_currency = "usd", history_days = config.TIMESERIES_HISTORY_DAYS) -> dict:
+        '''
+        Fetches the points newer than the last stored ones and appends them.
+
+        If a chunk of a long catch-up fails, only the points before it are appended, so the store never has gaps;
+        the next refresh continues from there. Daily series keep only completed days (up to today 00:00 UTC).
+
+        Returns: dict : Points added per metric (e.g., {"prices": 12, "market_caps": 12, "total_volumes": 12})
+        '''
+        now = int(time.time())
+        last = self.last_timestamp(coin_id, vs_currency)
+        start = now - history_days * 86400 if last is None else last // 1000 + 1
+        if last is not None and self.granularity == "daily" and now - start <= config.BACKFILL_SPANS["daily"][0]:
+            data, cutoff = self._daily_delta(coin_id, vs_currency, start, now), None
+        else:
+            result = self.client.backfill_market_chart(coin_id, start, now, vs_currency, self.granularity, checkpoint_dir=None)
+            data = result.data
+            cutoff = result.failed_chunks[0][0] * 1000 if result.failed_chunks else None
+        added = {}
+        for metric in SERIES:
+            points = data.get(metric, [])
+            if cutoff is not None:
+                points = [point for point in points if point[0] < cutoff]
+            added[metric] = self.file(coin_id, vs_currency, metric).append(points)
+        return added
+
+    def _daily_delta(self, coin_id, vs_currency, start, now) -> dict:
+        ''' Fetches the daily points from start (UNIX seconds) with one /market_chart?interval=daily call of just the days needed. '''
+        days = (now - start) // 86400 + 1
+        data = self.client.endpoints.coins_market_chart(coin_id).params({"vs_currency": vs_currency, "days": days, "interval": "daily"}).run()
+        if data is None:
+            return {}
+        return stitch([data], start, now // 86400 * 86400) # The last point of the response is the current price, not a daily close
+
+    def series(self, coin_id, vs_currency = "usd", metric = "prices", start = None, end = None) -> Series:
+        '''
+        Returns the stored points of one metric between start and end (UNIX seconds, both optional and inclusive).
+
+        Returns: Series : Zero-copy memoryviews of timestamps (milliseconds) and values
+        '''
+        timestamps, values = self.file(coin_id, vs_currency, metric).view()
+        low = 0 if start is None else bisect_left(timestamps, start * 1000)
+        high = len(timestamps) if end is None else bisect_right(timestamps, end * 1000)
+        return Series(timestamps[low:high], values[low:high])
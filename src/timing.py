@@ -0,0 +1,89 @@
+''' DNS and connect timings for hook events, measured by the connections of the client's requests session '''
+
+import socket, threading, time
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError
+from urllib3.util.connection import allowed_gai_family
+try:
+    from urllib3.exceptions import NameResolutionError
+except ImportError: # urllib3 1.x: connections are timed as a whole, without the dns / connect split
+    NameResolutionError = None
+
+
+_local = threading.local()
+
+
+def track(event) -> None:
+    ''' Makes connections opened by the current thread record their timings on event (None stops it). '''
+    _local.event = event
+
+
+def _is_address(host) -> bool:
+    try:
+        socket.inet_pton(socket.AF_INET6 if ':' in host else socket.AF_INET, host)
+        return True
+    except OSError:
+        return False
+
+
+class _TimedConnection:
+    '''
+    Connection that records dns and connect seconds on the tracked hooks.RequestEvent of its thread.
+
+    Without a tracked event (no hooks registered), or on urllib3 1.x, it behaves exactly like urllib3's connection
+    and the dns seconds stay 0 (connect then includes the lookup).
+    '''
+    def connect(self) -> None:
+        event = getattr(_local, 'event', None)
+        if event is None:
+            return super().connect()
+        start = time.perf_counter()
+        super().connect()
+        event.connect = time.perf_counter() - start - event.dns # TCP and TLS handshakes
+
+    def _new_conn(self):
+        event = getattr(_local, 'event', None)
+        host = getattr(self, '_dns_host', None)
+        if event is None or NameResolutionError is None or host is None or _is_address(host):
+            return super()._new_conn()
+        start = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except socket.gaierror as error:
+            raise NameResolutionError(self.host, self, error) from error
+        event.dns = time.perf_counter() - start
+        try:
+            for index, address in enumerate(addresses): # Same order and fallback as urllib3, without resolving the host twice
+                self._dns_host = address[4][0]
+                try:
+                    return super()._new_conn()
+                except ConnectTimeoutError: # NewConnectionError too, it is a subclass
+                    if index == len(addresses) - 1:
+                        raise
+        finally:
+            self._dns_host = host
+
+
+class TimedHTTPConnection(_TimedConnection, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnection, HTTPSConnection): # TLS still verifies self.host, only the socket uses the resolved address
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedAdapter(HTTPAdapter):
+    ''' HTTPAdapter whose pooled connections report their timings to hook events, see track(). '''
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': TimedHTTPConnectionPool, 'https': TimedHTTPSConnectionPool}